@@ -0,0 +1,11 @@
+"""Offline benchmark harness for the AgentCore Sales Agent.
+
+Runs ``agent.invoke`` and ``agent.ws_handler`` against local stand-ins for
+every AWS dependency (moto for DynamoDB/SSM, fakes for Bedrock Runtime,
+Personalize Runtime and the OpenSearch kNN endpoint) so performance can be
+measured without touching a live account.
+
+Usage::
+
+    python -m bench --concurrency 1,4,16 --requests 64
+"""
@@ -0,0 +1,51 @@
+"""Run the offline benchmark: python -m bench [options]"""
+
+from pathlib import Path
+
+import click
+
+from bench.harness import MODES, BenchmarkOptions, format_report, run_benchmark, write_results
+
+
+def _int_list(ctx, param, value: str) -> list[int]:
+    try:
+        levels = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise click.BadParameter("expected a comma-separated list of integers")
+    if not levels or any(level < 1 for level in levels):
+        raise click.BadParameter("concurrency levels must be positive")
+    return levels
+
+
+@click.command()
+@click.option("--concurrency", default="1,4,16", callback=_int_list, help="Comma-separated concurrency levels")
+@click.option("--requests", "requests_", type=int, default=32, show_default=True, help="Requests per level")
+@click.option("--mode", "modes", type=click.Choice(MODES), multiple=True, help="Entrypoints to benchmark (default: all)")
+@click.option("--catalog-size", type=int, default=500, show_default=True, help="Items seeded into the stand-ins")
+@click.option("--embed-latency", type=float, default=0.05, show_default=True, help="Fake Titan embedding latency (s)")
+@click.option("--llm-latency", type=float, default=0.3, show_default=True, help="Fake model latency per call (s)")
+@click.option("--knn-latency", type=float, default=0.02, show_default=True, help="Fake kNN search latency (s)")
+@click.option("--personalize-latency", type=float, default=0.05, show_default=True, help="Fake Personalize latency (s)")
+@click.option("--output-dir", type=click.Path(file_okay=False, path_type=Path), default=Path("bench-results"), show_default=True)
+@click.option("-v", "--verbose", is_flag=True, help="Show agent logs and streamed output")
+def main(concurrency, requests_, modes, catalog_size, embed_latency, llm_latency, knn_latency,
+         personalize_latency, output_dir, verbose):
+    """Benchmark agent.invoke and ws_handler against local AWS stand-ins."""
+    options = BenchmarkOptions(
+        concurrency=concurrency,
+        requests=requests_,
+        modes=list(modes) or list(MODES),
+        catalog_size=catalog_size,
+        embed_latency=embed_latency,
+        llm_latency=llm_latency,
+        knn_latency=knn_latency,
+        personalize_latency=personalize_latency,
+    )
+    results = run_benchmark(options, quiet=not verbose)
+    click.echo(format_report(results))
+    path = write_results(results, output_dir)
+    click.echo(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
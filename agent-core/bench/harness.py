@@ -0,0 +1,233 @@
+"""Benchmark runner for ``agent.invoke`` and ``agent.ws_handler``.
+
+Each concurrency level runs a fixed number of requests across a pool of
+worker threads. Every worker drives the agent through its own event loop,
+which is how the AgentCore runtime serves concurrent sessions, so blocking
+calls inside the agent show up as reduced throughput rather than being
+hidden by a shared loop.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import platform
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from bench.stats import StageRecorder, summarize
+from bench.stubs import DEFAULT_COMPLETION, aws_stand_ins
+
+logger = logging.getLogger(__name__)
+
+_AGENT_CORE_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_PROMPTS = [
+    "I'm looking for a warm scarf for winter",
+    "Show me a chef knife under 60 dollars",
+    "I'm user_id: 5, could you recommend some Christmas gifts?",
+    "Find me comfortable running shoes",
+    "I'm user_id: 12, what should I buy for my kitchen?",
+]
+
+MODES = ("invoke", "ws")
+
+
+@dataclass
+class BenchmarkOptions:
+    """Parameters for one benchmark run."""
+
+    concurrency: list[int] = field(default_factory=lambda: [1, 4, 16])
+    requests: int = 32
+    modes: list[str] = field(default_factory=lambda: list(MODES))
+    prompts: list[str] = field(default_factory=lambda: list(DEFAULT_PROMPTS))
+    catalog_size: int = 500
+    embed_latency: float = 0.05
+    llm_latency: float = 0.3
+    knn_latency: float = 0.02
+    personalize_latency: float = 0.05
+    completion: str = DEFAULT_COMPLETION
+
+
+class _FakeWebSocket:
+    """Minimal Starlette-style WebSocket that replays one payload."""
+
+    def __init__(self, payload: dict):
+        self._inbox = [json.dumps(payload)]
+        self.sent: list[str] = []
+
+    async def accept(self):
+        return None
+
+    async def receive_text(self) -> str:
+        if not self._inbox:
+            raise ConnectionError("client disconnected")
+        return self._inbox.pop(0)
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+
+def _unload_agent_modules() -> None:
+    for name in list(sys.modules):
+        if name in ("agent", "config", "memory", "tools") or name.startswith("tools."):
+            del sys.modules[name]
+
+
+def _load_agent_module():
+    """Import ``agent`` fresh so ``Config.load()`` reads the seeded stand-ins."""
+    if str(_AGENT_CORE_DIR) not in sys.path:
+        sys.path.insert(0, str(_AGENT_CORE_DIR))
+    _unload_agent_modules()
+    import agent  # noqa: E402
+
+    return agent
+
+
+def _check_response(raw: str) -> None:
+    message = json.loads(raw)
+    if "error" in message:
+        raise RuntimeError(message["error"])
+
+
+async def _run_invoke(agent_module, prompt: str) -> None:
+    stream = await agent_module.invoke({"prompt": prompt, "session_id": str(uuid.uuid4())})
+    async for chunk in stream:
+        _check_response(chunk)
+
+
+async def _run_ws(agent_module, prompt: str) -> None:
+    websocket = _FakeWebSocket({"prompt": prompt, "session_id": str(uuid.uuid4())})
+    await agent_module.ws_handler(websocket, {})
+    if not websocket.sent:
+        raise RuntimeError("WebSocket handler sent no response")
+    for raw in websocket.sent:
+        _check_response(raw)
+
+
+_RUNNERS = {"invoke": _run_invoke, "ws": _run_ws}
+
+
+def run_level(agent_module, mode: str, concurrency: int, options: BenchmarkOptions, recorder: StageRecorder) -> dict:
+    """Run ``options.requests`` requests of *mode* with *concurrency* workers."""
+    runner = _RUNNERS[mode]
+    counter = iter(range(options.requests))
+    lock = threading.Lock()
+
+    def _worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            prompt = options.prompts[index % len(options.prompts)]
+            try:
+                with recorder.time(mode):
+                    asyncio.run(runner(agent_module, prompt))
+            except Exception as exc:
+                logger.debug("%s request %d failed: %s", mode, index, exc)
+
+    recorder.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(_worker)
+    wall_time = time.perf_counter() - start
+
+    stages = recorder.summary(wall_time)
+    end_to_end = stages.get(mode, summarize([], wall_time))
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": options.requests,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_per_s": end_to_end.get("throughput_per_s", 0.0),
+        "stages": stages,
+    }
+
+
+def run_benchmark(options: BenchmarkOptions, quiet: bool = True) -> dict:
+    """Run every mode at every concurrency level and return the results."""
+    recorder = StageRecorder()
+    levels = []
+    with aws_stand_ins(
+        recorder,
+        catalog_size=options.catalog_size,
+        embed_latency=options.embed_latency,
+        llm_latency=options.llm_latency,
+        knn_latency=options.knn_latency,
+        personalize_latency=options.personalize_latency,
+        completion=options.completion,
+    ) as fakes:
+        agent_module = _load_agent_module()
+        if quiet:
+            logging.getLogger().setLevel(logging.CRITICAL)
+        try:
+            with patch("tools.search_product.create_opensearch_client", return_value=fakes["opensearch"]):
+                # The default Strands callback handler prints every streamed token;
+                # keep that cost in the measurement but out of the report.
+                sink = io.StringIO() if quiet else sys.stdout
+                with contextlib.redirect_stdout(sink):
+                    for mode in options.modes:
+                        for concurrency in options.concurrency:
+                            levels.append(run_level(agent_module, mode, concurrency, options, recorder))
+        finally:
+            # The loaded modules hold configuration read from the stand-ins.
+            _unload_agent_modules()
+    return {"meta": _run_metadata(options), "levels": levels}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_AGENT_CORE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _run_metadata(options: BenchmarkOptions) -> dict:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": asdict(options),
+    }
+
+
+def write_results(results: dict, output_dir: Path, name: str = "agent") -> Path:
+    """Write *results* as ``<name>-<commit>-<timestamp>.json`` under *output_dir*."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = output_dir / f"{name}-{results['meta']['commit']}-{stamp}.json"
+    path.write_text(json.dumps(results, indent=2))
+    return path
+
+
+def format_report(results: dict) -> str:
+    """Render results as a fixed-width table, one row per mode/level/stage."""
+    header = f"{'mode':<7}{'conc':>5}  {'stage':<12}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}"
+    lines = [header, "-" * len(header)]
+    for level in results["levels"]:
+        for stage, summary in level["stages"].items():
+            lines.append(
+                f"{level['mode']:<7}{level['concurrency']:>5}  {stage:<12}"
+                f"{summary['count']:>6}{summary['errors']:>5}"
+                f"{summary.get('p50_ms', 0):>10.1f}{summary.get('p95_ms', 0):>10.1f}"
+                f"{summary.get('p99_ms', 0):>10.1f}{summary.get('throughput_per_s', 0):>9.2f}"
+            )
+    return "\n".join(lines)
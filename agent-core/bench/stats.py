@@ -0,0 +1,102 @@
+"""Latency recording and percentile summaries for the benchmark harness."""
+
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Return the *q*-th percentile (0-100) of an already sorted list.
+
+    Uses linear interpolation between closest ranks so small sample sets
+    still produce stable p95/p99 values.
+    """
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (q / 100.0) * (len(sorted_values) - 1)
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(samples: list[float], wall_time: float | None = None, errors: int = 0) -> dict:
+    """Summarize latency samples (seconds) into a JSON-serializable dict.
+
+    Args:
+        samples: Observed latencies in seconds.
+        wall_time: Elapsed wall-clock time for the run; enables throughput.
+        errors: Number of failed operations not included in *samples*.
+
+    Returns:
+        Dict with count, errors, mean, p50, p95, p99, max (milliseconds)
+        and ``throughput_per_s`` when *wall_time* is given.
+    """
+    ordered = sorted(samples)
+    summary: dict = {"count": len(ordered), "errors": errors}
+    if ordered:
+        summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3)
+        for q in (50, 95, 99):
+            summary[f"p{q}_ms"] = round(percentile(ordered, q) * 1000, 3)
+        summary["max_ms"] = round(ordered[-1] * 1000, 3)
+    if wall_time:
+        summary["throughput_per_s"] = round(len(ordered) / wall_time, 3)
+    return summary
+
+
+class StageRecorder:
+    """Thread-safe collector of per-stage latency samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: dict[str, list[float]] = defaultdict(list)
+        self._errors: dict[str, int] = defaultdict(int)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record one successful sample for *stage*."""
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def record_error(self, stage: str) -> None:
+        """Count one failed operation for *stage*."""
+        with self._lock:
+            self._errors[stage] += 1
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time the enclosed block as one sample of *stage*.
+
+        Exceptions are counted as errors for the stage and re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_error(stage)
+            raise
+        self.record(stage, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        """Discard all samples collected so far."""
+        with self._lock:
+            self._samples.clear()
+            self._errors.clear()
+
+    def summary(self, wall_time: float | None = None) -> dict[str, dict]:
+        """Return a per-stage summary of everything recorded so far."""
+        with self._lock:
+            stages = set(self._samples) | set(self._errors)
+            return {
+                stage: summarize(
+                    list(self._samples.get(stage, [])),
+                    wall_time,
+                    self._errors.get(stage, 0),
+                )
+                for stage in sorted(stages)
+            }
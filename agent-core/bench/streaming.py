@@ -0,0 +1,85 @@
+"""Micro-benchmark for the CLI stream parser: python -m bench.streaming [options]
+
+Streams a synthetic response (a thinking block followed by the answer)
+through StreamingResponseHandler in small chunks and reports per-run
+latency and throughput. With --echo the output is written to os.devnull
+so the cost of terminal redraws is included.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+import click
+
+from bench.stats import summarize
+from cli.streaming import StreamingResponseHandler
+
+
+class _ReplayStream:
+    """Async iterator over pre-encoded WebSocket messages."""
+
+    def __init__(self, messages: list[str]):
+        self._messages = iter(messages)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def build_messages(size: int, chunk_size: int, thinking_size: int) -> tuple[list[str], str]:
+    """Return the chunk messages for a *size*-character answer and the answer itself."""
+    sentence = "Here is a red running shoe with <b>free</b> shipping. "
+    answer = (sentence * (size // len(sentence) + 1))[:size]
+    raw = "<thinking>" + ("checking the catalog " * thinking_size)[:thinking_size] + "</thinking>" + answer
+    messages = [json.dumps({"chunk": raw[i:i + chunk_size]}) for i in range(0, len(raw), chunk_size)]
+    return messages, answer
+
+
+async def _consume(messages: list[str], echo: bool) -> tuple[str, float]:
+    handler = StreamingResponseHandler(suppress_echo=not echo, quiet=not echo)
+    start = time.perf_counter()
+    text, _ = await handler.handle_stream(_ReplayStream(messages))
+    return text, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--size", type=int, default=1_000_000, show_default=True, help="Answer length in characters")
+@click.option("--chunk-size", type=int, default=16, show_default=True, help="Characters per streamed chunk")
+@click.option("--thinking-size", type=int, default=2_000, show_default=True, help="Characters in the thinking block")
+@click.option("--runs", type=int, default=5, show_default=True, help="Timed runs")
+@click.option("--echo", is_flag=True, help="Echo output (to os.devnull) to include redraw cost")
+def main(size, chunk_size, thinking_size, runs, echo):
+    """Benchmark StreamingResponseHandler on a large chunked response."""
+    messages, answer = build_messages(size, chunk_size, thinking_size)
+    samples = []
+    for _ in range(runs):
+        if echo:
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                text, elapsed = asyncio.run(_consume(messages, echo=True))
+        else:
+            text, elapsed = asyncio.run(_consume(messages, echo=False))
+        if text != answer:
+            click.echo("Parsed response does not match the streamed answer", err=True)
+            sys.exit(1)
+        samples.append(elapsed)
+
+    summary = summarize(samples)
+    best = min(samples)
+    click.echo(f"{len(messages)} chunks of {chunk_size} chars, {size / 1e6:.2f} MB answer, echo={'on' if echo else 'off'}")
+    click.echo(
+        f"mean {summary['mean_ms']:.1f} ms | p50 {summary['p50_ms']:.1f} ms | max {summary['max_ms']:.1f} ms"
+    )
+    click.echo(f"best {size / best / 1e6:.1f} MB/s, {best / len(messages) * 1e6:.2f} us/chunk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""Local stand-ins for the AWS services the Sales Agent depends on.
+
+DynamoDB and SSM are served by moto. Bedrock Runtime, Personalize Runtime
+and the OpenSearch kNN endpoint have no moto backend, so they are replaced
+with in-process fakes that return canned data after a configurable delay
+and report their own latency to a :class:`~bench.stats.StageRecorder`.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import boto3
+import boto3.session
+
+from bench.stats import StageRecorder
+
+DEFAULT_COMPLETION = (
+    "Here are the products that best match your request. "
+    "Each item includes its ID, price and style so you can compare them."
+)
+
+_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "DynamoDB"
+_PARAMETER_PREFIX = "/agentcore/sales-agent/"
+_REGION = "us-east-1"
+_RECOMMENDER_ARN = "arn:aws:personalize:us-east-1:123456789012:recommender/bench"
+
+
+def canned_embedding(text: str, dimension: int = 1024) -> list[float]:
+    """Return a deterministic unit vector derived from *text*.
+
+    Identical text always maps to the same vector, so kNN results are
+    reproducible across runs and commits.
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _message_text(message: dict) -> str:
+    """Concatenate the text blocks of a Converse message."""
+    parts = []
+    for block in message.get("content", []):
+        if "text" in block:
+            parts.append(block["text"])
+        elif "guardContent" in block:
+            parts.append(block["guardContent"].get("text", {}).get("text", ""))
+    return "\n".join(parts)
+
+
+class FakeBedrockRuntime:
+    """Bedrock Runtime stand-in with canned embeddings and completions.
+
+    Supports ``invoke_model`` (Titan embeddings and Anthropic messages) and
+    ``converse_stream`` (used by the Strands ``BedrockModel``). The Converse
+    fake drives a single tool call followed by a text answer, mirroring
+    what the system prompt asks the real model to do.
+    """
+
+    def __init__(
+        self,
+        recorder: StageRecorder,
+        embed_latency: float = 0.05,
+        llm_latency: float = 0.3,
+        embedding_dimension: int = 1024,
+        completion: str = DEFAULT_COMPLETION,
+        chunk_size: int = 16,
+        meta_factory=None,
+    ):
+        self.recorder = recorder
+        self.embed_latency = embed_latency
+        self.llm_latency = llm_latency
+        self.embedding_dimension = embedding_dimension
+        self.completion = completion
+        self.chunk_size = chunk_size
+        self._meta_factory = meta_factory
+        self._meta = None
+
+    @property
+    def meta(self):
+        """Client metadata borrowed from a real (never called) botocore client."""
+        if self._meta is None:
+            factory = self._meta_factory or boto3.session.Session(region_name=_REGION).client
+            self._meta = factory("bedrock-runtime", region_name=_REGION).meta
+        return self._meta
+
+    def invoke_model(self, body, modelId, accept=None, contentType=None, **kwargs):
+        request = json.loads(body)
+        if "titan-embed" in modelId:
+            with self.recorder.time("embed"):
+                time.sleep(self.embed_latency)
+                text = request.get("inputText", "")
+                dimension = request.get("embeddingConfig", {}).get("outputEmbeddingLength", self.embedding_dimension)
+                payload = {
+                    "embedding": canned_embedding(text, dimension),
+                    "inputTextTokenCount": len(text.split()),
+                }
+        else:
+            with self.recorder.time("llm"):
+                time.sleep(self.llm_latency)
+                payload = {
+                    "content": [{"type": "text", "text": self.completion}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": len(body) // 4, "output_tokens": len(self.completion) // 4},
+                }
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+    def converse_stream(self, **request):
+        return {"stream": self._converse_events(request)}
+
+    def _converse_events(self, request: dict):
+        start = time.perf_counter()
+        time.sleep(self.llm_latency)
+        messages = request.get("messages", [])
+        last = messages[-1] if messages else {"content": []}
+        tool_names = {
+            tool["toolSpec"]["name"]
+            for tool in request.get("toolConfig", {}).get("tools", [])
+            if "toolSpec" in tool
+        }
+        has_tool_result = any("toolResult" in block for block in last.get("content", []))
+
+        yield {"messageStart": {"role": "assistant"}}
+        if tool_names and not has_tool_result:
+            name, tool_input = self._plan_tool_call(_message_text(last), tool_names)
+            yield {
+                "contentBlockStart": {
+                    "start": {"toolUse": {"toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}", "name": name}},
+                    "contentBlockIndex": 0,
+                }
+            }
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_input)}}, "contentBlockIndex": 0}}
+            yield {"contentBlockStop": {"contentBlockIndex": 0}}
+            stop_reason = "tool_use"
+        else:
+            for i in range(0, len(self.completion), self.chunk_size):
+                yield {
+                    "contentBlockDelta": {
+                        "delta": {"text": self.completion[i:i + self.chunk_size]},
+                        "contentBlockIndex": 0,
+                    }
+                }
+            yield {"contentBlockStop": {"contentBlockIndex": 0}}
+            stop_reason = "end_turn"
+        yield {"messageStop": {"stopReason": stop_reason}}
+        elapsed = time.perf_counter() - start
+        self.recorder.record("llm", elapsed)
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+                "metrics": {"latencyMs": int(elapsed * 1000)},
+            }
+        }
+
+    @staticmethod
+    def _plan_tool_call(prompt: str, tool_names: set[str]) -> tuple[str, dict]:
+        """Pick the tool the real model would choose for *prompt*."""
+        user_match = re.search(r"user(?:_id)?\s*:?\s*(\d+)", prompt, re.IGNORECASE)
+        if "get_recommendation" in tool_names and user_match:
+            return "get_recommendation", {"user_id": user_match.group(1)}
+        name = "search_product" if "search_product" in tool_names else sorted(tool_names)[0]
+        return name, {"condition": prompt.strip().splitlines()[-1] if prompt.strip() else prompt}
+
+
+class FakePersonalizeRuntime:
+    """Personalize Runtime stand-in returning items from the seeded catalog."""
+
+    def __init__(self, recorder: StageRecorder, item_ids: list[str], latency: float = 0.05):
+        self.recorder = recorder
+        self.item_ids = item_ids
+        self.latency = latency
+
+    def get_recommendations(self, recommenderArn, userId, numResults=25, **kwargs):
+        with self.recorder.time("personalize"):
+            time.sleep(self.latency)
+            rng = random.Random(str(userId))
+            picks = rng.sample(self.item_ids, min(numResults, len(self.item_ids)))
+            return {
+                "itemList": [
+                    {"itemId": item_id, "score": round(1.0 / (rank + 1), 4)}
+                    for rank, item_id in enumerate(picks)
+                ]
+            }
+
+
+class FakeOpenSearch:
+    """In-memory kNN index answering ``search`` by brute-force cosine similarity."""
+
+    def __init__(self, recorder: StageRecorder, latency: float = 0.02, embedding_dimension: int = 1024):
+        self.recorder = recorder
+        self.latency = latency
+        self.embedding_dimension = embedding_dimension
+        self.documents: dict[str, dict] = {}
+        self.indices = SimpleNamespace(get_mapping=self._get_mapping)
+
+    def _get_mapping(self, index, **kwargs):
+        meta = {"embedding_dimension": self.embedding_dimension, "quantization": "none"}
+        return {index: {"mappings": {"_meta": meta, "properties": {}}}}
+
+    def index(self, index, body, id=None, **kwargs):
+        doc_id = id or uuid.uuid4().hex
+        self.documents[doc_id] = body
+        return {"_id": doc_id, "result": "created"}
+
+    def search(self, body, index=None, **kwargs):
+        with self.recorder.time("knn"):
+            start = time.perf_counter()
+            knn = body["query"]["knn"]
+            field, params = next(iter(knn.items()))
+            query = params["vector"]
+            k = params.get("k", 10)
+            fields = body.get("_source")
+            scored = []
+            for doc_id, doc in self.documents.items():
+                vector = doc.get(field)
+                if vector is None:
+                    continue
+                cosine = sum(a * b for a, b in zip(query, vector))
+                # AOSS cosinesimil scores are (1 + cosine) / 2
+                scored.append(((1 + cosine) / 2, doc_id, doc))
+            scored.sort(key=lambda entry: entry[0], reverse=True)
+            hits = []
+            for score, doc_id, doc in scored[: min(k, body.get("size", k))]:
+                source = {f: doc.get(f) for f in fields} if fields else dict(doc)
+                hits.append({"_id": doc_id, "_score": score, "_source": source})
+            # Brute-force scoring counts towards the configured latency so the
+            # stage reflects the endpoint, not the size of the fake catalog.
+            time.sleep(max(0.0, self.latency - (time.perf_counter() - start)))
+            return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+
+
+def load_catalog(size: int) -> tuple[list[dict], list[dict]]:
+    """Return up to *size* items and all users from ``data/DynamoDB``."""
+    with open(_DATA_DIR / "items.csv", newline="") as f:
+        items = list(csv.DictReader(f))[:size]
+    with open(_DATA_DIR / "users.csv", newline="") as f:
+        users = list(csv.DictReader(f))
+    return items, users
+
+
+def _seed_dynamodb(items: list[dict], users: list[dict]) -> None:
+    dynamodb = boto3.resource("dynamodb", region_name=_REGION)
+    for name, key, key_type in (("item_table", "ITEM_ID", "S"), ("user_table", "USER_ID", "N")):
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": key_type}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+    history = [item["ITEM_ID"] for item in items[:3]]
+    with dynamodb.Table("item_table").batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=dict(item))
+    with dynamodb.Table("user_table").batch_writer() as batch:
+        for user in users:
+            batch.put_item(Item={
+                "USER_ID": int(user["USER_ID"]),
+                "AGE": int(user["AGE"]),
+                "GENDER": user["GENDER"],
+                "visted": history[:1],
+                "add_to_cart": history[1:2],
+                "purchased": history[2:3],
+            })
+
+
+def _seed_parameter_store() -> None:
+    ssm = boto3.client("ssm", region_name=_REGION)
+    for name, value in (
+        ("aoss_collection_id", "bench-collection"),
+        ("aoss_region", _REGION),
+        ("item_table_name", "item_table"),
+        ("user_table_name", "user_table"),
+        ("recommender_arn", _RECOMMENDER_ARN),
+    ):
+        ssm.put_parameter(Name=f"{_PARAMETER_PREFIX}{name}", Value=value, Type="String")
+
+
+@contextmanager
+def aws_stand_ins(
+    recorder: StageRecorder,
+    catalog_size: int = 500,
+    embed_latency: float = 0.05,
+    llm_latency: float = 0.3,
+    knn_latency: float = 0.02,
+    personalize_latency: float = 0.05,
+    completion: str = DEFAULT_COMPLETION,
+):
+    """Run the enclosed block with every AWS dependency served locally.
+
+    Seeds moto DynamoDB tables and SSM parameters from ``data/DynamoDB``,
+    routes ``bedrock-runtime`` and ``personalize-runtime`` clients to the
+    fakes, and yields a dict with the fakes so the caller can patch the
+    OpenSearch client factory.
+    """
+    from moto import mock_aws
+
+    env = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": _REGION,
+        "AWS_REGION": _REGION,
+        "PARAMETER_STORE_PREFIX": _PARAMETER_PREFIX,
+        "MEMORY_ID": "",
+    }
+    with patch.dict(os.environ, env), mock_aws():
+        items, users = load_catalog(catalog_size)
+        _seed_dynamodb(items, users)
+        _seed_parameter_store()
+
+        real_client = boto3.session.Session.client
+        bedrock = FakeBedrockRuntime(
+            recorder,
+            embed_latency=embed_latency,
+            llm_latency=llm_latency,
+            completion=completion,
+            meta_factory=lambda *a, **kw: real_client(boto3.session.Session(), *a, **kw),
+        )
+        personalize = FakePersonalizeRuntime(
+            recorder, [item["ITEM_ID"] for item in items], latency=personalize_latency
+        )
+        opensearch = FakeOpenSearch(recorder, latency=knn_latency, embedding_dimension=bedrock.embedding_dimension)
+        for item in items:
+            description = f"{item['NAME']} in the {item['STYLE']} style"
+            opensearch.index(
+                index="product-search-multimodal-index",
+                id=item["ITEM_ID"],
+                body={
+                    "item_id": item["ITEM_ID"],
+                    "image_path": item["IMAGE"],
+                    "image_product_description": description,
+                    "price": item["PRICE"],
+                    "style": item["STYLE"],
+                    "multimodal_vector": canned_embedding(description, bedrock.embedding_dimension),
+                },
+            )
+
+        fakes = {"bedrock-runtime": bedrock, "personalize-runtime": personalize}
+
+        def _client(self, *args, **kwargs):
+            service = kwargs.get("service_name") or (args[0] if args else None)
+            if service in fakes:
+                return fakes[service]
+            return real_client(self, *args, **kwargs)
+
+        with patch.object(boto3.session.Session, "client", _client):
+            # boto3.client() uses a cached default session; make sure it
+            # resolves through the patched Session.client as well.
+            boto3.DEFAULT_SESSION = None
+            yield {"bedrock": bedrock, "personalize": personalize, "opensearch": opensearch}
+        boto3.DEFAULT_SESSION = None
@@ -0,0 +1,240 @@
+"""Concurrent load generation against a deployed AgentCore runtime."""
+
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import click
+
+from .streaming import StreamingResponseHandler
+
+ARRIVAL_MODES = ("closed", "poisson")
+
+
+@dataclass
+class LoadConfig:
+    """Parameters for one load-generation run."""
+
+    sessions: int = 4
+    requests: int | None = None
+    arrival: str = "closed"
+    rate: float = 1.0
+    think_time: float = 0.0
+    open_timeout: float = 120.0
+    seed: int | None = None
+
+
+@dataclass
+class RequestRecord:
+    """Client-side measurements for a single request."""
+
+    index: int
+    session: int
+    connect_time: float | None = None
+    queue_time: float | None = None
+    time_to_first_token: float | None = None
+    total_duration: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class _Connection:
+    websocket: object = None
+    session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+
+def load_prompts(path: Path) -> list[dict]:
+    """Read prompts from a JSONL file.
+
+    Each line is either a JSON string or an object with a ``prompt`` key;
+    any other keys (e.g. ``actor_id``) are sent along with the prompt.
+    Blank lines are skipped.
+    """
+    prompts = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise click.ClickException(f"{path}:{line_no}: invalid JSON ({exc.msg})")
+            if isinstance(entry, str):
+                entry = {"prompt": entry}
+            if not isinstance(entry, dict) or not entry.get("prompt"):
+                raise click.ClickException(f"{path}:{line_no}: expected a string or an object with 'prompt'")
+            prompts.append(entry)
+    if not prompts:
+        raise click.ClickException(f"No prompts found in {path}")
+    return prompts
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Return the *q*-th percentile (0-100) of a sorted list by linear interpolation."""
+    if not sorted_values:
+        return None
+    rank = (q / 100.0) * (len(sorted_values) - 1)
+    lower, upper = math.floor(rank), math.ceil(rank)
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def _latency_summary(values: list[float]) -> dict:
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return {"count": 0}
+    summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered)}
+    for q in (50, 90, 95, 99):
+        summary[f"p{q}"] = percentile(ordered, q)
+    summary["max"] = ordered[-1]
+    return summary
+
+
+def build_report(records: list[RequestRecord], wall_time: float, config: LoadConfig) -> dict:
+    """Aggregate per-request records into a machine-readable report."""
+    ok = [r for r in records if r.error is None]
+    errors: dict[str, int] = {}
+    for r in records:
+        if r.error is not None:
+            errors[r.error] = errors.get(r.error, 0) + 1
+    return {
+        "config": asdict(config),
+        "wall_time": wall_time,
+        "requests": len(records),
+        "succeeded": len(ok),
+        "failed": len(records) - len(ok),
+        "error_rate": (len(records) - len(ok)) / len(records) if records else 0.0,
+        "throughput": len(ok) / wall_time if wall_time > 0 else 0.0,
+        "errors": errors,
+        "latency": {
+            "connect": _latency_summary([r.connect_time for r in records]),
+            "queue": _latency_summary([r.queue_time for r in ok]),
+            "ttfb": _latency_summary([r.time_to_first_token for r in ok]),
+            "total": _latency_summary([r.total_duration for r in ok]),
+        },
+        "records": [asdict(r) for r in records],
+    }
+
+
+def format_report(report: dict) -> str:
+    """Render a report as a human-readable table."""
+    lines = [
+        f"Requests: {report['requests']} "
+        f"(ok {report['succeeded']}, failed {report['failed']}, "
+        f"error rate {report['error_rate']:.1%})",
+        f"Wall time: {report['wall_time']:.2f}s | Throughput: {report['throughput']:.2f} req/s",
+        "",
+        f"{'metric':<10}{'n':>6}{'mean':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+    ]
+    for name, summary in report["latency"].items():
+        if not summary["count"]:
+            continue
+        lines.append(
+            f"{name:<10}{summary['count']:>6}"
+            + "".join(f"{summary[k]:>8.2f}s" for k in ("mean", "p50", "p90", "p95", "p99", "max"))
+        )
+    if report["errors"]:
+        lines.append("")
+        lines.append("Errors:")
+        for message, count in sorted(report["errors"].items(), key=lambda e: -e[1]):
+            lines.append(f"  {count:>5} × {message}")
+    return "\n".join(lines)
+
+
+async def run_load(
+    url_factory: Callable[[], str],
+    prompts: list[dict],
+    config: LoadConfig,
+    connect: Callable[..., Awaitable] | None = None,
+) -> dict:
+    """Replay *prompts* across ``config.sessions`` concurrent sessions.
+
+    Each session keeps one WebSocket open and reuses it for all of its
+    requests, reconnecting with a fresh presigned URL only after a failure.
+    In ``closed`` mode every session sends its next prompt as soon as the
+    previous response (plus ``think_time``) completes. In ``poisson`` mode
+    requests arrive at ``rate`` per second with exponential inter-arrival
+    times regardless of how quickly responses come back; time spent waiting
+    for a free session is reported as ``queue`` latency.
+    """
+    if connect is None:
+        import websockets
+
+        connect = websockets.connect
+
+    total = config.requests or len(prompts)
+    rng = random.Random(config.seed)
+    queue: asyncio.Queue = asyncio.Queue()
+    records: list[RequestRecord] = []
+
+    async def _open(conn: _Connection, record: RequestRecord) -> None:
+        start = time.monotonic()
+        url = await asyncio.to_thread(url_factory)
+        conn.websocket = await connect(url, open_timeout=config.open_timeout, close_timeout=10)
+        record.connect_time = time.monotonic() - start
+
+    async def _close(conn: _Connection) -> None:
+        if conn.websocket is not None:
+            try:
+                await conn.websocket.close()
+            except Exception:
+                pass
+            conn.websocket = None
+
+    async def _session(session_no: int) -> None:
+        conn = _Connection()
+        try:
+            while True:
+                job = await queue.get()
+                if job is None:
+                    return
+                index, scheduled = job
+                record = RequestRecord(index=index, session=session_no)
+                if config.arrival == "poisson":
+                    record.queue_time = time.monotonic() - scheduled
+                records.append(record)
+                entry = prompts[index % len(prompts)]
+                payload = {**entry, "session_id": conn.session_id}
+                try:
+                    if conn.websocket is None:
+                        await _open(conn, record)
+                    await conn.websocket.send(json.dumps(payload))
+                    handler = StreamingResponseHandler(quiet=True)
+                    response_text, metrics = await handler.handle_stream(conn.websocket)
+                    record.time_to_first_token = metrics.time_to_first_token
+                    record.total_duration = metrics.total_duration
+                    if handler.error is not None:
+                        record.error = handler.error
+                        if handler.connection_lost:
+                            await _close(conn)
+                    elif not response_text:
+                        # The stream ended without a result: the server closed the socket.
+                        record.error = "connection closed before response"
+                        await _close(conn)
+                except Exception as exc:
+                    record.error = f"{type(exc).__name__}: {exc}"
+                    await _close(conn)
+                if config.arrival == "closed" and config.think_time > 0:
+                    await asyncio.sleep(config.think_time)
+        finally:
+            await _close(conn)
+
+    async def _arrivals() -> None:
+        for index in range(total):
+            if config.arrival == "poisson":
+                await asyncio.sleep(rng.expovariate(config.rate))
+            queue.put_nowait((index, time.monotonic()))
+        for _ in range(config.sessions):
+            queue.put_nowait(None)
+
+    start = time.monotonic()
+    await asyncio.gather(_arrivals(), *(_session(i) for i in range(config.sessions)))
+    wall_time = time.monotonic() - start
+    records.sort(key=lambda r: r.index)
+    return build_report(records, wall_time, config)
@@ -0,0 +1,89 @@
+"""On-disk cache of resolved stack context (outputs, runtime ARN, log group)."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_TTL_S = 3600.0
+
+def identity_fingerprint(session) -> str | None:
+    """Identify the caller's credentials without a network round trip.
+
+    The key combines the profile name with the access key ID; region and
+    stack name are added by :meth:`StackCache.key`. The access key ID ties
+    an entry to the credentials it was written with, so a profile that is
+    repointed at another account never gets the old account's outputs,
+    and temporary credentials (SSO, assumed roles) start a new entry when
+    they are refreshed. The account itself would take an STS
+    ``GetCallerIdentity`` call on every command, which is the round trip
+    the cache exists to skip. Returns None when no credentials are
+    configured, in which case nothing is cached.
+    """
+    credentials = session.get_credentials()
+    if credentials is None:
+        return None
+    raw = f"profile:{session.profile_name or '-'}/key:{credentials.access_key}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class StackCache:
+    """JSON file of per-(identity, region, stack) entries that expire after *ttl* seconds.
+
+    Entries hold the account ID, stack outputs, runtime ARN and log group.
+    Reads never raise: a missing, corrupt or expired file is a cache miss.
+    Writes go through a temporary file so concurrent CLI runs never see a
+    half-written cache.
+    """
+
+    def __init__(self, path: Path | None = None, ttl: float = DEFAULT_TTL_S):
+        self.path = Path(path) if path else Path.home() / ".sales-agent-cli" / "cache.json"
+        self.ttl = ttl
+
+    @staticmethod
+    def key(identity: str, region: str | None, stack_name: str) -> str:
+        return f"{identity}/{region or '-'}/{stack_name}"
+
+    def _read(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".cache-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+
+    def get(self, key: str) -> dict | None:
+        if self.ttl <= 0:
+            return None
+        entry = self._read().get(key)
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - entry.get("saved_at", 0) > self.ttl:
+            return None
+        return entry
+
+    def put(self, key: str, **fields) -> None:
+        if self.ttl <= 0:
+            return
+        data = self._read()
+        now = time.time()
+        # Drop other expired entries while the file is being rewritten anyway.
+        data = {k: v for k, v in data.items() if isinstance(v, dict) and now - v.get("saved_at", 0) <= self.ttl}
+        data[key] = {**{k: v for k, v in fields.items() if v is not None}, "saved_at": now}
+        self._write(data)
+
+    def invalidate(self, key: str) -> None:
+        data = self._read()
+        if data.pop(key, None) is not None:
+            self._write(data)
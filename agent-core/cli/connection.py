@@ -0,0 +1,144 @@
+"""Long-lived WebSocket connection to the agent for interactive sessions."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from typing import Awaitable, Callable
+
+from .streaming import PerformanceMetrics, StreamingResponseHandler
+
+
+async def read_input(prompt: Callable[[], str]) -> str:
+    """Run a blocking ``prompt`` on a daemon thread and await its result.
+
+    ``asyncio.to_thread`` would park the read on the default executor, which
+    ``asyncio.run`` joins on shutdown, so Ctrl-C at the prompt would hang
+    until the user typed a line. A daemon thread is simply abandoned.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _resolve(result, exc):
+        if future.done():
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    def _run():
+        try:
+            result, exc = prompt(), None
+        except Exception as error:
+            result, exc = None, error
+        try:
+            loop.call_soon_threadsafe(_resolve, result, exc)
+        except RuntimeError:
+            pass  # loop already closed
+
+    threading.Thread(target=_run, name="chat-input", daemon=True).start()
+    return await future
+
+
+def read_stdin_line() -> str:
+    """Read one line from the stdin file descriptor, bypassing ``sys.stdin``'s buffer."""
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        chunk = os.read(sys.stdin.fileno(), 1)
+        if not chunk:
+            if not data:
+                raise EOFError
+            break
+        data += chunk
+    return data.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r\n")
+
+
+class AgentConnection:
+    """One WebSocket reused across chat turns, reopened only when needed.
+
+    The socket is opened lazily with a freshly presigned URL and kept alive
+    with protocol pings while the user is typing, so later turns skip DNS,
+    TLS and SigV4 setup. Presigned URLs are only checked when a connection
+    is opened, so an expired URL never affects an open socket; when the
+    socket drops, the next turn reconnects with a new URL. A turn whose
+    connection dies before any response arrives is resent once on the new
+    connection; one that fails mid-response is reported, not repeated.
+    """
+
+    def __init__(
+        self,
+        url_factory: Callable[[], str],
+        connect: Callable[..., Awaitable] | None = None,
+        open_timeout: float = 120.0,
+        ping_interval: float = 20.0,
+        ping_timeout: float = 20.0,
+    ):
+        if connect is None:
+            import websockets
+
+            connect = websockets.connect
+        self._url_factory = url_factory
+        self._connect = connect
+        self.open_timeout = open_timeout
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.websocket = None
+        self.connects = 0
+
+    async def open(self) -> dict[str, float]:
+        """Open a new connection; return its ``presign_time`` and ``connect_time`` in seconds."""
+        await self.close()
+        start = time.monotonic()
+        url = await asyncio.to_thread(self._url_factory)
+        presigned = time.monotonic()
+        self.websocket = await self._connect(
+            url,
+            open_timeout=self.open_timeout,
+            close_timeout=10,
+            ping_interval=self.ping_interval,
+            ping_timeout=self.ping_timeout,
+        )
+        self.connects += 1
+        return {"presign_time": presigned - start, "connect_time": time.monotonic() - presigned}
+
+    async def close(self) -> None:
+        if self.websocket is not None:
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+            self.websocket = None
+
+    async def send_turn(
+        self, payload: dict, handler_factory: Callable[[], StreamingResponseHandler]
+    ) -> tuple[str, PerformanceMetrics, dict[str, float] | None, StreamingResponseHandler]:
+        """Send one prompt and stream the reply.
+
+        Returns (response_text, metrics, phases, handler); phases holds the
+        presign and connect times from :meth:`open`, or is None when the
+        existing connection was reused.
+        """
+        phases = None
+        for attempt in range(2):
+            if self.websocket is None:
+                phases = await self.open()
+            handler = handler_factory()
+            try:
+                await self.websocket.send(json.dumps(payload))
+            except Exception:
+                # Dropped while idle (server timeout, network change): reconnect and resend.
+                await self.close()
+                if attempt:
+                    raise
+                continue
+            response_text, metrics = await handler.handle_stream(self.websocket)
+            received = bool(response_text) or metrics.time_to_first_token is not None
+            if handler.connection_lost or (not received and handler.error is None):
+                await self.close()
+                if not received and attempt == 0:
+                    continue
+            return response_text, metrics, phases, handler
+        return response_text, metrics, phases, handler
@@ -0,0 +1,226 @@
+"""Paginated and follow-mode reading of CloudWatch log events."""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+SHARD_MODES = ("time", "stream")
+
+# filter_log_events accepts at most this many logStreamNames per call.
+MAX_STREAMS_PER_CALL = 100
+
+_DONE = object()
+
+# Events can become visible a few seconds after their timestamp, so each
+# follow poll re-reads this window and drops IDs it has already yielded.
+FOLLOW_LOOKBACK_MS = 5_000
+
+
+def iter_log_events(client, **kwargs) -> Iterator[dict]:
+    """Yield every event matching a ``filter_log_events`` query, page by page.
+
+    Follows ``nextToken`` until CloudWatch stops returning one, so long time
+    ranges are no longer truncated at the first page. Pages are yielded as
+    soon as they arrive; nothing is buffered beyond the current page.
+    """
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    while True:
+        response = client.filter_log_events(**kwargs)
+        yield from response.get("events", [])
+        token = response.get("nextToken")
+        # An unchanged token means the end of the range has been reached.
+        if not token or token == kwargs.get("nextToken"):
+            return
+        kwargs["nextToken"] = token
+
+
+class EventDeduper:
+    """Remember recently yielded event IDs so overlapping polls are silent."""
+
+    def __init__(self, lookback_ms: int = FOLLOW_LOOKBACK_MS):
+        self.lookback_ms = lookback_ms
+        self.latest = None
+        self._seen: dict[str, int] = {}
+
+    def add(self, event: dict) -> bool:
+        """Record *event*; return False if it was already seen."""
+        event_id = event.get("eventId")
+        timestamp = event.get("timestamp", 0)
+        if event_id is not None:
+            if event_id in self._seen:
+                return False
+            self._seen[event_id] = timestamp
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+        return True
+
+    def cursor(self) -> int | None:
+        """Start time for the next poll; prunes IDs older than the window."""
+        if self.latest is None:
+            return None
+        start = self.latest - self.lookback_ms
+        self._seen = {k: ts for k, ts in self._seen.items() if ts >= start}
+        return start
+
+
+def follow_log_events(
+    client,
+    *,
+    min_interval: float = 1.0,
+    max_interval: float = 30.0,
+    sleep: Callable[[float], None] = time.sleep,
+    deduper: EventDeduper | None = None,
+    **kwargs,
+) -> Iterator[dict]:
+    """Yield new events forever, polling like ``tail -f``.
+
+    Each poll reads every page from the newest event seen so far (minus a
+    short lookback for late arrivals). When a poll finds nothing new the
+    wait doubles up to *max_interval*; any new event resets it to
+    *min_interval*. Pass the *deduper* used for an initial read to continue
+    from where it stopped.
+    """
+    start_time = kwargs.pop("startTime", None)
+    kwargs.pop("endTime", None)
+    kwargs.pop("limit", None)
+    deduper = deduper or EventDeduper()
+    interval = min_interval
+    while True:
+        cursor = deduper.cursor()
+        found = False
+        for event in iter_log_events(client, startTime=cursor if cursor is not None else start_time, **kwargs):
+            if deduper.add(event):
+                found = True
+                yield event
+        interval = min_interval if found else min(interval * 2, max_interval)
+        sleep(interval)
+
+
+def time_slices(start: int, end: int, count: int) -> list[tuple[int, int]]:
+    """Split the inclusive millisecond window [start, end] into *count* slices."""
+    count = max(1, min(count, end - start + 1))
+    bounds = [start + (end - start + 1) * i // count for i in range(count + 1)]
+    return [(lo, hi - 1) for lo, hi in zip(bounds, bounds[1:])]
+
+
+def stream_shards(client, log_group: str, start: int, end: int, count: int) -> list[list[str]]:
+    """Group the log streams active in [start, end] into at most *count* shards.
+
+    Streams are dealt round-robin by recent activity so shards carry similar
+    load; each shard stays within the per-call logStreamNames limit.
+    """
+    names = []
+    kwargs = {"logGroupName": log_group, "orderBy": "LastEventTime", "descending": True}
+    while True:
+        response = client.describe_log_streams(**kwargs)
+        for stream in response.get("logStreams", []):
+            last = stream.get("lastEventTimestamp", stream.get("creationTime", 0))
+            first = stream.get("firstEventTimestamp", stream.get("creationTime", 0))
+            if last < start:
+                # Ordered by last event time: every remaining stream is older.
+                return _deal(names, count)
+            if first <= end:
+                names.append(stream["logStreamName"])
+        token = response.get("nextToken")
+        if not token:
+            return _deal(names, count)
+        kwargs["nextToken"] = token
+
+
+def _deal(names: list[str], count: int) -> list[list[str]]:
+    count = max(count, -(-len(names) // MAX_STREAMS_PER_CALL), 1)
+    return [shard for shard in (names[i::count] for i in range(count)) if shard]
+
+
+def parallel_log_events(
+    client,
+    *,
+    startTime: int,
+    endTime: int,
+    workers: int = 4,
+    shard_by: str = "time",
+    slices: int | None = None,
+    queue_size: int = 1000,
+    **kwargs,
+) -> Iterator[dict]:
+    """Fetch [startTime, endTime] with *workers* concurrent paginated queries.
+
+    ``shard_by="time"`` splits the window into disjoint slices (default four
+    per worker, to even out bursty periods). Slices are emitted in order, so
+    output starts as soon as the earliest slice has its first page.
+    ``shard_by="stream"`` splits the log streams active in the window
+    instead and merges the shards with a heap on timestamp.
+
+    Each shard is read on a pool thread into its own queue of at most
+    *queue_size* events, so workers running ahead of the output block
+    instead of buffering the whole window. Closing the generator stops the
+    remaining fetches after their current page.
+    """
+    if shard_by not in SHARD_MODES:
+        raise ValueError(f"shard_by must be one of {SHARD_MODES}, got {shard_by!r}")
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    if shard_by == "time":
+        queries = [
+            {**kwargs, "startTime": lo, "endTime": hi}
+            for lo, hi in time_slices(startTime, endTime, slices or workers * 4)
+        ]
+    else:
+        kwargs.pop("logStreamNames", None)
+        shards = stream_shards(client, kwargs["logGroupName"], startTime, endTime, slices or workers)
+        queries = [
+            {**kwargs, "startTime": startTime, "endTime": endTime, "logStreamNames": names}
+            for names in shards
+        ]
+
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in queries]
+
+    def _put(out, item):
+        # Wait for room while the merge is behind; give up once stopped.
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch(query, out):
+        try:
+            for event in iter_log_events(client, **query):
+                if not _put(out, event):
+                    return
+        except Exception as exc:
+            _put(out, exc)
+        finally:
+            _put(out, _DONE)
+
+    def _drain(out):
+        while True:
+            item = out.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    # Time slices are drained in submission order, so a bounded pool always
+    # frees up for the next one. The heap merge needs every stream shard
+    # running at once, or a full queue would leave later shards unstarted.
+    pool_size = workers if shard_by == "time" else max(workers, len(queries))
+    pool = ThreadPoolExecutor(max_workers=max(1, pool_size), thread_name_prefix="logs")
+    try:
+        for query, out in zip(queries, queues):
+            pool.submit(_fetch, query, out)
+        streams = [_drain(out) for out in queues]
+        if shard_by == "time":
+            yield from itertools.chain.from_iterable(streams)
+        else:
+            yield from heapq.merge(*streams, key=lambda e: (e.get("timestamp", 0), e.get("eventId", "")))
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
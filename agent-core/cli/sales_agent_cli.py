@@ -1,45 +1,101 @@
 """Sales Agent CLI — interact with your deployed AgentCore agent."""
 
-import asyncio
 import json
 import re
+import sys
+import time
 import uuid
+from collections import deque
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-import websockets
 
-import boto3
-from botocore.exceptions import ClientError
-from bedrock_agentcore.runtime import AgentCoreRuntimeClient
+# boto3, botocore, websockets and bedrock_agentcore are imported inside the
+# commands that use them so `version` and `--help` start without them.
 
 try:
     from . import __version__
-    from .streaming import StreamingResponseHandler, format_agent_label
+    from .cache import DEFAULT_TTL_S, StackCache, identity_fingerprint
+    from .logs import SHARD_MODES
 except ImportError:
-    import sys
     from pathlib import Path
     _parent = str(Path(__file__).resolve().parent.parent)
     if _parent not in sys.path:
         sys.path.insert(0, _parent)
+    # Run as a script: make the relative imports inside commands resolve (PEP 366).
+    __package__ = "cli"
     from cli import __version__
-    from cli.streaming import StreamingResponseHandler, format_agent_label
+    from cli.cache import DEFAULT_TTL_S, StackCache, identity_fingerprint
+    from cli.logs import SHARD_MODES
+
+if TYPE_CHECKING:
+    import boto3
 
 class SalesAgentCLI:
     """Manages stack context and AWS client interactions for all CLI commands."""
 
-    def __init__(self, stack_name: str, verbosity: int = 0):
+    def __init__(self, stack_name: str, verbosity: int = 0, cache: StackCache | None = None):
         self.stack_name = stack_name
         self.verbosity = verbosity
+        import boto3
+
         self.stack_outputs: dict[str, str] = {}
-        self.session: boto3.Session = boto3.Session()
+        self.session: "boto3.Session" = boto3.Session()
+        self.account_id: str | None = None
+        self.runtime_arn: str | None = None
+        self.cache = cache
+        self._cache_key: str | None = None
+
+    def _get_cache_key(self) -> str | None:
+        if self.cache is None:
+            return None
+        if self._cache_key is None:
+            identity = identity_fingerprint(self.session)
+            if identity is None:
+                return None
+            self._cache_key = StackCache.key(identity, self.session.region_name, self.stack_name)
+        return self._cache_key
+
+    def load_cached(self) -> bool:
+        """Restore stack context from the on-disk cache. Returns True on a hit."""
+        key = self._get_cache_key()
+        entry = self.cache.get(key) if key else None
+        if not entry or "stack_outputs" not in entry:
+            return False
+        self.account_id = entry.get("account_id")
+        self.stack_outputs = entry["stack_outputs"]
+        self.runtime_arn = entry.get("runtime_arn")
+        if self.verbosity >= 1:
+            click.echo(f"Using cached stack context for '{self.stack_name}' (--refresh to reload)")
+        return True
+
+    def save_cache(self) -> None:
+        key = self._get_cache_key()
+        if key:
+            self.cache.put(
+                key,
+                account_id=self.account_id,
+                stack_outputs=self.stack_outputs,
+                runtime_arn=self.runtime_arn,
+                log_group=self._derive_log_group(),
+            )
+
+    def invalidate_cache(self) -> None:
+        """Forget the cached context, e.g. after the runtime answered 403/404."""
+        key = self._get_cache_key()
+        if key:
+            self.cache.invalidate(key)
 
     def validate_credentials(self) -> dict:
         """Call STS GetCallerIdentity. Raises ClickException on failure."""
+        from botocore.exceptions import ClientError
+
         try:
             sts = self.create_client("sts")
             identity = sts.get_caller_identity()
+            self.account_id = identity.get("Account")
             if self.verbosity >= 1:
                 click.echo(
                     f"Authenticated as {identity.get('Arn', 'unknown')}"
@@ -54,6 +110,8 @@ class SalesAgentCLI:
 
     def validate_stack(self) -> dict[str, str]:
         """Call describe_stacks, cache outputs. Raises ClickException if not found."""
+        from botocore.exceptions import ClientError
+
         try:
             cfn = self.create_client("cloudformation")
             response = cfn.describe_stacks(StackName=self.stack_name)
@@ -81,6 +139,13 @@ class SalesAgentCLI:
             )
 
     def get_runtime_arn(self) -> str:
+        """Return the runtime ARN, resolving and caching it on first use."""
+        if self.runtime_arn is None:
+            self.runtime_arn = self._resolve_runtime_arn()
+            self.save_cache()
+        return self.runtime_arn
+
+    def _resolve_runtime_arn(self) -> str:
         """Return RuntimeArn from stack outputs, or attempt SDK fallback."""
         arn = self.stack_outputs.get("RuntimeArn")
         if arn:
@@ -102,7 +167,7 @@ class SalesAgentCLI:
             # If no name match, return the first runtime if only one exists
             if len(runtimes) == 1:
                 return runtimes[0]["agentRuntimeArn"]
-        except (ClientError, Exception) as exc:
+        except Exception as exc:
             if self.verbosity >= 2:
                 click.echo(f"SDK fallback failed: {exc}")
 
@@ -114,6 +179,16 @@ class SalesAgentCLI:
 
     def get_log_group(self) -> str:
         """Derive log group from RuntimeId: /aws/bedrock-agentcore/runtimes/{id}-DEFAULT."""
+        log_group = self._derive_log_group()
+        if log_group:
+            return log_group
+
+        raise click.ClickException(
+            "Could not determine log group. "
+            "Stack outputs missing 'RuntimeId' and 'RuntimeArn'."
+        )
+
+    def _derive_log_group(self) -> str | None:
         runtime_id = self.stack_outputs.get("RuntimeId")
         if runtime_id:
             return f"/aws/bedrock-agentcore/runtimes/{runtime_id}-DEFAULT"
@@ -126,13 +201,9 @@ class SalesAgentCLI:
             if len(parts) >= 2:
                 runtime_id = parts[-1]
                 return f"/aws/bedrock-agentcore/runtimes/{runtime_id}-DEFAULT"
+        return None
 
-        raise click.ClickException(
-            "Could not determine log group. "
-            "Stack outputs missing 'RuntimeId' and 'RuntimeArn'."
-        )
-
-    def create_client(self, service: str) -> boto3.client:
+    def create_client(self, service: str):
         """Create a boto3 client for the given service."""
         return self.session.client(service)
 
@@ -150,12 +221,27 @@ class SalesAgentCLI:
     count=True,
     help="Increase verbosity (-v verbose, -vv debug)",
 )
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Ignore the cached stack outputs and runtime ARN and look them up again",
+)
+@click.option(
+    "--cache-ttl",
+    envvar="SALES_AGENT_CLI_CACHE_TTL",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TTL_S,
+    show_default=True,
+    help="Seconds to reuse cached stack context (0 disables the cache)",
+)
 @click.pass_context
-def cli(ctx, stack_name, verbose):
+def cli(ctx, stack_name, verbose, refresh, cache_ttl):
     """Sales Agent CLI — interact with your deployed AgentCore agent."""
     ctx.ensure_object(dict)
     ctx.obj["verbosity"] = verbose
     ctx.obj["stack_name"] = stack_name
+    ctx.obj["refresh"] = refresh
+    ctx.obj["cache_ttl"] = cache_ttl
 
 
 @cli.command()
@@ -171,13 +257,36 @@ def _get_cli(ctx):
         raise click.ClickException(
             "Stack name is required. Use --stack-name or set AGENTCORE_STACK_NAME."
         )
-    cli_instance = SalesAgentCLI(stack_name, ctx.obj.get("verbosity", 0))
-    cli_instance.validate_credentials()
-    cli_instance.validate_stack()
+    cache = StackCache(ttl=ctx.obj.get("cache_ttl", DEFAULT_TTL_S))
+    cli_instance = SalesAgentCLI(stack_name, ctx.obj.get("verbosity", 0), cache=cache)
+    if ctx.obj.get("refresh") or not cli_instance.load_cached():
+        cli_instance.validate_credentials()
+        cli_instance.validate_stack()
+        cli_instance.save_cache()
     ctx.obj["cli"] = cli_instance
     return cli_instance
 
 
+_STALE_CONTEXT_CODES = {
+    "ResourceNotFoundException",
+    "AccessDeniedException",
+    "UnauthorizedException",
+    "ExpiredTokenException",
+}
+
+
+def _is_stale_context_error(exc) -> bool:
+    """True if *exc* suggests the cached runtime/log group no longer applies.
+
+    Covers botocore ClientErrors with a not-found or access code and
+    WebSocket handshakes rejected with 401/403/404.
+    """
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code") in _STALE_CONTEXT_CODES
+    return getattr(response, "status_code", None) in (401, 403, 404)
+
+
 @cli.command()
 @click.option("--message", "-m", required=True, help="Message to send to the agent")
 @click.option("--session-id", default=None, help="Session ID for multi-turn conversation")
@@ -185,6 +294,13 @@ def _get_cli(ctx):
 @click.pass_context
 def invoke(ctx, message, session_id, actor_id):
     """Send a single message to the agent and display the response."""
+    import asyncio
+
+    import websockets
+    from bedrock_agentcore.runtime import AgentCoreRuntimeClient
+
+    from .streaming import StreamingResponseHandler
+
     cli_instance = _get_cli(ctx)
     verbosity = ctx.obj.get("verbosity", 0)
 
@@ -221,19 +337,29 @@ def invoke(ctx, message, session_id, actor_id):
                 f"Total: {metrics.total_duration:.2f}s"
             )
     except Exception as exc:
+        if _is_stale_context_error(exc):
+            cli_instance.invalidate_cache()
         raise click.ClickException(f"Invocation failed: {exc}")
 
 
 @cli.command()
+@click.option("--compress-logs", is_flag=True, help="Gzip session transcripts when they are finished or rotated")
 @click.pass_context
-def chat(ctx):
+def chat(ctx, compress_logs):
     """Start an interactive chat session with the agent."""
+    import asyncio
+
+    from bedrock_agentcore.runtime import AgentCoreRuntimeClient
+
+    from .connection import AgentConnection, read_input, read_stdin_line
+    from .session_log import SessionLogger
+    from .streaming import StreamingResponseHandler, format_agent_label
+
     cli_instance = _get_cli(ctx)
     verbosity = ctx.obj.get("verbosity", 0)
 
     session_id = str(uuid.uuid4())
     log_dir = Path.home() / ".sales-agent-cli" / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
 
     runtime_arn = cli_instance.get_runtime_arn()
     client = AgentCoreRuntimeClient(
@@ -244,80 +370,150 @@ def chat(ctx):
     click.echo(f"Chat session started (ID: {session_id})")
     click.echo("Type /help for available commands.\n")
 
-    while True:
-        try:
-            message = click.prompt(click.style("You", fg="green"), prompt_suffix=": ")
-        except (EOFError, KeyboardInterrupt, click.Abort):
-            click.echo("\nGoodbye!")
-            break
-
-        stripped = message.strip()
-        if not stripped:
-            continue
-
-        # Slash commands
-        if stripped.lower() in ("/exit", "/quit", "/q"):
-            click.echo("Goodbye!")
-            break
-        elif stripped.lower() == "/clear":
-            session_id = str(uuid.uuid4())
-            click.echo(f"Session cleared. New session ID: {session_id}")
-            continue
-        elif stripped.lower() == "/session":
-            click.echo(f"Session ID: {session_id}")
-            continue
-        elif stripped.lower() == "/help":
-            click.echo("Available commands:")
-            click.echo("  /exit, /quit, /q  - End the chat session")
-            click.echo("  /clear            - Start a new session")
-            click.echo("  /session          - Show current session ID")
-            click.echo("  /help             - Show this help message")
-            continue
-
-        # Log user message
-        _log_interaction(log_dir, session_id, "user", stripped)
-
-        # Send message
-        url = client.generate_presigned_url(
-            runtime_arn=runtime_arn, endpoint_name="DEFAULT"
-        )
-        payload = {"prompt": stripped, "session_id": session_id}
+    def _presign():
+        return client.generate_presigned_url(runtime_arn=runtime_arn, endpoint_name="DEFAULT")
+
+    def _handler():
+        return StreamingResponseHandler(verbosity=verbosity, suppress_echo=True)
 
-        async def _send():
-            async with websockets.connect(url, open_timeout=120, close_timeout=10) as ws:
-                await ws.send(json.dumps(payload))
-                handler = StreamingResponseHandler(verbosity=verbosity, suppress_echo=True)
-                return await handler.handle_stream(ws)
+    def _prompt():
+        label = click.style("You", fg="green")
+        if sys.stdin.isatty():
+            return click.prompt(label, prompt_suffix=": ")
+        click.echo(f"{label}: ", nl=False)
+        return read_stdin_line()
 
+    async def _chat_loop(session_id):
+        # One event loop for the whole session so the socket keeps answering
+        # pings while the prompt is waiting for input.
+        connection = AgentConnection(_presign)
+        transcript = SessionLogger(log_dir, session_id, compress=compress_logs)
         try:
-            response_text, metrics = asyncio.run(_send())
-            _log_interaction(log_dir, session_id, "assistant", response_text, metrics)
-            label = format_agent_label(metrics.time_to_first_token)
-            click.echo(label)
-            click.echo(response_text)
-            if verbosity >= 1 and metrics.time_to_first_token is not None:
-                click.echo(f"TTFB: {metrics.time_to_first_token:.2f}s | Total: {metrics.total_duration:.2f}s")
-            click.echo("")  # blank line between exchanges
-        except Exception as exc:
-            click.echo(f"Error: {exc}", err=True)
-
-
-def _log_interaction(log_dir, session_id, role, content, metrics=None):
-    """Append a JSON line to the session log file."""
-    log_file = log_dir / f"{session_id}.jsonl"
-    entry = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "session_id": session_id,
-        "role": role,
-        "content": content,
-    }
-    if metrics and metrics.time_to_first_token is not None:
-        entry["metrics"] = {
-            "time_to_first_token": metrics.time_to_first_token,
-            "total_duration": metrics.total_duration,
-        }
-    with open(log_file, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+            while True:
+                try:
+                    message = await read_input(_prompt)
+                except (EOFError, KeyboardInterrupt, click.Abort):
+                    click.echo("\nGoodbye!")
+                    break
+
+                stripped = message.strip()
+                if not stripped:
+                    continue
+
+                # Slash commands
+                if stripped.lower() in ("/exit", "/quit", "/q"):
+                    click.echo("Goodbye!")
+                    break
+                elif stripped.lower() == "/clear":
+                    session_id = str(uuid.uuid4())
+                    transcript.switch_session(session_id)
+                    click.echo(f"Session cleared. New session ID: {session_id}")
+                    continue
+                elif stripped.lower() == "/session":
+                    click.echo(f"Session ID: {session_id}")
+                    continue
+                elif stripped.lower() == "/help":
+                    click.echo("Available commands:")
+                    click.echo("  /exit, /quit, /q  - End the chat session")
+                    click.echo("  /clear            - Start a new session")
+                    click.echo("  /session          - Show current session ID")
+                    click.echo("  /help             - Show this help message")
+                    continue
+
+                # Log user message
+                transcript.log("user", stripped)
+
+                payload = {"prompt": stripped, "session_id": session_id}
+                try:
+                    response_text, metrics, phases, _ = await connection.send_turn(payload, _handler)
+                    transcript.log("assistant", response_text, metrics, phases)
+                    if verbosity >= 1 and phases is not None:
+                        click.echo(
+                            f"Connected in {phases['presign_time'] + phases['connect_time']:.2f}s "
+                            f"(presign {phases['presign_time']:.2f}s)"
+                        )
+                    label = format_agent_label(metrics.time_to_first_token)
+                    click.echo(label)
+                    click.echo(response_text)
+                    if verbosity >= 1 and metrics.time_to_first_token is not None:
+                        click.echo(f"TTFB: {metrics.time_to_first_token:.2f}s | Total: {metrics.total_duration:.2f}s")
+                    click.echo("")  # blank line between exchanges
+                except Exception as exc:
+                    await connection.close()
+                    if _is_stale_context_error(exc):
+                        cli_instance.invalidate_cache()
+                    click.echo(f"Error: {exc}", err=True)
+        finally:
+            await connection.close()
+            transcript.close()
+
+    try:
+        asyncio.run(_chat_loop(session_id))
+    except KeyboardInterrupt:
+        click.echo("\nGoodbye!")
+
+
+@cli.command()
+@click.option(
+    "--prompts", "prompts_file", required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="JSONL file of prompts (strings or objects with a 'prompt' key)",
+)
+@click.option("--sessions", "-c", type=click.IntRange(min=1), default=4, show_default=True,
+              help="Number of concurrent simulated sessions")
+@click.option("--requests", "-n", "num_requests", type=click.IntRange(min=1), default=None,
+              help="Total requests to send (default: one per prompt)")
+@click.option("--arrival", type=click.Choice(["closed", "poisson"]), default="closed", show_default=True,
+              help="closed: send when a session is free; poisson: open-loop arrivals at --rate")
+@click.option("--rate", type=click.FloatRange(min=0, min_open=True), default=1.0, show_default=True,
+              help="Mean arrival rate in requests/second for --arrival poisson")
+@click.option("--think-time", type=click.FloatRange(min=0), default=0.0, show_default=True,
+              help="Pause in seconds between requests of a session (closed loop)")
+@click.option("--seed", type=int, default=None, help="Random seed for Poisson arrivals")
+@click.option("--output", "-o", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Write the full report as JSON to this file")
+@click.pass_context
+def bench(ctx, prompts_file, sessions, num_requests, arrival, rate, think_time, seed, output):
+    """Replay prompts against the agent under concurrent load and report latency."""
+    import asyncio
+
+    from bedrock_agentcore.runtime import AgentCoreRuntimeClient
+
+    from .bench import LoadConfig, format_report, load_prompts, run_load
+
+    cli_instance = _get_cli(ctx)
+    verbosity = ctx.obj.get("verbosity", 0)
+
+    prompts = load_prompts(prompts_file)
+    runtime_arn = cli_instance.get_runtime_arn()
+    client = AgentCoreRuntimeClient(
+        region=cli_instance.session.region_name,
+        session=cli_instance.session,
+    )
+    config = LoadConfig(
+        sessions=sessions,
+        requests=num_requests,
+        arrival=arrival,
+        rate=rate,
+        think_time=think_time,
+        seed=seed,
+    )
+    total = num_requests or len(prompts)
+    click.echo(
+        f"Sending {total} requests over {sessions} sessions "
+        f"({arrival} arrivals{f' at {rate:g} req/s' if arrival == 'poisson' else ''})..."
+    )
+    if verbosity >= 1:
+        click.echo(f"Runtime ARN: {runtime_arn}")
+
+    def _presign():
+        return client.generate_presigned_url(runtime_arn=runtime_arn, endpoint_name="DEFAULT")
+
+    report = asyncio.run(run_load(_presign, prompts, config))
+    click.echo(format_report(report))
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        click.echo(f"\nReport written to {output}")
 
 
 def parse_time_expression(expr):
@@ -377,13 +573,43 @@ def _format_log_message(message):
         return message
 
 
+def _echo_log_event(event):
+    """Print one log event with its timestamp, colored by severity."""
+    message = event.get("message", "").strip()
+    timestamp = event.get("timestamp", 0)
+    dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+    time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    severity = _detect_severity(message)
+    color = _SEVERITY_COLORS.get(severity)
+    formatted = _format_log_message(message)
+
+    line = f"[{time_str}] {formatted}"
+    if color:
+        click.echo(click.style(line, fg=color))
+    else:
+        click.echo(line)
+
+
 @cli.command()
-@click.option("--tail", type=int, default=None, help="Number of most recent log lines to display")
+@click.option("--tail", type=click.IntRange(min=1), default=None,
+              help="Number of most recent log lines to display (default start: 1h ago)")
 @click.option("--start", default=None, help="Start time (ISO 8601 or relative, e.g., '1h ago')")
 @click.option("--end", default=None, help="End time (ISO 8601 or relative, e.g., '30m ago')")
+@click.option("--follow", "-f", is_flag=True, help="Keep polling for new events (default start: 10m ago)")
+@click.option("--filter-pattern", default=None,
+              help="CloudWatch filter pattern applied server-side, e.g. 'ERROR' or '{ $.level = \"error\" }'")
+@click.option("--parallel", "-p", type=click.IntRange(min=1), default=1, show_default=True,
+              help="Concurrent queries for the --start/--end window (1 = serial)")
+@click.option("--shard-by", type=click.Choice(SHARD_MODES), default="time", show_default=True,
+              help="With --parallel: split the window into time slices or by log stream")
 @click.pass_context
-def logs(ctx, tail, start, end):
+def logs(ctx, tail, start, end, follow, filter_pattern, parallel, shard_by):
     """View CloudWatch logs for the agent runtime."""
+    from botocore.exceptions import ClientError
+
+    from .logs import EventDeduper, follow_log_events, iter_log_events, parallel_log_events
+
     cli_instance = _get_cli(ctx)
     verbosity = ctx.obj.get("verbosity", 0)
 
@@ -393,38 +619,50 @@ def logs(ctx, tail, start, end):
 
     cw = cli_instance.create_client("logs")
 
-    kwargs = {"logGroupName": log_group, "interleaved": True}
+    if follow and end:
+        raise click.UsageError("--end cannot be combined with --follow")
+    if follow and not start:
+        start = "10m ago"
+    elif tail and not start:
+        # The newest lines are only known once the range is read, so keep
+        # the range small rather than paging through the whole history.
+        start = "1h ago"
+
+    kwargs = {"logGroupName": log_group, "interleaved": True, "filterPattern": filter_pattern}
     if start:
         kwargs["startTime"] = parse_time_expression(start)
     if end:
         kwargs["endTime"] = parse_time_expression(end)
-    if tail:
-        kwargs["limit"] = tail
 
+    if parallel > 1 and not start:
+        raise click.UsageError("--parallel needs a --start time to split")
+
+    deduper = EventDeduper()
     try:
-        response = cw.filter_log_events(**kwargs)
-        events = response.get("events", [])
+        if parallel > 1:
+            window = {**kwargs, "endTime": kwargs.get("endTime") or int(time.time() * 1000)}
+            source = parallel_log_events(cw, workers=parallel, shard_by=shard_by, **window)
+        else:
+            source = iter_log_events(cw, **kwargs)
+        events = (e for e in source if deduper.add(e))
+        if tail:
+            events = iter(deque(events, maxlen=tail))
+
+        printed = 0
+        for event in events:
+            _echo_log_event(event)
+            printed += 1
 
-        if not events:
+        if follow:
+            for event in follow_log_events(cw, deduper=deduper, **kwargs):
+                _echo_log_event(event)
+        elif not printed:
             click.echo("No log events found.")
-            return
-
-        for event in events:
-            message = event.get("message", "").strip()
-            timestamp = event.get("timestamp", 0)
-            dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-            time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-
-            severity = _detect_severity(message)
-            color = _SEVERITY_COLORS.get(severity)
-            formatted = _format_log_message(message)
-
-            line = f"[{time_str}] {formatted}"
-            if color:
-                click.echo(click.style(line, fg=color))
-            else:
-                click.echo(line)
+    except KeyboardInterrupt:
+        pass
     except ClientError as exc:
+        if _is_stale_context_error(exc):
+            cli_instance.invalidate_cache()
         error_code = exc.response["Error"].get("Code", "")
         if error_code == "ResourceNotFoundException":
             raise click.ClickException("Log group not found. Is the runtime deployed?")
@@ -436,6 +674,8 @@ def logs(ctx, tail, start, end):
 @click.pass_context
 def status(ctx):
     """Display deployment status for the current stack."""
+    from botocore.exceptions import ClientError
+
     stack_name = ctx.obj.get("stack_name")
     if not stack_name:
         raise click.ClickException(
@@ -0,0 +1,151 @@
+"""Buffered JSONL transcript logger for interactive chat sessions."""
+
+import atexit
+import gzip
+import json
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+
+class SessionLogger:
+    """Append chat turns to ``<log_dir>/<session_id>.jsonl`` without blocking the prompt.
+
+    The file stays open for the whole session. Entries are buffered in
+    memory and written by a background thread every *flush_interval*
+    seconds, and on :meth:`flush`, :meth:`close` or interpreter exit.
+    When a file grows past *max_bytes* it is rotated to
+    ``<session_id>.<n>.jsonl``. With *compress*, rotated parts and finished
+    sessions are gzipped to ``.jsonl.gz``.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        session_id: str,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compress: bool = False,
+    ):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._buffer: list[str] = []
+        self._file = None
+        self._part = 0
+        self._closed = threading.Event()
+        self._open(session_id)
+        self._flusher = threading.Thread(target=self._flush_periodically, name="session-log", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> Path:
+        return self.log_dir / f"{self.session_id}.jsonl"
+
+    def _open(self, session_id: str) -> None:
+        self.session_id = session_id
+        self._part = 0
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def log(self, role: str, content: str, metrics=None, phases: dict | None = None) -> None:
+        """Queue one transcript entry.
+
+        *metrics* is the turn's PerformanceMetrics; *phases* holds
+        client-side timings such as ``presign_time`` and ``connect_time``
+        (absent when the turn reused an open connection).
+        """
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+        }
+        timings = dict(phases or {})
+        if metrics and metrics.time_to_first_token is not None:
+            timings["time_to_first_token"] = metrics.time_to_first_token
+            timings["total_duration"] = metrics.total_duration
+        if timings:
+            entry["metrics"] = timings
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        if not self._buffer or self._file is None:
+            return
+        self._file.write("".join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._part += 1
+        rotated = self.log_dir / f"{self.session_id}.{self._part}.jsonl"
+        while rotated.exists() or rotated.with_suffix(".jsonl.gz").exists():
+            self._part += 1
+            rotated = self.log_dir / f"{self.session_id}.{self._part}.jsonl"
+        self.path.rename(rotated)
+        if self.compress:
+            _gzip_file(rotated)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _finish(self) -> None:
+        """Write out and close the current session file."""
+        self._write_buffer()
+        self._file.close()
+        self._file = None
+        if not self.path.stat().st_size:
+            self.path.unlink()
+        elif self.compress:
+            _gzip_file(self.path)
+
+    def switch_session(self, session_id: str) -> None:
+        """Finish the current transcript and continue in a new session's file."""
+        with self._lock:
+            self._finish()
+            self._open(session_id)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                # Keep the session going; close() will surface persistent errors.
+                pass
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._finish()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _gzip_file(path: Path) -> Path:
+    target = path.with_name(path.name + ".gz")
+    with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    path.unlink()
+    return target
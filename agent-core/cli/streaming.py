@@ -24,18 +24,57 @@ class _ThinkingState(Enum):
     RESPONDING = "responding"
 
 
+_OPEN_TAG = "<thinking>"
+_CLOSE_TAG = "</thinking>"
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Length of the longest suffix of *text* that is a proper prefix of *tag*."""
+    for size in range(min(len(text), len(tag) - 1), 0, -1):
+        if tag.startswith(text[-size:]):
+            return size
+    return 0
+
+
 class StreamingResponseHandler:
-    """Processes streamed WebSocket responses with thinking spinner and metrics."""
+    """Processes streamed WebSocket responses with thinking spinner and metrics.
+
+    Chunks go through an incremental tokenizer: a ``<thinking>`` block at
+    the start of the response is shown on the spinner line. Tags may be
+    split across chunks; up to a tag's length of text is held back until
+    it can be classified. Response text is collected in a list and joined
+    once. Spinner updates and echoed output are redrawn at most
+    ``FRAME_RATE`` times per second, however small the chunks are; output
+    still held when the stream goes quiet is drawn once the frame is due.
+    """
 
     SPINNER_FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+    FRAME_RATE = 20
+    THINKING_DISPLAY_WIDTH = 60
 
-    def __init__(self, verbosity: int = 0, suppress_echo: bool = False):
+    def __init__(self, verbosity: int = 0, suppress_echo: bool = False, quiet: bool = False):
         self.verbosity = verbosity
-        self.suppress_echo = suppress_echo
+        self.suppress_echo = suppress_echo or quiet
+        self.quiet = quiet
         self.metrics = PerformanceMetrics()
+        self.error: str | None = None
+        self.connection_lost = False
         self._spinner_running = False
         self._spinner_frame = 0
         self._state = _ThinkingState.WAITING
+        self._reset_tokenizer()
+
+    def _reset_tokenizer(self) -> None:
+        self._pending = ""  # text that may be the start of a tag
+        self._parts: list[str] = []
+        self._thinking_tail = ""
+        self._echo_buffer: list[str] = []
+        self._undrawn = False
+        self._last_frame = float("-inf")
+
+    @property
+    def response_text(self) -> str:
+        return "".join(self._parts)
 
     async def handle_stream(self, websocket) -> tuple[str, PerformanceMetrics]:
         """
@@ -52,13 +91,18 @@ class StreamingResponseHandler:
         - "chunk" key (streaming chunk)
         - "error" key (error message)
         """
-        response_text = ""
         start_time = time.monotonic()
         self._state = _ThinkingState.WAITING
+        self._reset_tokenizer()
         self._start_spinner()
 
+        messages = websocket.__aiter__()
         try:
-            async for raw_message in websocket:
+            while True:
+                try:
+                    raw_message = await self._next_message(messages)
+                except StopAsyncIteration:
+                    break
                 try:
                     message = json.loads(raw_message)
                 except (json.JSONDecodeError, TypeError):
@@ -66,11 +110,14 @@ class StreamingResponseHandler:
 
                 # Handle error messages
                 if "error" in message:
+                    self._finish_chunks(start_time)
                     self._stop_spinner()
                     error_msg = message["error"]
-                    click.echo(f"\nError: {error_msg}", err=True)
+                    self.error = str(error_msg)
+                    if not self.quiet:
+                        click.echo(f"\nError: {error_msg}", err=True)
                     self.metrics.total_duration = time.monotonic() - start_time
-                    return response_text, self.metrics
+                    return self.response_text, self.metrics
 
                 # Extract text from chunk or result
                 text = message.get("chunk") or message.get("result", "")
@@ -78,99 +125,134 @@ class StreamingResponseHandler:
                     continue
 
                 # Process through the thinking state machine
-                response_text = self._process_chunk(
-                    text, response_text, start_time
-                )
+                self._process_chunk(text, start_time)
 
                 # If this was a "result" message, stream is done
                 if "result" in message:
                     break
 
         except Exception as exc:
+            self._finish_chunks(start_time)
             self._stop_spinner()
-            click.echo(f"\nStream error: {exc}", err=True)
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.connection_lost = True
+            if not self.quiet:
+                click.echo(f"\nStream error: {exc}", err=True)
             self.metrics.total_duration = time.monotonic() - start_time
-            return response_text, self.metrics
+            return self.response_text, self.metrics
 
+        self._finish_chunks(start_time)
         self._stop_spinner()
         self.metrics.total_duration = time.monotonic() - start_time
         if self._state == _ThinkingState.RESPONDING and not self.suppress_echo:
             click.echo("")  # Final newline after streamed response
-        return response_text, self.metrics
+        return self.response_text, self.metrics
+
+    async def _next_message(self, messages):
+        """Wait for the next message, drawing held output if the frame comes due first."""
+        next_message = asyncio.ensure_future(messages.__anext__())
+        try:
+            while self._undrawn:
+                remaining = 1.0 / self.FRAME_RATE - (time.monotonic() - self._last_frame)
+                done, _ = await asyncio.wait({next_message}, timeout=max(remaining, 0.0))
+                if done:
+                    break
+                self._draw(force=True)
+            return await next_message
+        finally:
+            if not next_message.done():
+                next_message.cancel()
+
+    def _process_chunk(self, text: str, start_time: float) -> None:
+        """Feed one chunk through the thinking tag tokenizer."""
+        if self._state == _ThinkingState.RESPONDING:
+            self._emit(text, start_time)
+            self._draw()
+            return
+
+        text = self._pending + text
+        self._pending = ""
 
-    def _process_chunk(
-        self, text: str, response_text: str, start_time: float
-    ) -> str:
-        """Process a chunk through the thinking tag state machine."""
         if self._state == _ThinkingState.WAITING:
-            if "<thinking>" in text:
+            stripped = text.lstrip()
+            if stripped.startswith(_OPEN_TAG):
                 self._state = _ThinkingState.THINKING
-                # Extract thinking content after the tag
-                thinking_content = text.split("<thinking>", 1)[1]
-                if "</thinking>" in thinking_content:
-                    thinking_content = thinking_content.split(
-                        "</thinking>", 1
-                    )[0]
-                    self._update_spinner(thinking_content)
-                    self._state = _ThinkingState.RESPONDING
-                    self._stop_spinner()
-                    # Check for response text after </thinking>
-                    after = text.split("</thinking>", 1)[1]
-                    if after:
-                        if self.metrics.time_to_first_token is None:
-                            self.metrics.time_to_first_token = (
-                                time.monotonic() - start_time
-                            )
-                        if not self.suppress_echo:
-                            click.echo(after, nl=False)
-                        response_text += after
-                else:
-                    self._update_spinner(thinking_content)
-            else:
-                # No thinking tags — go straight to responding
-                self._state = _ThinkingState.RESPONDING
-                self._stop_spinner()
-                if self.metrics.time_to_first_token is None:
-                    self.metrics.time_to_first_token = (
-                        time.monotonic() - start_time
-                    )
-                if not self.suppress_echo:
-                    click.echo(text, nl=False)
-                response_text += text
-
-        elif self._state == _ThinkingState.THINKING:
-            if "</thinking>" in text:
-                thinking_content = text.split("</thinking>", 1)[0]
-                if thinking_content:
-                    self._update_spinner(thinking_content)
-                self._state = _ThinkingState.RESPONDING
-                self._stop_spinner()
-                # Check for response text after </thinking>
-                after = text.split("</thinking>", 1)[1]
-                if after:
-                    if self.metrics.time_to_first_token is None:
-                        self.metrics.time_to_first_token = (
-                            time.monotonic() - start_time
-                        )
-                    if not self.suppress_echo:
-                        click.echo(after, nl=False)
-                    response_text += after
+                text = stripped[len(_OPEN_TAG):]
+            elif _OPEN_TAG.startswith(stripped):
+                # Could still become "<thinking>"; decide on the next chunk.
+                self._pending = text
+                return
             else:
-                self._update_spinner(text)
+                # No thinking block — go straight to responding
+                self._start_responding()
+                self._emit(text, start_time)
+                self._draw()
+                return
 
-        elif self._state == _ThinkingState.RESPONDING:
-            if self.metrics.time_to_first_token is None:
-                self.metrics.time_to_first_token = (
-                    time.monotonic() - start_time
-                )
-            if not self.suppress_echo:
-                click.echo(text, nl=False)
-            response_text += text
+        # THINKING: look for the closing tag, holding back a partial one.
+        end = text.find(_CLOSE_TAG)
+        if end == -1:
+            keep = _partial_tag_length(text, _CLOSE_TAG)
+            if keep:
+                self._pending = text[-keep:]
+                text = text[:-keep]
+            self._add_thinking(text)
+            self._draw()
+            return
+
+        self._add_thinking(text[:end])
+        self._draw(force=True)
+        self._start_responding()
+        after = text[end + len(_CLOSE_TAG):]
+        if after:
+            self._emit(after, start_time)
+        self._draw()
 
-        return response_text
+    def _finish_chunks(self, start_time: float) -> None:
+        """Resolve text held back for tag matching and flush pending output."""
+        if self._pending and self._state == _ThinkingState.WAITING:
+            self._start_responding()
+            self._emit(self._pending, start_time)
+        # Held-back text inside an unterminated thinking block stays hidden.
+        self._pending = ""
+        self._draw(force=True)
+
+    def _start_responding(self) -> None:
+        self._state = _ThinkingState.RESPONDING
+        self._stop_spinner()
+
+    def _emit(self, text: str, start_time: float) -> None:
+        if self.metrics.time_to_first_token is None:
+            self.metrics.time_to_first_token = time.monotonic() - start_time
+        self._parts.append(text)
+        if not self.suppress_echo:
+            self._echo_buffer.append(text)
+            self._undrawn = True
+
+    def _add_thinking(self, text: str) -> None:
+        if text:
+            width = self.THINKING_DISPLAY_WIDTH * 2
+            self._thinking_tail = (self._thinking_tail + text)[-width:]
+            if self._spinner_running:
+                self._undrawn = True
+
+    def _draw(self, force: bool = False) -> None:
+        """Write buffered output and the spinner, at most FRAME_RATE times a second."""
+        now = time.monotonic()
+        if not force and now - self._last_frame < 1.0 / self.FRAME_RATE:
+            return
+        self._last_frame = now
+        self._undrawn = False
+        if self._state == _ThinkingState.THINKING:
+            self._update_spinner(self._thinking_tail)
+        if self._echo_buffer:
+            click.echo("".join(self._echo_buffer), nl=False)
+            self._echo_buffer.clear()
 
     def _start_spinner(self) -> None:
         """Start the animated thinking spinner."""
+        if self.quiet:
+            return
         self._spinner_running = True
         self._spinner_frame = 0
         text = click.style(f"{self.SPINNER_FRAMES[0]} Thinking...", fg="green")
@@ -184,10 +266,10 @@ class StreamingResponseHandler:
             self.SPINNER_FRAMES
         )
         frame = self.SPINNER_FRAMES[self._spinner_frame]
-        # Truncate long thinking text to fit terminal
-        display_text = thinking_text.strip()
-        if len(display_text) > 60:
-            display_text = display_text[:57] + "..."
+        # Show the most recent thinking text that fits the terminal line
+        display_text = " ".join(thinking_text.split())
+        if len(display_text) > self.THINKING_DISPLAY_WIDTH:
+            display_text = "..." + display_text[-(self.THINKING_DISPLAY_WIDTH - 3):]
         text = click.style(f"{frame} Thinking: {display_text}", fg="green")
         click.echo(f"\r{text}    ", nl=False)
 
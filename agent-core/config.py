@@ -6,7 +6,8 @@ falling back to environment variables for any missing values.
 
 import logging
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
 import boto3
 
@@ -17,6 +18,7 @@ _DEFAULTS = {
     "item_table_name": "item_table",
     "user_table_name": "user_table",
     "model_id": "us.anthropic.claude-sonnet-4-20250514-v1:0",
+    "aoss_index_name": "product-search-multimodal-index",
 }
 
 # Fields that must be present (no default, no None allowed)
@@ -31,8 +33,12 @@ _ENV_VAR_MAP = {
     "user_table_name": "USER_TABLE_NAME",
     "recommender_arn": "RECOMMENDER_ARN",
     "model_id": "MODEL_ID",
+    "aoss_index_name": "AOSS_INDEX_NAME",
 }
 
+# How long search keeps using aoss_index_name before re-reading Parameter Store
+INDEX_NAME_TTL_S = 60.0
+
 
 @dataclass
 class Config:
@@ -45,6 +51,25 @@ class Config:
     recommender_arn: str | None
     model_id: str
     parameter_store_prefix: str
+    # Live product index; import-data/createIndex.py repoints it after a reindex.
+    aoss_index_name: str = "product-search-multimodal-index"
+    _index_checked_at: float = field(default_factory=time.monotonic, init=False, repr=False, compare=False)
+
+    def current_index_name(self, ttl: float = INDEX_NAME_TTL_S) -> str:
+        """Return the live product index, re-reading the SSM pointer every *ttl* seconds.
+
+        A long-running agent therefore follows ``createIndex.py promote``
+        within *ttl*. If Parameter Store is unreachable or holds no pointer,
+        the last known index keeps being used.
+        """
+        now = time.monotonic()
+        if now - self._index_checked_at >= ttl:
+            self._index_checked_at = now
+            value = _fetch_parameter_store(self.parameter_store_prefix).get("aoss_index_name")
+            if value and value != "NONE" and value != self.aoss_index_name:
+                logger.info("Switching product index from %s to %s", self.aoss_index_name, value)
+                self.aoss_index_name = value
+        return self.aoss_index_name
 
     @classmethod
     def load(cls) -> "Config":
@@ -54,7 +79,8 @@ class Config:
         2. Call ssm.get_parameters_by_path(Path=prefix) to fetch all params
         3. Map parameter names to config fields
         4. For any missing parameter, fall back to the corresponding env var
-        5. Apply defaults for item_table_name, user_table_name, model_id
+        5. Apply defaults for item_table_name, user_table_name, model_id,
+           aoss_index_name
         6. If Parameter Store is unreachable, log warning and fall back to env vars
         7. Raise ValueError if required fields are missing from both sources
         """
@@ -66,8 +92,8 @@ class Config:
 
         # Resolve each field: Parameter Store → env var → default
         resolved: dict[str, str | None] = {}
-        for field, env_var in _ENV_VAR_MAP.items():
-            value = ps_values.get(field)
+        for name, env_var in _ENV_VAR_MAP.items():
+            value = ps_values.get(name)
             source = "ssm" if value else None
             # Treat "NONE" placeholder as absent (used by CDK for optional SSM params)
             if value == "NONE":
@@ -77,10 +103,10 @@ class Config:
                 value = os.environ.get(env_var)
                 source = "env" if value else None
             if value is None:
-                value = _DEFAULTS.get(field)
+                value = _DEFAULTS.get(name)
                 source = "default" if value else None
-            resolved[field] = value
-            logger.info("Config %s = %s (source: %s)", field, value[:40] if value else None, source)
+            resolved[name] = value
+            logger.info("Config %s = %s (source: %s)", name, value[:40] if value else None, source)
 
         # Validate required fields
         missing = [f for f in _REQUIRED_FIELDS if not resolved.get(f)]
@@ -98,6 +124,7 @@ class Config:
             recommender_arn=resolved.get("recommender_arn"),
             model_id=resolved["model_id"],  # type: ignore[arg-type]
             parameter_store_prefix=prefix,
+            aoss_index_name=resolved["aoss_index_name"],  # type: ignore[arg-type]
         )
 
 
@@ -0,0 +1,116 @@
+"""Tests for the offline benchmark harness and its AWS stand-ins."""
+
+import json
+import math
+
+import pytest
+
+from bench.stats import StageRecorder, percentile, summarize
+from bench.stubs import FakeOpenSearch, canned_embedding
+
+
+class TestPercentile:
+    """Tests for the percentile helper."""
+
+    def test_empty_returns_none(self):
+        assert percentile([], 50) is None
+
+    def test_single_value(self):
+        assert percentile([0.25], 99) == 0.25
+
+    def test_interpolates_between_ranks(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 100) == 4.0
+        assert percentile(values, 50) == pytest.approx(2.5)
+
+
+class TestSummarize:
+    """Tests for latency summaries."""
+
+    def test_reports_milliseconds_and_throughput(self):
+        summary = summarize([0.1, 0.2, 0.3, 0.4], wall_time=2.0, errors=1)
+        assert summary["count"] == 4
+        assert summary["errors"] == 1
+        assert summary["p50_ms"] == pytest.approx(250.0)
+        assert summary["max_ms"] == pytest.approx(400.0)
+        assert summary["throughput_per_s"] == pytest.approx(2.0)
+
+    def test_empty_samples_have_no_percentiles(self):
+        summary = summarize([])
+        assert summary == {"count": 0, "errors": 0}
+
+
+class TestStageRecorder:
+    """Tests for the thread-safe stage recorder."""
+
+    def test_time_records_sample(self):
+        recorder = StageRecorder()
+        with recorder.time("embed"):
+            pass
+        assert recorder.summary()["embed"]["count"] == 1
+
+    def test_time_counts_errors(self):
+        recorder = StageRecorder()
+        with pytest.raises(ValueError):
+            with recorder.time("knn"):
+                raise ValueError("boom")
+        summary = recorder.summary()["knn"]
+        assert summary["count"] == 0
+        assert summary["errors"] == 1
+
+
+class TestStandIns:
+    """Tests for the Bedrock and OpenSearch fakes."""
+
+    def test_canned_embedding_is_deterministic_unit_vector(self):
+        first = canned_embedding("red scarf", 64)
+        assert first == canned_embedding("red scarf", 64)
+        assert math.isclose(sum(v * v for v in first), 1.0, rel_tol=1e-9)
+
+    def test_fake_opensearch_returns_nearest_document(self):
+        search = FakeOpenSearch(StageRecorder(), latency=0)
+        for name in ("red scarf", "chef knife", "running shoes"):
+            search.index(index="idx", id=name, body={"item_id": name, "vec": canned_embedding(name, 32)})
+        response = search.search(
+            body={
+                "size": 1,
+                "query": {"knn": {"vec": {"vector": canned_embedding("chef knife", 32), "k": 1}}},
+                "_source": ["item_id"],
+            },
+            index="idx",
+        )
+        hits = response["hits"]["hits"]
+        assert [hit["_source"] for hit in hits] == [{"item_id": "chef knife"}]
+        assert hits[0]["_score"] == pytest.approx(1.0)
+
+
+class TestRunBenchmark:
+    """End-to-end smoke test against the local stand-ins."""
+
+    def test_reports_every_mode_and_level(self, tmp_path):
+        pytest.importorskip("moto")
+        from bench.harness import BenchmarkOptions, run_benchmark, write_results
+
+        options = BenchmarkOptions(
+            concurrency=[1, 2],
+            requests=4,
+            catalog_size=20,
+            embed_latency=0,
+            llm_latency=0,
+            knn_latency=0,
+            personalize_latency=0,
+        )
+        results = run_benchmark(options)
+
+        levels = {(level["mode"], level["concurrency"]) for level in results["levels"]}
+        assert levels == {("invoke", 1), ("invoke", 2), ("ws", 1), ("ws", 2)}
+        for level in results["levels"]:
+            end_to_end = level["stages"][level["mode"]]
+            assert end_to_end["count"] == 4
+            assert end_to_end["errors"] == 0
+            assert {"p50_ms", "p95_ms", "p99_ms"} <= end_to_end.keys()
+            assert "llm" in level["stages"]
+
+        path = write_results(results, tmp_path)
+        assert json.loads(path.read_text())["levels"] == results["levels"]
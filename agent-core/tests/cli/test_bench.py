@@ -0,0 +1,161 @@
+"""Unit tests for the bench load generator."""
+
+import asyncio
+import json
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from cli.bench import LoadConfig, RequestRecord, build_report, load_prompts, percentile, run_load
+from cli.sales_agent_cli import cli
+
+
+def _run(coro):
+    """Run *coro* on a private loop so the main thread's loop is left untouched."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that answers every sent prompt with one result."""
+
+    def __init__(self, fail_on=None):
+        self.sent = []
+        self.closed = False
+        self._replies = asyncio.Queue()
+        self._fail_on = fail_on
+
+    async def send(self, text):
+        payload = json.loads(text)
+        self.sent.append(payload)
+        if self._fail_on and payload["prompt"] == self._fail_on:
+            await self._replies.put(json.dumps({"error": "agent failed"}))
+        else:
+            await self._replies.put(json.dumps({"result": f"echo {payload['prompt']}"}))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._replies.get()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    def __init__(self, **ws_kwargs):
+        self.sockets = []
+        self.urls = []
+        self._ws_kwargs = ws_kwargs
+
+    async def __call__(self, url, **kwargs):
+        self.urls.append(url)
+        ws = FakeWebSocket(**self._ws_kwargs)
+        self.sockets.append(ws)
+        return ws
+
+
+class TestLoadPrompts:
+    """Tests for JSONL prompt loading."""
+
+    def test_accepts_strings_and_objects(self, tmp_path):
+        path = tmp_path / "prompts.jsonl"
+        path.write_text('"red shoes"\n\n{"prompt": "gift ideas", "actor_id": "u1"}\n')
+        assert load_prompts(path) == [
+            {"prompt": "red shoes"},
+            {"prompt": "gift ideas", "actor_id": "u1"},
+        ]
+
+    def test_rejects_invalid_lines(self, tmp_path):
+        path = tmp_path / "prompts.jsonl"
+        path.write_text('{"text": "missing prompt"}\n')
+        with pytest.raises(click.ClickException, match="prompts.jsonl:1"):
+            load_prompts(path)
+
+
+class TestReport:
+    """Tests for percentile and report aggregation."""
+
+    def test_percentile_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+        assert percentile([1.0, 2.0], 50) == pytest.approx(1.5)
+        assert percentile([], 99) is None
+
+    def test_error_rate_and_throughput(self):
+        records = [
+            RequestRecord(index=0, session=0, time_to_first_token=0.1, total_duration=0.2),
+            RequestRecord(index=1, session=0, error="boom"),
+        ]
+        report = build_report(records, wall_time=2.0, config=LoadConfig())
+        assert report["error_rate"] == 0.5
+        assert report["throughput"] == 0.5
+        assert report["errors"] == {"boom": 1}
+        assert report["latency"]["total"]["count"] == 1
+        json.dumps(report)  # machine-readable
+
+
+class TestRunLoad:
+    """Tests for the concurrent load loop."""
+
+    def test_closed_loop_reuses_one_connection_per_session(self):
+        connector = FakeConnector()
+        prompts = [{"prompt": f"p{i}"} for i in range(3)]
+        config = LoadConfig(sessions=2, requests=8)
+
+        report = _run(run_load(lambda: "wss://example", prompts, config, connect=connector))
+
+        assert report["requests"] == 8
+        assert report["failed"] == 0
+        assert len(connector.sockets) == 2
+        assert sum(len(ws.sent) for ws in connector.sockets) == 8
+        assert all(ws.closed for ws in connector.sockets)
+        # Each session keeps a stable session id across its requests
+        for ws in connector.sockets:
+            assert len({p["session_id"] for p in ws.sent}) == 1
+        assert report["latency"]["connect"]["count"] == 2
+        assert report["latency"]["ttfb"]["count"] == 8
+
+    def test_poisson_arrivals_record_queue_time(self):
+        connector = FakeConnector()
+        config = LoadConfig(sessions=1, requests=4, arrival="poisson", rate=1000.0, seed=7)
+
+        report = _run(run_load(lambda: "wss://example", [{"prompt": "x"}], config, connect=connector))
+
+        assert report["succeeded"] == 4
+        assert report["latency"]["queue"]["count"] == 4
+
+    def test_agent_errors_are_counted_without_reconnecting(self):
+        connector = FakeConnector(fail_on="bad")
+        prompts = [{"prompt": "good"}, {"prompt": "bad"}]
+        config = LoadConfig(sessions=1, requests=4)
+
+        report = _run(run_load(lambda: "wss://example", prompts, config, connect=connector))
+
+        assert report["failed"] == 2
+        assert report["errors"] == {"agent failed": 2}
+        assert len(connector.sockets) == 1
+
+    def test_connect_failures_are_reported(self):
+        async def refuse(url, **kwargs):
+            raise OSError("connection refused")
+
+        config = LoadConfig(sessions=1, requests=2)
+        report = _run(run_load(lambda: "wss://example", [{"prompt": "x"}], config, connect=refuse))
+
+        assert report["failed"] == 2
+        assert report["error_rate"] == 1.0
+
+
+class TestBenchCommand:
+    """Tests for the bench CLI command."""
+
+    def test_bench_requires_prompts(self):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--stack-name", "S", "bench"])
+        assert result.exit_code != 0
+        assert "--prompts" in result.output
@@ -0,0 +1,153 @@
+"""Unit tests for the on-disk stack context cache."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from click.testing import CliRunner
+
+from cli.cache import StackCache, identity_fingerprint
+from cli.sales_agent_cli import SalesAgentCLI, _is_stale_context_error, cli
+
+
+def _session(method="env", access_key="AKIA1", profile="default", region="us-east-1"):
+    credentials = SimpleNamespace(method=method, access_key=access_key)
+    return SimpleNamespace(get_credentials=lambda: credentials, profile_name=profile, region_name=region)
+
+
+class TestStackCache:
+    """Tests for TTL, invalidation and corrupt files."""
+
+    def test_round_trip_and_expiry(self, tmp_path):
+        cache = StackCache(tmp_path / "cache.json", ttl=60)
+        cache.put("k", stack_outputs={"RuntimeArn": "arn"}, runtime_arn=None)
+
+        entry = cache.get("k")
+        assert entry["stack_outputs"] == {"RuntimeArn": "arn"}
+        assert "runtime_arn" not in entry
+
+        with patch("cli.cache.time.time", return_value=entry["saved_at"] + 61):
+            assert cache.get("k") is None
+
+    def test_invalidate_removes_only_that_key(self, tmp_path):
+        cache = StackCache(tmp_path / "cache.json")
+        cache.put("a", stack_outputs={})
+        cache.put("b", stack_outputs={})
+
+        cache.invalidate("a")
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("{not json")
+        cache = StackCache(path)
+
+        assert cache.get("k") is None
+        cache.put("k", stack_outputs={})
+        assert json.loads(path.read_text())["k"]["stack_outputs"] == {}
+
+    def test_zero_ttl_disables_cache(self, tmp_path):
+        cache = StackCache(tmp_path / "cache.json", ttl=0)
+        cache.put("k", stack_outputs={})
+
+        assert cache.get("k") is None
+        assert not (tmp_path / "cache.json").exists()
+
+
+class TestIdentityFingerprint:
+    """Tests for keying the cache by profile and access key without STS."""
+
+    def test_same_profile_and_key_share_an_entry(self):
+        assert identity_fingerprint(_session(method="sso", access_key="A", profile="dev")) == \
+            identity_fingerprint(_session(method="sso", access_key="A", profile="dev"))
+
+    def test_repointed_profile_gets_a_new_entry(self):
+        before = identity_fingerprint(_session(method="shared-credentials-file", access_key="A", profile="dev"))
+        after = identity_fingerprint(_session(method="shared-credentials-file", access_key="B", profile="dev"))
+
+        assert before != after
+
+    def test_profiles_with_the_same_key_are_separate(self):
+        assert identity_fingerprint(_session(access_key="A", profile="dev")) != \
+            identity_fingerprint(_session(access_key="A", profile="prod"))
+
+    def test_no_credentials_means_no_key(self):
+        assert identity_fingerprint(SimpleNamespace(get_credentials=lambda: None)) is None
+
+
+def test_stale_context_errors():
+    not_found = ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "FilterLogEvents")
+    throttled = ClientError({"Error": {"Code": "ThrottlingException"}}, "FilterLogEvents")
+    rejected = RuntimeError("handshake")
+    rejected.response = SimpleNamespace(status_code=403)
+
+    assert _is_stale_context_error(not_found)
+    assert not _is_stale_context_error(throttled)
+    assert _is_stale_context_error(rejected)
+    assert not _is_stale_context_error(RuntimeError("boom"))
+
+
+@pytest.fixture
+def aws_calls():
+    """Count control-plane lookups made by _get_cli for the logs command."""
+    calls = {"sts": 0, "cfn": 0}
+
+    def validate_credentials(self):
+        calls["sts"] += 1
+        self.account_id = "123456789012"
+
+    def validate_stack(self):
+        calls["cfn"] += 1
+        self.stack_outputs = {"RuntimeId": "rt-1"}
+        return self.stack_outputs
+
+    logs_client = SimpleNamespace(filter_log_events=lambda **kw: {"events": []})
+    with patch.object(SalesAgentCLI, "validate_credentials", validate_credentials), \
+         patch.object(SalesAgentCLI, "validate_stack", validate_stack), \
+         patch.object(SalesAgentCLI, "create_client", lambda self, service: logs_client), \
+         patch("cli.sales_agent_cli.identity_fingerprint", return_value="id"):
+        yield calls
+
+
+class TestGetCliCaching:
+    """Tests for reusing stack context across invocations."""
+
+    def test_second_run_skips_lookups(self, aws_calls):
+        runner = CliRunner()
+        for _ in range(2):
+            result = runner.invoke(cli, ["--stack-name", "S", "logs"])
+            assert result.exit_code == 0, result.output
+
+        assert aws_calls == {"sts": 1, "cfn": 1}
+
+    def test_refresh_forces_lookup(self, aws_calls):
+        runner = CliRunner()
+        runner.invoke(cli, ["--stack-name", "S", "logs"])
+        runner.invoke(cli, ["--stack-name", "S", "--refresh", "logs"])
+
+        assert aws_calls == {"sts": 2, "cfn": 2}
+
+    def test_cache_is_per_stack(self, aws_calls):
+        runner = CliRunner()
+        runner.invoke(cli, ["--stack-name", "A", "logs"])
+        runner.invoke(cli, ["--stack-name", "B", "logs"])
+
+        assert aws_calls["cfn"] == 2
+
+    def test_not_found_error_invalidates(self, aws_calls):
+        def missing(**kwargs):
+            raise ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "FilterLogEvents")
+
+        runner = CliRunner()
+        runner.invoke(cli, ["--stack-name", "S", "logs"])
+        with patch.object(SalesAgentCLI, "create_client",
+                          lambda self, service: SimpleNamespace(filter_log_events=missing)):
+            result = runner.invoke(cli, ["--stack-name", "S", "logs"])
+        assert "Log group not found" in result.output
+        runner.invoke(cli, ["--stack-name", "S", "logs"])
+
+        assert aws_calls == {"sts": 2, "cfn": 2}
@@ -0,0 +1,199 @@
+"""Unit tests for the persistent chat connection."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from websockets.exceptions import ConnectionClosedError
+
+from cli.connection import AgentConnection, read_input
+from cli.streaming import StreamingResponseHandler
+
+
+def _run(coro):
+    """Run *coro* on a private loop so the main thread's loop is left untouched."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class ScriptedWebSocket:
+    """WebSocket stand-in that replays scripted replies for each sent prompt.
+
+    A reply of ``None`` ends the stream as if the server closed the socket.
+    """
+
+    def __init__(self, replies=None, fail_send=False):
+        self.sent = []
+        self.closed = False
+        self._script = list(replies or [])
+        self._pending = []
+        self._fail_send = fail_send
+
+    async def send(self, text):
+        if self._fail_send:
+            raise ConnectionClosedError(None, None)
+        self.sent.append(json.loads(text))
+        self._pending = self._script.pop(0) if self._script else [{"result": "ok"}]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._pending:
+            raise StopAsyncIteration
+        reply = self._pending.pop(0)
+        if reply is None:
+            raise StopAsyncIteration
+        if isinstance(reply, Exception):
+            raise reply
+        return json.dumps(reply)
+
+    async def close(self):
+        self.closed = True
+
+
+class ScriptedConnector:
+    def __init__(self, *sockets):
+        self._sockets = list(sockets)
+        self.opened = []
+        self.kwargs = []
+
+    async def __call__(self, url, **kwargs):
+        ws = self._sockets.pop(0) if self._sockets else ScriptedWebSocket()
+        self.opened.append((url, ws))
+        self.kwargs.append(kwargs)
+        return ws
+
+
+def _url_factory():
+    counter = iter(range(1000))
+    return lambda: f"wss://agent/{next(counter)}"
+
+
+def _handler():
+    return StreamingResponseHandler(suppress_echo=True, quiet=True)
+
+
+def test_reuses_socket_across_turns():
+    connector = ScriptedConnector()
+    connection = AgentConnection(_url_factory(), connect=connector, ping_interval=5)
+
+    async def _go():
+        first = await connection.send_turn({"prompt": "a", "session_id": "s"}, _handler)
+        second = await connection.send_turn({"prompt": "b", "session_id": "s"}, _handler)
+        return first, second
+
+    first, second = _run(_go())
+
+    assert first[0] == "ok" and second[0] == "ok"
+    assert first[2] is not None
+    assert second[2] is None
+    assert len(connector.opened) == 1
+    assert [p["prompt"] for p in connector.opened[0][1].sent] == ["a", "b"]
+    assert connector.kwargs[0]["ping_interval"] == 5
+
+
+def test_reconnects_with_fresh_url_when_idle_socket_dropped():
+    stale = ScriptedWebSocket()
+    connector = ScriptedConnector(stale)
+    connection = AgentConnection(_url_factory(), connect=connector)
+
+    async def _go():
+        await connection.send_turn({"prompt": "a"}, _handler)
+        stale._fail_send = True
+        return await connection.send_turn({"prompt": "b"}, _handler)
+
+    text, _, phases, _ = _run(_go())
+
+    assert text == "ok"
+    assert set(phases) == {"presign_time", "connect_time"}
+    assert [url for url, _ in connector.opened] == ["wss://agent/0", "wss://agent/1"]
+    assert stale.closed
+    assert connector.opened[1][1].sent == [{"prompt": "b"}]
+
+
+def test_resends_when_stream_ends_before_any_reply():
+    dead = ScriptedWebSocket(replies=[[None]])
+    connector = ScriptedConnector(dead)
+    connection = AgentConnection(_url_factory(), connect=connector)
+
+    text, _, _, handler = _run(connection.send_turn({"prompt": "a"}, _handler))
+
+    assert text == "ok"
+    assert handler.error is None
+    assert len(connector.opened) == 2
+
+
+def test_partial_reply_is_not_resent():
+    broken = ScriptedWebSocket(replies=[[{"chunk": "half"}, ConnectionClosedError(None, None)]])
+    connector = ScriptedConnector(broken)
+    connection = AgentConnection(_url_factory(), connect=connector)
+
+    text, _, _, handler = _run(connection.send_turn({"prompt": "a"}, _handler))
+
+    assert text == "half"
+    assert handler.connection_lost
+    assert len(connector.opened) == 1
+    assert connection.websocket is None
+
+
+def test_agent_error_keeps_connection_open():
+    ws = ScriptedWebSocket(replies=[[{"error": "agent failed"}]])
+    connector = ScriptedConnector(ws)
+    connection = AgentConnection(_url_factory(), connect=connector)
+
+    _, _, _, handler = _run(connection.send_turn({"prompt": "a"}, _handler))
+
+    assert handler.error == "agent failed"
+    assert connection.websocket is ws
+    assert len(connector.opened) == 1
+
+
+def test_gives_up_after_second_failed_send():
+    connector = ScriptedConnector(ScriptedWebSocket(fail_send=True), ScriptedWebSocket(fail_send=True))
+    connection = AgentConnection(_url_factory(), connect=connector)
+
+    with pytest.raises(ConnectionClosedError):
+        _run(connection.send_turn({"prompt": "a"}, _handler))
+    assert connection.websocket is None
+
+
+def test_read_input_returns_prompt_result():
+    assert _run(read_input(lambda: "hello")) == "hello"
+
+
+def test_read_input_propagates_prompt_errors():
+    def _eof():
+        raise EOFError
+
+    with pytest.raises(EOFError):
+        _run(read_input(_eof))
+
+
+def test_cancelled_read_input_does_not_block_shutdown():
+    release = threading.Event()
+
+    async def _main():
+        task = asyncio.ensure_future(read_input(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # asyncio.run joins the default executor like this on the way out.
+        await asyncio.get_running_loop().shutdown_default_executor()
+
+    # Releases the prompt later so a regression fails instead of hanging.
+    timer = threading.Timer(2.0, release.set)
+    timer.start()
+    start = time.monotonic()
+    try:
+        _run(_main())
+    finally:
+        timer.cancel()
+        release.set()
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,269 @@
+"""Unit tests for paginated and follow-mode log reading."""
+
+import itertools
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from cli.logs import EventDeduper, follow_log_events, iter_log_events, parallel_log_events, time_slices
+from cli.sales_agent_cli import cli
+
+
+def _event(event_id, timestamp, message="hello"):
+    return {"eventId": event_id, "timestamp": timestamp, "message": message}
+
+
+class PagedLogs:
+    """filter_log_events stand-in serving scripted responses in order."""
+
+    def __init__(self, *responses):
+        self._responses = list(responses)
+        self.calls = []
+
+    def filter_log_events(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._responses.pop(0) if self._responses else {"events": []}
+
+
+class TestIterLogEvents:
+    """Tests for nextToken pagination."""
+
+    def test_follows_next_token_across_pages(self):
+        client = PagedLogs(
+            {"events": [_event("a", 1)], "nextToken": "t1"},
+            {"events": [], "nextToken": "t2"},
+            {"events": [_event("b", 2)]},
+        )
+
+        events = list(iter_log_events(client, logGroupName="g", filterPattern=None))
+
+        assert [e["eventId"] for e in events] == ["a", "b"]
+        assert [c.get("nextToken") for c in client.calls] == [None, "t1", "t2"]
+        assert "filterPattern" not in client.calls[0]
+
+    def test_yields_before_fetching_next_page(self):
+        client = PagedLogs({"events": [_event("a", 1)], "nextToken": "t1"})
+
+        next(iter_log_events(client, logGroupName="g"))
+
+        assert len(client.calls) == 1
+
+    def test_stops_on_repeated_token(self):
+        client = PagedLogs({"events": [], "nextToken": "t"}, {"events": [], "nextToken": "t"})
+
+        assert list(iter_log_events(client, logGroupName="g")) == []
+        assert len(client.calls) == 2
+
+
+class TestFollowLogEvents:
+    """Tests for polling, backoff and deduplication."""
+
+    def test_dedupes_overlap_and_backs_off_when_idle(self):
+        client = PagedLogs(
+            {"events": [_event("a", 10_000)]},
+            {"events": [_event("a", 10_000), _event("b", 11_000)]},
+            {"events": [_event("b", 11_000)]},
+            {"events": []},
+            {"events": [_event("c", 12_000)]},
+        )
+        sleeps = []
+
+        events = list(itertools.islice(
+            follow_log_events(client, logGroupName="g", startTime=5, sleep=sleeps.append,
+                              min_interval=1, max_interval=3),
+            3,
+        ))
+
+        assert [e["eventId"] for e in events] == ["a", "b", "c"]
+        assert sleeps == [1, 1, 2, 3]
+        assert client.calls[0]["startTime"] == 5
+        assert client.calls[1]["startTime"] == 10_000 - 5_000
+        assert client.calls[2]["startTime"] == 11_000 - 5_000
+
+    def test_drops_end_time_and_keeps_filter(self):
+        client = PagedLogs({"events": [_event("a", 1)]})
+
+        next(follow_log_events(client, logGroupName="g", endTime=99, filterPattern="ERROR"))
+
+        assert "endTime" not in client.calls[0]
+        assert client.calls[0]["filterPattern"] == "ERROR"
+
+    def test_deduper_prunes_ids_outside_lookback(self):
+        deduper = EventDeduper(lookback_ms=100)
+        deduper.add(_event("old", 0))
+        deduper.add(_event("new", 500))
+
+        assert deduper.cursor() == 400
+        assert deduper.add(_event("old", 0))
+        assert not deduper.add(_event("new", 500))
+
+
+@pytest.fixture
+def logs_cli():
+    with patch("cli.sales_agent_cli._get_cli") as get_cli:
+        instance = get_cli.return_value
+        instance.get_log_group.return_value = "/aws/agent"
+        yield instance
+
+
+class TestLogsCommand:
+    """Tests for the logs command wiring."""
+
+    def test_prints_all_pages_and_passes_filter(self, logs_cli):
+        client = PagedLogs(
+            {"events": [_event("a", 0, "first")], "nextToken": "t"},
+            {"events": [_event("b", 0, "second")]},
+        )
+        logs_cli.create_client.return_value = client
+
+        result = CliRunner().invoke(cli, ["logs", "--filter-pattern", "ERROR"])
+
+        assert result.exit_code == 0, result.output
+        assert "first" in result.output and "second" in result.output
+        assert all(c["filterPattern"] == "ERROR" for c in client.calls)
+
+    def test_tail_keeps_most_recent_lines(self, logs_cli):
+        logs_cli.create_client.return_value = PagedLogs(
+            {"events": [_event(str(i), i, f"line-{i}") for i in range(5)]},
+        )
+
+        result = CliRunner().invoke(cli, ["logs", "--tail", "2"])
+
+        assert "line-2" not in result.output
+        assert "line-3" in result.output and "line-4" in result.output
+
+    def test_tail_without_start_reads_recent_window(self, logs_cli):
+        client = PagedLogs({"events": [_event("a", 0, "line")]})
+        logs_cli.create_client.return_value = client
+
+        before = int(time.time() * 1000)
+        result = CliRunner().invoke(cli, ["logs", "--tail", "5"])
+
+        assert result.exit_code == 0, result.output
+        start = client.calls[0]["startTime"]
+        assert before - 3_600_000 - 5_000 <= start <= before - 3_600_000 + 5_000
+
+    def test_follow_rejects_end(self, logs_cli):
+        logs_cli.create_client.return_value = MagicMock()
+
+        result = CliRunner().invoke(cli, ["logs", "--follow", "--end", "1h ago"])
+
+        assert result.exit_code != 0
+        assert "--end" in result.output
+
+
+class WindowLogs:
+    """Thread-safe filter_log_events stand-in answering from an event list."""
+
+    def __init__(self, events, streams=None, page_size=2):
+        self.events = events
+        self.streams = streams or []
+        self.page_size = page_size
+        self.calls = []
+
+    def filter_log_events(self, **kwargs):
+        self.calls.append(kwargs)
+        matches = [
+            e for e in self.events
+            if kwargs["startTime"] <= e["timestamp"] <= kwargs["endTime"]
+            and e.get("stream") in kwargs.get("logStreamNames", [e.get("stream")])
+        ]
+        offset = int(kwargs.get("nextToken", 0))
+        page = matches[offset:offset + self.page_size]
+        response = {"events": page}
+        if offset + self.page_size < len(matches):
+            response["nextToken"] = str(offset + self.page_size)
+        return response
+
+    def describe_log_streams(self, **kwargs):
+        return {"logStreams": self.streams}
+
+
+class TestParallelLogEvents:
+    """Tests for sharded concurrent retrieval."""
+
+    def test_time_slices_cover_window_without_overlap(self):
+        slices = time_slices(0, 99, 4)
+        assert slices == [(0, 24), (25, 49), (50, 74), (75, 99)]
+        assert time_slices(5, 6, 10) == [(5, 5), (6, 6)]
+
+    def test_time_sharding_returns_events_in_order(self):
+        events = [_event(str(i), i * 7) for i in range(40)]
+        client = WindowLogs(events)
+
+        result = list(parallel_log_events(client, logGroupName="g", startTime=0, endTime=300,
+                                          workers=3, slices=6))
+
+        assert result == events
+        assert len({(c["startTime"], c["endTime"]) for c in client.calls}) == 6
+
+    def test_first_slice_streams_before_later_slices_finish(self):
+        release = threading.Event()
+
+        class SlowTail(WindowLogs):
+            def filter_log_events(self, **kwargs):
+                if kwargs["startTime"] > 0:
+                    assert release.wait(5)
+                return super().filter_log_events(**kwargs)
+
+        client = SlowTail([_event("a", 0), _event("b", 9)])
+        events = parallel_log_events(client, logGroupName="g", startTime=0, endTime=9, workers=2, slices=2)
+
+        assert next(events)["eventId"] == "a"
+        release.set()
+        assert [e["eventId"] for e in events] == ["b"]
+
+    def test_stream_sharding_merges_by_timestamp(self):
+        events = [dict(_event(str(i), i), stream=f"s{i % 3}") for i in range(30)]
+        streams = [
+            {"logStreamName": "s0", "firstEventTimestamp": 0, "lastEventTimestamp": 30},
+            {"logStreamName": "s1", "firstEventTimestamp": 0, "lastEventTimestamp": 30},
+            {"logStreamName": "s2", "firstEventTimestamp": 0, "lastEventTimestamp": 30},
+            {"logStreamName": "stale", "firstEventTimestamp": 0, "lastEventTimestamp": -1},
+        ]
+        client = WindowLogs(events, streams)
+
+        result = list(parallel_log_events(client, logGroupName="g", startTime=0, endTime=100,
+                                          workers=3, shard_by="stream"))
+
+        assert [e["timestamp"] for e in result] == list(range(30))
+        assert sorted({n for c in client.calls for n in c["logStreamNames"]}) == ["s0", "s1", "s2"]
+
+    def test_workers_stop_prefetching_when_queue_is_full(self):
+        client = WindowLogs([_event(str(i), i) for i in range(100)], page_size=1)
+        events = parallel_log_events(client, logGroupName="g", startTime=0, endTime=99,
+                                     workers=1, slices=1, queue_size=3)
+
+        assert next(events)["eventId"] == "0"
+        time.sleep(0.2)
+        assert len(client.calls) <= 5
+        assert [e["eventId"] for e in events] == [str(i) for i in range(1, 100)]
+
+    def test_stream_shards_beyond_workers_do_not_deadlock(self):
+        events = [dict(_event(str(i), i), stream=f"s{i % 4}") for i in range(40)]
+        streams = [
+            {"logStreamName": f"s{i}", "firstEventTimestamp": 0, "lastEventTimestamp": 40}
+            for i in range(4)
+        ]
+        client = WindowLogs(events, streams, page_size=1)
+
+        result = list(parallel_log_events(client, logGroupName="g", startTime=0, endTime=100,
+                                          workers=1, slices=4, shard_by="stream", queue_size=1))
+
+        assert [e["timestamp"] for e in result] == list(range(40))
+
+    def test_worker_errors_reach_the_caller(self):
+        client = MagicMock()
+        client.filter_log_events.side_effect = RuntimeError("throttled")
+
+        with pytest.raises(RuntimeError, match="throttled"):
+            list(parallel_log_events(client, logGroupName="g", startTime=0, endTime=10, workers=2))
+
+    def test_parallel_requires_start(self, logs_cli):
+        result = CliRunner().invoke(cli, ["logs", "--parallel", "4"])
+
+        assert result.exit_code != 0
+        assert "--start" in result.output
@@ -65,7 +65,7 @@ class TestHelpPreservation:
     **Validates: Requirements 3.1**
     """
 
-    EXPECTED_COMMANDS = {"chat", "invoke", "logs", "status", "version"}
+    EXPECTED_COMMANDS = {"bench", "chat", "invoke", "logs", "status", "version"}
 
     def test_module_help_exits_zero(self):
         """``python -m cli --help`` must exit 0."""
@@ -146,7 +146,7 @@ class TestImportPreservation:
     def test_cli_group_has_expected_commands(self):
         """The ``cli`` Click group must contain all expected commands."""
         from cli.sales_agent_cli import cli
-        expected = {"version", "invoke", "chat", "logs", "status"}
+        expected = {"version", "invoke", "chat", "logs", "status", "bench"}
         actual = set(cli.commands.keys())
         assert expected == actual, f"Expected {expected}, got {actual}"
 
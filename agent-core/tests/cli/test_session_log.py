@@ -0,0 +1,76 @@
+"""Unit tests for the buffered chat transcript logger."""
+
+import gzip
+import json
+import time
+
+from cli.session_log import SessionLogger
+from cli.streaming import PerformanceMetrics
+
+
+def _lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_buffers_until_flush(tmp_path):
+    logger = SessionLogger(tmp_path, "s1", flush_interval=60)
+    logger.log("user", "hi")
+
+    assert logger.path.read_text() == ""
+    logger.flush()
+    assert _lines(logger.path)[0]["content"] == "hi"
+    logger.close()
+
+
+def test_close_writes_buffered_entries_with_phase_metrics(tmp_path):
+    metrics = PerformanceMetrics(time_to_first_token=0.4, total_duration=1.5)
+    with SessionLogger(tmp_path, "s1", flush_interval=60) as logger:
+        logger.log("user", "hi")
+        logger.log("assistant", "hello", metrics, {"presign_time": 0.01, "connect_time": 0.2})
+
+    user, assistant = _lines(tmp_path / "s1.jsonl")
+    assert "metrics" not in user
+    assert assistant["session_id"] == "s1"
+    assert assistant["metrics"] == {
+        "presign_time": 0.01,
+        "connect_time": 0.2,
+        "time_to_first_token": 0.4,
+        "total_duration": 1.5,
+    }
+
+
+def test_timer_flushes_in_background(tmp_path):
+    logger = SessionLogger(tmp_path, "s1", flush_interval=0.01)
+    logger.log("user", "hi")
+
+    deadline = time.monotonic() + 2
+    while not logger.path.stat().st_size and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _lines(logger.path)
+    logger.close()
+
+
+def test_rotates_and_compresses(tmp_path):
+    tmp_path = tmp_path / "logs"
+    with SessionLogger(tmp_path, "s1", flush_interval=60, max_bytes=200, compress=True) as logger:
+        for i in range(6):
+            logger.log("user", "x" * 100 + str(i))
+            logger.flush()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert "s1.jsonl" not in files
+    assert all(name.endswith(".jsonl.gz") for name in files)
+    contents = [e["content"][-1] for name in files for e in _lines(tmp_path / name)]
+    assert sorted(contents) == [str(i) for i in range(6)]
+
+
+def test_switch_session_finishes_previous_file(tmp_path):
+    with SessionLogger(tmp_path, "s1", flush_interval=60, compress=True) as logger:
+        logger.log("user", "first")
+        logger.switch_session("s2")
+        logger.log("user", "second")
+
+    assert _lines(tmp_path / "s1.jsonl.gz")[0]["content"] == "first"
+    assert _lines(tmp_path / "s2.jsonl.gz")[0]["session_id"] == "s2"
@@ -0,0 +1,72 @@
+"""Startup-time budget for the commands that should not touch AWS.
+
+Runs the CLI in a fresh interpreter with ``-X importtime`` so a failure
+reports which imports blew the budget.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+AGENTCORE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Wall-clock budget per invocation (best of several runs). Overridable for
+# slow CI machines; the import checks below are the strict part.
+STARTUP_BUDGET_S = float(os.environ.get("CLI_STARTUP_BUDGET_S", "0.5"))
+RUNS = 3
+
+HEAVY_MODULES = ("boto3", "botocore", "websockets", "bedrock_agentcore", "asyncio")
+
+
+def _run_cli(*args):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "cli", *args],
+        cwd=str(AGENTCORE_DIR),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    elapsed = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr
+    return elapsed, _parse_importtime(result.stderr)
+
+
+def _parse_importtime(stderr):
+    """Return {module: cumulative_us} from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def _slowest(modules, n=10):
+    top = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:n]
+    return "\n".join(f"  {us / 1000:8.1f} ms  {name}" for name, us in top)
+
+
+@pytest.mark.parametrize("args", [("version",), ("--help",)])
+def test_fast_commands_skip_heavy_imports(args):
+    _, modules = _run_cli(*args)
+
+    loaded = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert not loaded, f"{' '.join(args)} imported {loaded[:5]}; slowest imports:\n{_slowest(modules)}"
+
+
+@pytest.mark.parametrize("args", [("version",), ("--help",)])
+def test_fast_commands_start_within_budget(args):
+    runs = [_run_cli(*args) for _ in range(RUNS)]
+    best, modules = min(runs, key=lambda run: run[0])
+
+    assert best <= STARTUP_BUDGET_S, (
+        f"{' '.join(args)} took {best:.3f}s (budget {STARTUP_BUDGET_S:.3f}s); "
+        f"slowest imports:\n{_slowest(modules)}"
+    )
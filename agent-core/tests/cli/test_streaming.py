@@ -1,5 +1,9 @@
 """Unit tests for the streaming response handler."""
 
+import asyncio
+import json
+import time
+
 import pytest
 
 from cli.streaming import PerformanceMetrics, StreamingResponseHandler
@@ -50,3 +54,107 @@ class TestStreamingResponseHandler:
         assert handler._spinner_running is False
         handler._stop_spinner()
         assert handler._spinner_running is False
+
+
+def _run(coro):
+    """Run *coro* on a private loop so the main thread's loop is left untouched."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class ChunkStream:
+    """Async iterator yielding the given chunks as JSON messages, then a result."""
+
+    def __init__(self, chunks, result=None):
+        self._messages = [json.dumps({"chunk": c}) for c in chunks]
+        if result is not None:
+            self._messages.append(json.dumps({"result": result}))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._messages:
+            raise StopAsyncIteration
+        return self._messages.pop(0)
+
+
+class PausedStream(ChunkStream):
+    """ChunkStream that sleeps before each message for the matching delay."""
+
+    def __init__(self, timed_chunks, result=None):
+        super().__init__([c for _, c in timed_chunks], result)
+        self._delays = [d for d, _ in timed_chunks] + [0.0]
+
+    async def __anext__(self):
+        if self._delays:
+            await asyncio.sleep(self._delays.pop(0))
+        return await super().__anext__()
+
+
+def _stream(chunks, **kwargs):
+    handler = StreamingResponseHandler(**kwargs)
+    text, metrics = _run(handler.handle_stream(ChunkStream(chunks)))
+    return handler, text, metrics
+
+
+class TestThinkingTokenizer:
+    """Tests for incremental <thinking> tag handling across chunks."""
+
+    @pytest.mark.parametrize("split", range(1, 40))
+    def test_tags_split_at_any_boundary(self, split):
+        raw = "<thinking>plan the search</thinking>Here are shoes."
+        _, text, metrics = _stream([raw[:split], raw[split:]], quiet=True)
+
+        assert text == "Here are shoes."
+        assert metrics.time_to_first_token is not None
+
+    def test_single_character_chunks(self):
+        raw = "\n<thinking>a < b </thin and more</thinking>Answer <b>"
+        _, text, _ = _stream(list(raw), quiet=True)
+
+        assert text == "Answer <b>"
+
+    def test_text_without_thinking_is_returned_verbatim(self):
+        _, text, _ = _stream(["<th", "e end>"], quiet=True)
+        assert text == "<the end>"
+
+    def test_partial_open_tag_at_end_of_stream_is_response(self):
+        _, text, metrics = _stream(["<think"], quiet=True)
+        assert text == "<think"
+        assert metrics.time_to_first_token is not None
+
+    def test_unterminated_thinking_has_no_response(self):
+        handler, text, metrics = _stream(["<thinking>still going</thin"], quiet=True)
+        assert text == ""
+        assert metrics.time_to_first_token is None
+
+    def test_redraws_are_rate_limited(self, monkeypatch):
+        writes = []
+        monkeypatch.setattr("cli.streaming.click.echo", lambda msg="", **kw: writes.append(msg))
+        chunks = ["<thinking>"] + ["step "] * 200 + ["</thinking>"] + ["word "] * 200
+
+        handler, text, _ = _stream(chunks)
+
+        assert text == "word " * 200
+        assert "".join(w for w in writes if w.startswith("word")) == text
+        assert len(writes) < 20
+
+    def test_held_output_is_drawn_while_stream_is_idle(self, monkeypatch):
+        writes = []
+        monkeypatch.setattr(
+            "cli.streaming.click.echo",
+            lambda msg="", **kw: writes.append((time.monotonic(), msg)),
+        )
+        stream = PausedStream([(0.0, "Let me check "), (0.005, "the catalog..."), (0.5, "Done.")])
+        handler = StreamingResponseHandler()
+
+        start = time.monotonic()
+        text, _ = _run(handler.handle_stream(stream))
+
+        assert text == "Let me check the catalog...Done."
+        drawn_at = next(t for t, msg in writes if "the catalog..." in msg)
+        assert drawn_at - start < 0.3
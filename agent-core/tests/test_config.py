@@ -0,0 +1,40 @@
+"""Tests for following the live product index in Parameter Store."""
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import config as config_module
+from config import Config
+
+PREFIX = "/agentcore/sales-agent/test/"
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("PARAMETER_STORE_PREFIX", PREFIX)
+    with mock_aws():
+        ssm = boto3.client("ssm")
+        for name, value in (("aoss_collection_id", "test"), ("aoss_region", "us-east-1"),
+                            ("aoss_index_name", "product-search-multimodal-index-v1")):
+            ssm.put_parameter(Name=PREFIX + name, Value=value, Type="String")
+        yield Config.load()
+
+
+def test_current_index_name_follows_pointer_after_ttl(config):
+    assert config.current_index_name() == "product-search-multimodal-index-v1"
+    boto3.client("ssm").put_parameter(
+        Name=PREFIX + "aoss_index_name", Value="product-search-multimodal-index-v2", Type="String", Overwrite=True
+    )
+
+    assert config.current_index_name(ttl=60) == "product-search-multimodal-index-v1"
+    assert config.current_index_name(ttl=0) == "product-search-multimodal-index-v2"
+
+
+def test_current_index_name_keeps_last_index_when_ssm_fails(config, monkeypatch):
+    monkeypatch.setattr(config_module, "_fetch_parameter_store", lambda prefix: {})
+
+    assert config.current_index_name(ttl=0) == "product-search-multimodal-index-v1"
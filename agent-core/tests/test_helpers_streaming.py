@@ -0,0 +1,108 @@
+"""Tests for streaming Bedrock calls in tools.helpers."""
+
+import importlib
+import json
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from moto import mock_aws
+
+
+def _unload_tools():
+    for name in list(sys.modules):
+        if name in ("config", "tools") or name.startswith("tools."):
+            del sys.modules[name]
+
+
+@pytest.fixture
+def helpers(monkeypatch):
+    """Import tools.helpers with Config.load() served by moto and env vars."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AOSS_COLLECTION_ID", "test")
+    monkeypatch.setenv("AOSS_REGION", "us-east-1")
+    with mock_aws():
+        _unload_tools()
+        try:
+            yield importlib.import_module("tools.helpers")
+        finally:
+            _unload_tools()
+
+
+class FakeEventStream:
+    """Iterable of Bedrock stream events that records how far it was read."""
+
+    def __init__(self, texts):
+        chunks = [{"type": "message_start", "message": {"usage": {"input_tokens": 12}}}]
+        chunks += [{"type": "content_block_delta", "delta": {"type": "text_delta", "text": t}} for t in texts]
+        chunks += [{"type": "message_delta", "usage": {"output_tokens": len(texts)}}]
+        self.events = [{"chunk": {"bytes": json.dumps(c).encode()}} for c in chunks]
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            self.consumed += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+def _fake_client(mocker, helpers, texts):
+    stream = FakeEventStream(texts)
+    client = MagicMock()
+    client.invoke_model_with_response_stream.return_value = {"body": stream}
+    mocker.patch.object(helpers.boto3, "client", return_value=client)
+    return stream
+
+
+class TestJsonCloseTracker:
+    """Tests for detecting the end of a streamed JSON answer."""
+
+    def test_detects_close_across_chunks(self, helpers):
+        tracker = helpers.JsonCloseTracker()
+        assert tracker.feed('Here:\n[{"a": ') is None
+        assert tracker.feed('1}') is None
+        assert tracker.feed('] trailing') == 1
+
+    def test_ignores_bracketed_prose_before_answer(self, helpers):
+        tracker = helpers.JsonCloseTracker()
+        text = 'Based on rules [1] and [2], the best pick is:\n[{"item_id": "a"}] more'
+        assert tracker.feed(text) == text.index("}]") + 2
+
+    def test_starts_after_json_fence(self, helpers):
+        tracker = helpers.JsonCloseTracker()
+        text = 'Answer ```json {"a": [1]}``` done'
+        assert tracker.feed(text) == text.index("}```") + 1
+
+    def test_ignores_brackets_in_strings(self, helpers):
+        tracker = helpers.JsonCloseTracker()
+        text = '{"reason": "fits [budget] \\"}\\" ok"} more'
+        assert tracker.feed(text) == text.index("} more") + 1
+
+
+class TestCallBedrockLlm:
+    """Tests for the streaming call_bedrock_llm path."""
+
+    def test_streams_full_completion_without_json(self, helpers, mocker):
+        stream = _fake_client(mocker, helpers, ["Hel", "lo"])
+        config = MagicMock(model_id="m")
+
+        result = helpers.call_bedrock_llm("hi", config)
+
+        assert result == "Hello"
+        assert stream.closed
+
+    def test_stops_when_json_closes(self, helpers, mocker):
+        stream = _fake_client(mocker, helpers, ['[{"id": 1}', '] Because', " it is cheap."])
+        config = MagicMock(model_id="m")
+
+        result = helpers.call_bedrock_llm("hi", config)
+
+        assert result == '[{"id": 1}]'
+        assert json.loads(result) == [{"id": 1}]
+        assert stream.consumed < len(stream.events)
+        assert stream.closed
@@ -0,0 +1,96 @@
+"""Tests for matching query embeddings to the index's vector settings."""
+
+import importlib
+import io
+import json
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from moto import mock_aws
+
+
+def _unload_tools():
+    for name in list(sys.modules):
+        if name in ("config", "tools") or name.startswith("tools."):
+            del sys.modules[name]
+
+
+@pytest.fixture
+def helpers(monkeypatch):
+    """Import tools.helpers with Config.load() served by moto and env vars."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AOSS_COLLECTION_ID", "test")
+    monkeypatch.setenv("AOSS_REGION", "us-east-1")
+    with mock_aws():
+        _unload_tools()
+        try:
+            yield importlib.import_module("tools.helpers")
+        finally:
+            _unload_tools()
+
+
+def _client_with_meta(meta):
+    client = MagicMock()
+    client.indices.get_mapping.side_effect = lambda index: {index: {"mappings": {"_meta": meta}}}
+    return client
+
+
+class TestIndexVectorSettings:
+    """Tests for reading vector settings from the index mapping."""
+
+    def test_reads_and_caches_meta(self, helpers):
+        client = _client_with_meta({"embedding_dimension": 256, "quantization": "byte"})
+
+        first = helpers.get_index_vector_settings(client, "idx-v2")
+        second = helpers.get_index_vector_settings(client, "idx-v2")
+
+        assert first == {"embedding_dimension": 256, "quantization": "byte"}
+        assert second is first
+        assert client.indices.get_mapping.call_count == 1
+
+    def test_defaults_without_meta(self, helpers):
+        client = MagicMock()
+        client.indices.get_mapping.return_value = {"idx": {"mappings": {"properties": {}}}}
+
+        assert helpers.get_index_vector_settings(client, "idx") == helpers.DEFAULT_VECTOR_SETTINGS
+
+    def test_failed_lookup_is_retried_after_ttl(self, helpers):
+        client = MagicMock()
+        client.indices.get_mapping.side_effect = RuntimeError("unreachable")
+
+        assert helpers.get_index_vector_settings(client, "idx") == helpers.DEFAULT_VECTOR_SETTINGS
+        assert helpers.get_index_vector_settings(client, "idx") == helpers.DEFAULT_VECTOR_SETTINGS
+        assert client.indices.get_mapping.call_count == 1
+
+        helpers._vector_settings_retry_at["idx"] = 0.0
+        client.indices.get_mapping.side_effect = lambda index: {index: {"mappings": {"_meta": {"quantization": "byte"}}}}
+        assert helpers.get_index_vector_settings(client, "idx")["quantization"] == "byte"
+        assert client.indices.get_mapping.call_count == 2
+
+
+class TestPrepareQueryVector:
+    """Tests for normalizing and quantizing query vectors."""
+
+    def test_float_vectors_are_unit_length(self, helpers):
+        vector = helpers.prepare_query_vector([3.0, 4.0])
+        assert vector == pytest.approx([0.6, 0.8])
+
+    def test_byte_vectors_use_int8_range(self, helpers):
+        vector = helpers.prepare_query_vector([3.0, -4.0, 0.5], "byte")
+        assert vector == [95, -127, 16]
+        assert all(isinstance(x, int) for x in vector)
+
+
+def test_embedding_requests_index_dimension(helpers, mocker):
+    client = MagicMock()
+    client.invoke_model.return_value = {"body": io.BytesIO(json.dumps({"embedding": [0.1] * 384}).encode())}
+    mocker.patch.object(helpers.boto3, "client", return_value=client)
+
+    vector = helpers.get_embedding_for_text("red shoes", 384)
+
+    assert len(vector) == 384
+    body = json.loads(client.invoke_model.call_args.kwargs["body"])
+    assert body["embeddingConfig"] == {"outputEmbeddingLength": 384}
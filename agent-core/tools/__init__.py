@@ -1,5 +1,4 @@
 from tools.search_product import search_product
-from tools.compare_product import compare_product
 from tools.get_recommendation import get_recommendation
 
-__all__ = ["search_product", "compare_product", "get_recommendation"]
+__all__ = ["search_product", "get_recommendation"]
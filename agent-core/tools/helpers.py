@@ -6,12 +6,14 @@ and try/except error handling returning descriptive messages.
 
 import json
 import logging
+import time
+from collections.abc import Iterator
 
 import boto3
 from boto3.dynamodb.conditions import Key
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 
-from config import Config
+from config import INDEX_NAME_TTL_S, Config
 
 logger = logging.getLogger(__name__)
 
@@ -81,18 +83,71 @@ def get_item_info(item_id: str, config: Config) -> dict | str:
         return f"Error fetching item {item_id}: {exc}"
 
 
-def get_embedding_for_text(text: str) -> list[float] | str:
+# Vector settings of an index without a "_meta" block (created before
+# createIndex.py recorded them): full-length float vectors.
+DEFAULT_VECTOR_SETTINGS = {"embedding_dimension": 1024, "quantization": "none"}
+
+_vector_settings: dict[str, dict] = {}
+# Monotonic time until which an index whose mapping could not be read is
+# served the defaults without asking again.
+_vector_settings_retry_at: dict[str, float] = {}
+
+
+def get_index_vector_settings(client: OpenSearch, index: str) -> dict:
+    """Return the embedding length and quantization an index was created with.
+
+    createIndex.py records them in the mapping's ``_meta``, so queries always
+    match what is stored, including after a switch to a new index version.
+    Successful lookups are cached per index name; after a failed one the
+    defaults are returned for ``INDEX_NAME_TTL_S`` seconds before retrying.
+    """
+    if index in _vector_settings:
+        return _vector_settings[index]
+    now = time.monotonic()
+    if now < _vector_settings_retry_at.get(index, 0.0):
+        return DEFAULT_VECTOR_SETTINGS
+    try:
+        mapping = client.indices.get_mapping(index=index)
+        meta = next(iter(mapping.values()))["mappings"].get("_meta", {})
+    except Exception as exc:
+        logger.warning("Could not read vector settings of %s: %s", index, exc)
+        _vector_settings_retry_at[index] = now + INDEX_NAME_TTL_S
+        return DEFAULT_VECTOR_SETTINGS
+    settings = {**DEFAULT_VECTOR_SETTINGS, **meta}
+    _vector_settings[index] = settings
+    return settings
+
+
+def prepare_query_vector(vector: list[float], quantization: str = "none") -> list[float] | list[int]:
+    """Normalize a query vector and quantize it the way the index stores vectors.
+
+    Vectors are scaled to unit length (cosine similarity is unaffected, and
+    inner-product indexes require it). For ``byte`` indexes each component is
+    scaled by the largest magnitude to the int8 range, matching
+    import-data/indexes.prepare_vector.
+    """
+    norm = sum(x * x for x in vector) ** 0.5 or 1.0
+    vector = [x / norm for x in vector]
+    if quantization == "byte":
+        peak = max(abs(x) for x in vector) or 1.0
+        return [max(-128, min(127, round(x * 127 / peak))) for x in vector]
+    return vector
+
+
+def get_embedding_for_text(text: str, dimension: int = 1024) -> list[float] | str:
     """Generate a vector embedding via Bedrock Titan Embed Image V1.
 
     Args:
         text: The input text to embed.
+        dimension: Output embedding length (256, 384 or 1024); must match
+            the index being queried.
 
     Returns:
         List of floats representing the embedding vector,
         or a descriptive error string on failure.
     """
     try:
-        body = json.dumps({"inputText": text})
+        body = json.dumps({"inputText": text, "embeddingConfig": {"outputEmbeddingLength": dimension}})
         bedrock_runtime = boto3.client(
             service_name="bedrock-runtime", region_name="us-east-1"
         )
@@ -109,8 +164,136 @@ def get_embedding_for_text(text: str) -> list[float] | str:
         return f"Error generating embedding: {exc}"
 
 
+class JsonCloseTracker:
+    """Detect when the JSON answer in a text stream closes.
+
+    Only a ``[`` or ``{`` that begins a line or follows a ```json fence can
+    start the answer, so bracketed prose such as "rules [1] and [2]" is not
+    mistaken for it. A closed candidate must parse as an object or a list
+    of objects; otherwise tracking resumes. Brackets inside string literals
+    are ignored, so the tracker can be fed arbitrary chunks of model output
+    as they arrive.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+        self.line_start = True
+        self.recent = ""
+
+    def _reset(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.candidate: list[str] = []
+
+    def feed(self, text: str) -> int | None:
+        """Consume *text* and return the offset just past the closing bracket, if any."""
+        for index, char in enumerate(text):
+            if not self.started:
+                if char in "[{" and (self.line_start or self.recent.rstrip(" ").endswith("```json")):
+                    self.started = True
+                    self.depth = 1
+                    self.candidate = [char]
+                else:
+                    if char == "\n":
+                        self.line_start = True
+                    elif char not in " \t\r":
+                        self.line_start = False
+                    self.recent = (self.recent + char)[-16:]
+                continue
+            self.candidate.append(char)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif char in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    if _is_json_answer("".join(self.candidate)):
+                        return index + 1
+                    self._reset()
+                    self.line_start = False
+                    self.recent = ""
+        return None
+
+
+def _is_json_answer(text: str) -> bool:
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(value, dict) or (isinstance(value, list) and all(isinstance(v, dict) for v in value))
+
+
+def _claude_request_body(prompt: str, max_tokens: int = 1000) -> str:
+    messages = [
+        {
+            "role": "user",
+            "content": [{"type": "text", "text": prompt}],
+        }
+    ]
+    return json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+    )
+
+
+def stream_bedrock_llm(prompt: str, config: Config, usage: dict | None = None) -> Iterator[str]:
+    """Stream Claude's completion for *prompt* as text deltas.
+
+    Uses ``invoke_model_with_response_stream``. Closing the generator early
+    closes the underlying event stream, so the caller stops reading (and
+    waiting for) the rest of the completion.
+
+    Args:
+        prompt: The text prompt to send to the model.
+        config: Runtime configuration with model_id.
+        usage: Optional dict that receives ``input_tokens`` and
+            ``output_tokens`` as the stream reports them.
+
+    Yields:
+        Text fragments in the order the model produces them.
+    """
+    bedrock_runtime = boto3.client(
+        service_name="bedrock-runtime", region_name="us-east-1"
+    )
+    response = bedrock_runtime.invoke_model_with_response_stream(
+        body=_claude_request_body(prompt), modelId=config.model_id
+    )
+    events = response["body"]
+    try:
+        for event in events:
+            if "chunk" not in event:
+                continue
+            chunk = json.loads(event["chunk"]["bytes"])
+            if chunk["type"] == "message_start" and usage is not None:
+                usage["input_tokens"] = chunk["message"].get("usage", {}).get("input_tokens")
+            elif chunk["type"] == "content_block_delta" and chunk["delta"].get("type") == "text_delta":
+                yield chunk["delta"]["text"]
+            elif chunk["type"] == "message_delta" and usage is not None:
+                usage["output_tokens"] = chunk.get("usage", {}).get("output_tokens")
+    finally:
+        events.close()
+
+
 def call_bedrock_llm(prompt: str, config: Config) -> str:
-    """Invoke Bedrock Claude with the given prompt.
+    """Invoke Bedrock Claude with the given prompt, streaming the completion.
+
+    Like the Lambda's ``call_bedrock``, reading stops as soon as the first
+    top-level JSON object or array in the output is complete, so the
+    caller does not wait for trailing prose. Output without JSON is
+    returned in full.
 
     Args:
         prompt: The text prompt to send to the model.
@@ -121,28 +304,36 @@ def call_bedrock_llm(prompt: str, config: Config) -> str:
         or a descriptive error string on failure.
     """
     try:
-        max_tokens = 1000
-        messages = [
-            {
-                "role": "user",
-                "content": [{"type": "text", "text": prompt}],
-            }
-        ]
-        body = json.dumps(
-            {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "messages": messages,
-            }
-        )
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime", region_name="us-east-1"
-        )
-        response = bedrock_runtime.invoke_model(
-            body=body, modelId=config.model_id
+        start = time.perf_counter()
+        usage: dict = {}
+        parts: list[str] = []
+        first_token_ms = None
+        stopped_early = False
+        tracker = JsonCloseTracker()
+        deltas = stream_bedrock_llm(prompt, config, usage)
+        try:
+            for text in deltas:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                end = tracker.feed(text)
+                if end is not None:
+                    text = text[:end]
+                parts.append(text)
+                if end is not None:
+                    stopped_early = True
+                    break
+        finally:
+            deltas.close()
+        logger.info(
+            "Bedrock %s streamed in %.1f ms (ttft=%s ms, stopped_early=%s, input_tokens=%s, output_tokens=%s)",
+            config.model_id,
+            (time.perf_counter() - start) * 1000,
+            f"{first_token_ms:.1f}" if first_token_ms is not None else "n/a",
+            stopped_early,
+            usage.get("input_tokens"),
+            usage.get("output_tokens"),
         )
-        result = json.loads(response["body"].read())["content"][0]["text"]
-        return result
+        return "".join(parts)
     except Exception as exc:
         logger.error("Error generating summary: %s", exc)
         return f"Error generating summary: {exc}"
@@ -10,7 +10,12 @@ import logging
 from strands import tool
 
 from config import Config
-from tools.helpers import create_opensearch_client, get_embedding_for_text
+from tools.helpers import (
+    create_opensearch_client,
+    get_embedding_for_text,
+    get_index_vector_settings,
+    prepare_query_vector,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +32,19 @@ def search_product(condition: str) -> str:
         string with up to 5 matching products (item_id, score, image, price, style, description).
     """
     try:
-        # Generate embedding for the search condition
-        text_embedding = get_embedding_for_text(condition)
-        if isinstance(text_embedding, str):
-            return text_embedding
-
         # Create OpenSearch client
         client = create_opensearch_client(config)
         if isinstance(client, str):
             return client
 
+        # Embed the search condition the same way the index stores vectors
+        index_name = config.current_index_name()
+        settings = get_index_vector_settings(client, index_name)
+        text_embedding = get_embedding_for_text(condition, settings["embedding_dimension"])
+        if isinstance(text_embedding, str):
+            return text_embedding
+        text_embedding = prepare_query_vector(text_embedding, settings["quantization"])
+
         # Execute KNN query
         query = {
             "size": 3,
@@ -57,7 +65,7 @@ def search_product(condition: str) -> str:
         }
 
         response = client.search(
-            body=query, index="product-search-multimodal-index"
+            body=query, index=index_name
         )
 
         # Map hits to product dicts
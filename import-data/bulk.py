@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Bulk item statuses worth retrying; anything else is a permanent failure.
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class BulkStats:
+    def __init__(self):
+        self.docs = 0
+        self.bytes = 0
+        self.requests = 0
+        self.retried = 0
+        self.failed = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, docs=0, size=0, requests=0, retried=0, failed=None):
+        with self._lock:
+            self.docs += docs
+            self.bytes += size
+            self.requests += requests
+            self.retried += retried
+            if failed:
+                self.failed.extend(failed)
+
+    def summary(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.started)
+        rate = self.docs / elapsed if elapsed else 0.0
+        throughput = self.bytes / elapsed if elapsed else 0.0
+        return (f"Indexed {self.docs} docs ({self.bytes / 1e6:.1f} MB) in {self.requests} bulk requests "
+                f"over {elapsed:.1f}s: {rate:.1f} docs/s, {throughput / 1e6:.2f} MB/s, "
+                f"{self.retried} retried, {len(self.failed)} failed")
+
+
+class BulkIndexer:
+    """Batch documents into OpenSearch _bulk requests sent by parallel workers.
+
+    A batch is sent when it reaches max_docs documents or max_bytes of
+    NDJSON, whichever comes first. Documents are indexed with an explicit
+    _id, so re-running an import overwrites documents instead of adding
+    duplicates. When a bulk response reports per-document errors, only the
+    documents that failed with a retryable status are sent again, with
+    exponential backoff; the rest are recorded in stats.failed. If given,
+    on_indexed is called from a worker thread with the ids of the documents
+    each bulk response confirmed.
+    """
+
+    def __init__(self, client, index, max_docs=500, max_bytes=5 * 1024 * 1024, workers=4,
+                 max_retries=3, retry_delay=1.0, stats=None, on_indexed=None):
+        self.client = client
+        self.index = index
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.stats = stats or BulkStats()
+        self.on_indexed = on_indexed
+        self._batch = []
+        self._batch_bytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bulk')
+        # Caps batches waiting for a worker so the producer cannot run ahead.
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, doc_id, doc):
+        action = json.dumps({"index": {"_index": self.index, "_id": doc_id}})
+        source = json.dumps(doc)
+        size = len(action) + len(source) + 2
+        if self._batch and (len(self._batch) >= self.max_docs or self._batch_bytes + size > self.max_bytes):
+            self.flush()
+        self._batch.append((doc_id, action, source))
+        self._batch_bytes += size
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        self._slots.acquire()
+        future = self._executor.submit(self._send_with_retries, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+        self.stats.elapsed = time.perf_counter() - self.stats.started
+        print(self.stats.summary())
+
+    def _send_with_retries(self, batch):
+        for attempt in range(self.max_retries + 1):
+            body = ''.join(f"{action}\n{source}\n" for _, action, source in batch)
+            try:
+                response = self.client.bulk(body=body)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.stats.add(requests=1, failed=[(doc_id, str(e)) for doc_id, _, _ in batch])
+                    return
+                print(f"Bulk request of {len(batch)} docs failed ({e}); retrying")
+                self.stats.add(requests=1, retried=len(batch))
+                time.sleep(self.retry_delay * (2 ** attempt))
+                continue
+
+            retry, failed, indexed = [], [], []
+            for entry, result in zip(batch, response['items']):
+                outcome = next(iter(result.values()))
+                status = outcome.get('status', 200)
+                if status < 300:
+                    indexed.append(entry[0])
+                    continue
+                if status in RETRYABLE_STATUS and attempt < self.max_retries:
+                    retry.append(entry)
+                else:
+                    failed.append((entry[0], json.dumps(outcome.get('error', status))))
+            size = sum(len(action) + len(source) + 2 for _, action, source in batch)
+            if indexed and self.on_indexed:
+                self.on_indexed(indexed)
+            self.stats.add(docs=len(indexed), size=size, requests=1, retried=len(retry), failed=failed)
+            for doc_id, error in failed:
+                print(f"Failed to index {doc_id}: {error}")
+            if not retry:
+                return
+            batch = retry
+            time.sleep(self.retry_delay * (2 ** attempt))
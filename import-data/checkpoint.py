@@ -0,0 +1,73 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def content_hash(*parts):
+    """Stable hash of the values that determine an item's embedding or output."""
+    payload = json.dumps([None if p is None else str(p) for p in parts])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Checkpoint:
+    """Local SQLite record of the content hash last processed for each item.
+
+    Hashes are written only after the work for an item is durably done (for
+    the embedding pipeline, after its bulk request succeeded), so a crashed
+    run can simply be started again: everything already committed is
+    skipped and the rest is processed. One database can hold several
+    pipelines, each in its own namespace.
+    """
+
+    def __init__(self, path, namespace='embedding'):
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint ("
+            " namespace TEXT NOT NULL, item_id TEXT NOT NULL, content_hash TEXT NOT NULL,"
+            " updated_at REAL NOT NULL, PRIMARY KEY (namespace, item_id))"
+        )
+        self._conn.commit()
+
+    def get(self, item_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM checkpoint WHERE namespace = ? AND item_id = ?",
+                (self.namespace, item_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, item_id, digest, since=None):
+        """True if item_id was committed with digest (at or after since, if given)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, updated_at FROM checkpoint WHERE namespace = ? AND item_id = ?",
+                (self.namespace, item_id)
+            ).fetchone()
+        return bool(row) and row[0] == digest and (since is None or row[1] >= since)
+
+    def commit(self, hashes):
+        """Record {item_id: content_hash} in a single transaction."""
+        if not hashes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint (namespace, item_id, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+                [(self.namespace, item_id, digest, now) for item_id, digest in hashes.items()]
+            )
+            self._conn.commit()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM checkpoint WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,69 +1,305 @@
-import boto3
 import os
 import argparse
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
-
-# Add argument parser at the beginning
-parser = argparse.ArgumentParser(description='Create OpenSearch index')
-parser.add_argument('--host', required=True, help='OpenSearch host domain')
-args = parser.parse_args()
-
-# Set up connection details
-service = 'aoss'
-region = 'us-east-1'
-host = args.host
-port = 443
-credentials = boto3.Session().get_credentials()
-auth = AWSV4SignerAuth(credentials, region, service)
-
-# Establish client for OpenSearch
-client = OpenSearch(
-    hosts=[{'host': host, 'port': port}],
-    http_auth=auth,
-    use_ssl=True,
-    verify_certs=True,
-    ssl_assert_hostname=False,
-    ssl_show_warn=False,
-    connection_class=RequestsHttpConnection,
-    pool_maxsize=20
-)
-
-# Define the index configuration
-index_name = "product-search-multimodal-index"
-index_body = {
-    "settings": {
-        "index": {
-            "number_of_shards": 2,
-            "knn.algo_param": {"ef_search": 512},
-            "knn": True
+import sys
+from boto3.dynamodb.conditions import Attr
+
+import indexes
+from scan import make_item_table
+
+EMBEDDING_DIMENSIONS = (256, 384, 1024)  # Titan Multimodal Embeddings output lengths
+ENGINES = ('nmslib', 'faiss', 'lucene')
+# Quantizations each engine can store: faiss encodes fp16 with its scalar
+# quantizer, lucene stores byte (int8) vectors natively.
+QUANTIZATIONS = {'nmslib': ('none',), 'faiss': ('none', 'fp16'), 'lucene': ('none', 'byte')}
+
+
+def build_index_body(dimension=1024, engine='nmslib', quantization='none',
+                     ef_search=512, ef_construction=512, m=16):
+    """Index settings and mappings for the product vectors.
+
+    The vector settings are also recorded in the mapping's _meta, which is
+    where embedding.py and the agent's search tool read them from, so
+    documents and queries always match the index they go to.
+    """
+    # faiss vectors are normalized by the loaders, so inner product is cosine.
+    space_type = 'innerproduct' if engine == 'faiss' else 'cosinesimil'
+    vector_field = {
+        "type": "knn_vector",
+        "dimension": dimension,
+        "method": {
+            "engine": engine,
+            "space_type": space_type,
+            "name": "hnsw",
+            "parameters": {"ef_construction": ef_construction, "m": m}
         }
-    },
-    "mappings": {
-        "properties": {
-            "item_id": {"type": "text"},
-            "image_path": {"type": "text"},
-            "image_product_description": {"type": "text"},
-            "price": {"type": "text"},
-            "style": {"type": "text"},
-            "multimodal_vector": {
-                "type": "knn_vector",
-                "dimension": 1024,
-                "method": {
-                    "engine": "nmslib",
-                    "space_type": "cosinesimil",
-                    "name": "hnsw",
-                    "parameters": {"ef_construction": 512, "m": 16}
-                }
+    }
+    if quantization == 'fp16':
+        vector_field["method"]["parameters"]["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+    elif quantization == 'byte':
+        vector_field["data_type"] = "byte"
+
+    return {
+        "settings": {
+            "index": {
+                "number_of_shards": 2,
+                "knn.algo_param": {"ef_search": ef_search},
+                "knn": True
+            }
+        },
+        "mappings": {
+            "_meta": {
+                "embedding_dimension": dimension,
+                "quantization": quantization,
+                "engine": engine,
+                "space_type": space_type
+            },
+            "properties": {
+                # keyword so exports can page with search_after sorted on it
+                "item_id": {"type": "keyword"},
+                "image_path": {"type": "text"},
+                "image_product_description": {"type": "text"},
+                "price": {"type": "text"},
+                "style": {"type": "text"},
+                "content_hash": {"type": "keyword"},
+                "multimodal_vector": vector_field
             }
         }
     }
-}
 
-# Check if the index exists and delete it if it does
-if client.indices.exists(index=index_name):
-    response = client.indices.delete(index=index_name)
+
+def list_versions(client):
+    """Sorted (version, index_name) pairs for every product index in the collection."""
+    found = client.indices.get(index=indexes.BASE_INDEX + '*')
+    versions = [(indexes.version_of(name), name) for name in found]
+    return sorted(v for v in versions if v[0] is not None)
+
+
+def current_index(client, args):
+    """Index that readers are using now, or None before the first import."""
+    if args.alias:
+        if client.indices.exists_alias(name=args.alias):
+            return next(iter(client.indices.get_alias(name=args.alias)))
+        return None
+    live = indexes.read_pointer(args.parameter_prefix)
+    if live:
+        return live
+    return indexes.BASE_INDEX if client.indices.exists(index=indexes.BASE_INDEX) else None
+
+
+def create(client, args):
+    live = current_index(client, args)
+    if live is None and not args.alias:
+        # First import: nothing is serving yet, so keep the original unversioned
+        # layout and no pointer is needed.
+        name = indexes.BASE_INDEX
+    else:
+        versions = list_versions(client)
+        name = indexes.version_name(args.version or max([v for v, _ in versions] + [0]) + 1)
+    if client.indices.exists(index=name):
+        raise SystemExit(f"{name} already exists; pick another --version or run gc")
+
+    body = build_index_body(args.dimension, args.engine, args.quantization,
+                            args.ef_search, args.ef_construction, args.m)
+    response = client.indices.create(index=name, body=body)
     print(response)
+    print(f"{name}: {args.dimension}-dim {args.quantization} vectors, {args.engine} HNSW "
+          f"(m={args.m}, ef_construction={args.ef_construction}, ef_search={args.ef_search})")
+    if name == indexes.BASE_INDEX:
+        return
+    print(f"Created {name} while {live} keeps serving. Load it, then switch over:\n"
+          f"  python embedding.py --host {args.host} --bucket <bucket> --index {name}\n"
+          f"  python createIndex.py --host {args.host} promote --index {name}")
+
+
+def expected_count(table_name):
+    """Items in the DynamoDB table that have a description, i.e. should be indexed."""
+    table = make_item_table(table_name)
+    kwargs = {'Select': 'COUNT',
+              'FilterExpression': Attr('DESCRIPTION').exists() & Attr('DESCRIPTION').ne('')}
+    total = 0
+    while True:
+        response = table.scan(**kwargs)
+        total += response['Count']
+        if 'LastEvaluatedKey' not in response:
+            return total
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def knn_ids(client, index, vector, k):
+    query = {"size": k, "query": {"knn": {"multimodal_vector": {"vector": vector, "k": k}}}, "_source": ["item_id"]}
+    return [hit['_source']['item_id'] for hit in client.search(index=index, body=query)['hits']['hits']]
+
+
+def recall_check(client, index, live, sample, k):
+    """Query the new index with a sample of its own vectors.
+
+    Returns the fraction of samples that find themselves in the top k, and
+    the mean top-k overlap with the live index (None if it cannot be queried,
+    e.g. because the vector dimension changed).
+    """
+    hits = client.search(index=index, body={"size": sample, "query": {"match_all": {}},
+                                            "_source": ["item_id", "multimodal_vector"]})['hits']['hits']
+    found, overlaps = 0, []
+    for hit in hits:
+        vector = hit['_source']['multimodal_vector']
+        ids = knn_ids(client, index, vector, k)
+        found += hit['_source']['item_id'] in ids
+        if live and overlaps is not None:
+            try:
+                overlaps.append(len(set(ids) & set(knn_ids(client, live, vector, k))) / k)
+            except Exception as e:
+                print(f"Skipping overlap with {live}: {e}")
+                overlaps = None
+    self_recall = found / len(hits) if hits else 0.0
+    return self_recall, (sum(overlaps) / len(overlaps) if overlaps else None)
+
+
+def verify(client, index, live, args):
+    try:
+        client.indices.refresh(index=index)
+    except Exception:
+        pass  # Serverless collections refresh on their own schedule and reject _refresh
+    count = client.count(index=index)['count']
+    expected = expected_count(args.table)
+    live_count = client.count(index=live)['count'] if live and client.indices.exists(index=live) else None
+    print(f"{index}: {count} docs, {expected} described items in {args.table}"
+          + (f", {live_count} docs in {live}" if live_count is not None else ""))
+    problems = []
+    if count < expected * args.min_count_ratio:
+        problems.append(f"only {count} of {expected} items indexed")
+
+    self_recall, overlap = recall_check(client, index, live, args.sample, args.k)
+    print(f"Sample of {args.sample}: self recall@{args.k} {self_recall:.1%}"
+          + (f", top-{args.k} overlap with {live} {overlap:.1%}" if overlap is not None else ""))
+    if self_recall < args.min_recall:
+        problems.append(f"self recall {self_recall:.1%} below {args.min_recall:.0%}")
+    return problems
+
+
+def switch(client, index, live, args):
+    if args.alias:
+        # One update_aliases call, so readers see either the old or the new index.
+        actions = [{"remove": {"index": live, "alias": args.alias}}] if live else []
+        actions.append({"add": {"index": index, "alias": args.alias}})
+        print(client.indices.update_aliases(body={"actions": actions}))
+    else:
+        indexes.write_pointer(index, args.parameter_prefix)
+    print(f"Switched {args.alias or indexes.pointer_name(args.parameter_prefix)} from {live} to {index}")
+
+
+def gc(client, args):
+    """Delete versions older than the live one, keeping the newest --keep for rollback.
+
+    Versions newer than the live one are never touched, since they may be a
+    reindex in progress. Neither is any index the pointer named within the
+    last --grace seconds, because readers that cached the pointer may still
+    be querying it.
+    """
+    live = current_index(client, args)
+    live_version = indexes.version_of(live) if live else None
+    if live_version is None:
+        print("No live index found; nothing to collect")
+        return
+    in_use = {live}
+    if not args.alias:
+        try:
+            in_use |= indexes.recent_targets(args.grace, args.parameter_prefix)
+        except Exception as e:
+            print(f"Could not read the history of {indexes.pointer_name(args.parameter_prefix)} ({e}); "
+                  f"not deleting anything")
+            return
+    older = [name for version, name in reversed(list_versions(client)) if version < live_version]
+    kept = older[:args.keep]
+    for name in older[args.keep:]:
+        if name in in_use:
+            print(f"Keeping {name}: live within the last {args.grace}s")
+            kept.append(name)
+            continue
+        print(f"Deleting {name}: {client.indices.delete(index=name)}")
+    print(f"Live: {live}; kept {kept or 'no older versions'}")
+
+
+def promote(client, args):
+    live = current_index(client, args)
+    versions = list_versions(client)
+    index = args.index or (versions[-1][1] if versions else None)
+    if index is None:
+        raise SystemExit("No index versions found; run create first")
+    if index == live:
+        raise SystemExit(f"{index} is already live")
+    if not args.skip_checks:
+        problems = verify(client, index, live, args)
+        if problems:
+            raise SystemExit(f"Not switching to {index}: {'; '.join(problems)}")
+    switch(client, index, live, args)
+    if args.keep >= 0:
+        gc(client, args)
+
+
+def status(client, args):
+    live = current_index(client, args)
+    for version, name in list_versions(client):
+        count = client.count(index=name)['count']
+        print(f"{'*' if name == live else ' '} {name}: {count} docs")
+
+
+def add_vector_arguments(parser):
+    parser.add_argument('--dimension', type=int, choices=EMBEDDING_DIMENSIONS, default=1024,
+                        help='Titan embedding length stored in the index')
+    parser.add_argument('--engine', choices=ENGINES, default='nmslib', help='k-NN engine')
+    parser.add_argument('--quantization', choices=('none', 'fp16', 'byte'), default='none',
+                        help='vector storage: float32, fp16 (faiss) or byte (lucene)')
+    parser.add_argument('--ef-search', type=int, default=512, help='HNSW ef_search')
+    parser.add_argument('--ef-construction', type=int, default=512, help='HNSW ef_construction')
+    parser.add_argument('--m', type=int, default=16, help='HNSW m')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create OpenSearch index versions and switch search over without downtime'
+    )
+    parser.add_argument('--host', required=True, help='OpenSearch host domain')
+    parser.add_argument('--parameter-prefix', default=indexes.DEFAULT_PARAMETER_PREFIX,
+                        help='SSM prefix of the agent configuration holding the aoss_index_name pointer')
+    parser.add_argument('--alias',
+                        help='switch by moving this alias instead of the SSM pointer '
+                             '(OpenSearch domains only; Serverless collections have no aliases)')
+    commands = parser.add_subparsers(dest='command')
+
+    create_parser = commands.add_parser('create', help='create the next index version (default)')
+    create_parser.add_argument('--version', type=int, help='version number (default: highest + 1)')
+    add_vector_arguments(create_parser)
+
+    promote_parser = commands.add_parser('promote', help='verify an index version and make it live')
+    promote_parser.add_argument('--index', help='index to promote (default: the highest version)')
+    promote_parser.add_argument('--table', default='item_table', help='DynamoDB item table to count against')
+    promote_parser.add_argument('--min-count-ratio', type=float, default=0.99,
+                                help='minimum fraction of described items that must be indexed')
+    promote_parser.add_argument('--sample', type=int, default=20, help='documents used for the recall check')
+    promote_parser.add_argument('--k', type=int, default=10, help='k for the recall check')
+    promote_parser.add_argument('--min-recall', type=float, default=0.95, help='minimum self recall@k')
+    promote_parser.add_argument('--skip-checks', action='store_true', help='switch without verifying')
+    promote_parser.add_argument('--keep', type=int, default=1,
+                                help='older versions to keep after switching; -1 skips garbage collection')
+    promote_parser.add_argument('--grace', type=int, default=900,
+                                help='seconds an index that was live stays protected from garbage collection')
+
+    gc_parser = commands.add_parser('gc', help='delete index versions older than the live one')
+    gc_parser.add_argument('--keep', type=int, default=1, help='older versions to keep for rollback')
+    gc_parser.add_argument('--grace', type=int, default=900,
+                           help='seconds an index that was live stays protected, so cached readers can move off it')
+
+    commands.add_parser('status', help='list index versions and the live one')
+    args = parser.parse_args()
+    if args.command is None:
+        # Bare invocation creates the next version with the default layout.
+        args = parser.parse_args(sys.argv[1:] + ['create'])
+    if args.command == 'create' and args.quantization not in QUANTIZATIONS[args.engine]:
+        parser.error(f"{args.engine} supports quantization {', '.join(QUANTIZATIONS[args.engine])}")
+
+    client = indexes.create_client(args.host)
+    {'create': create, 'promote': promote, 'gc': gc, 'status': status}[args.command](client, args)
+
 
-# Create the index with the defined settings and mappings
-response = client.indices.create(index=index_name, body=index_body)
-print(response)
+if __name__ == "__main__":
+    main()
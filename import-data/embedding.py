@@ -3,28 +3,56 @@ import json
 import base64
 import boto3
 from botocore.config import Config
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
 
-# Add argument parser at the beginning
-parser = argparse.ArgumentParser(description='Embedding')
-parser.add_argument('--host', required=True, help='OpenSearch host domain')
-parser.add_argument('--bucket', required=True, help='S3 bucket name')
-args = parser.parse_args()
-host = args.host
-bucket_name = args.bucket
+from bulk import BulkIndexer
+from checkpoint import Checkpoint, content_hash
+import imageprep
+import indexes
+from ratelimit import AdaptiveRateLimiter, Progress
+from scan import make_item_table, parallel_scan, per_thread_table
 
-def get_embedding_for_product_image_and_description(image_path, description):
+REGION = 'us-east-1'
+INDEX_NAME = indexes.BASE_INDEX
+
+# Setup AWS clients and resources
+session = boto3.Session(region_name=REGION)
+s3_client = session.client('s3', config=Config(retries={'max_attempts': 5, 'mode': 'standard'}, max_pool_connections=64))
+# Throttles are surfaced instead of retried inside botocore so the rate
+# limiter can see them and slow every worker down together; call_rate_limited
+# retries them and other transient errors itself.
+bedrock = boto3.client(
+    service_name="bedrock-runtime", region_name=REGION,
+    endpoint_url="https://bedrock-runtime.us-east-1.amazonaws.com",
+    config=Config(retries={'total_max_attempts': 1}, max_pool_connections=64)
+)
+# Replaced in main() with the settings from the command line.
+image_prep = imageprep.ImagePreprocessor(enabled=False)
+# Embedding length and quantization of the target index, read in main().
+vector_settings = dict(indexes.DEFAULT_VECTOR_SETTINGS)
+THROTTLE_CODES = ('ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException')
+# Errors worth retrying that say nothing about the request rate.
+TRANSIENT_CODES = ('ModelTimeoutException', 'InternalServerException', 'ModelNotReadyException')
+
+def get_embedding_for_product_image_and_description(bucket_name, image_path, description):
     """Fetch embedding for product image and description using Amazon Bedrock."""
-    s3_response = s3_client.get_object(Bucket=bucket_name, Key=image_path)
-    image_content = s3_response['Body'].read()
+    image_content, _ = image_prep.fetch(s3_client, bucket_name, image_path)
+    return embed_image_and_description(image_content, description)
+
+def embed_image_and_description(image_content, description):
+    """Embed already-fetched image bytes together with the description."""
     image_base64 = base64.b64encode(image_content).decode('utf-8')
 
     request_body = json.dumps({
         "inputImage": image_base64,
-        "inputText": description
+        "inputText": description,
+        "embeddingConfig": {"outputEmbeddingLength": vector_settings['embedding_dimension']}
     })
-    response = bedrock.invoke_model(
+    response = image_prep.timed_call(
+        bedrock.invoke_model,
         body=request_body,
         modelId="amazon.titan-embed-image-v1",
         accept="application/json",
@@ -32,57 +60,224 @@ def get_embedding_for_product_image_and_description(image_path, description):
     )
     return json.loads(response['body'].read().decode('utf8'))
 
-# Setup AWS clients and resources
-session = boto3.Session(region_name='us-east-1')
-s3_client = session.client('s3', config=Config(retries={'max_attempts': 5, 'mode': 'standard'}))
-dynamodb = session.resource('dynamodb', config=Config(retries={'max_attempts': 5, 'mode': 'standard'}))
-table = dynamodb.Table('item_table')
-bedrock = boto3.client(
-    service_name="bedrock-runtime", region_name="us-east-1",
-    endpoint_url="https://bedrock-runtime.us-east-1.amazonaws.com"
-)
+def embed_item(item, bucket_name, limiter, progress, max_attempts=8):
+    """Embed one item, waiting on the shared limiter before each Bedrock call."""
+    return call_rate_limited(
+        lambda: get_embedding_for_product_image_and_description(bucket_name, item.get('IMAGE'), item.get('DESCRIPTION')),
+        limiter, progress, max_attempts
+    )
 
-# Scan DynamoDB table to retrieve items
-response = table.scan()
-items = [item for item in response['Items']]
-
-# Setup OpenSearch connection
-aoss_client = boto3.client('opensearchserverless')
-auth = AWSV4SignerAuth(session.get_credentials(), "us-east-1", 'aoss')
-client = OpenSearch(
-    hosts=[{'host': host, 'port': 443}],
-    http_auth=auth,
-    use_ssl=True,
-    verify_certs=True,
-    connection_class=RequestsHttpConnection,
-    pool_maxsize=20
-)
+def is_transient(error):
+    """True for 5xx responses, model timeouts and dropped connections."""
+    if isinstance(error, (BotoConnectionError, HTTPClientError)):
+        return True
+    if isinstance(error, ClientError):
+        return (error.response['Error']['Code'] in TRANSIENT_CODES
+                or error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500)
+    return False
+
+def call_rate_limited(func, limiter, progress, max_attempts=8):
+    """Call func under the shared limiter, backing off and retrying on throttles.
+
+    Transient errors are retried with the same backoff but do not lower the
+    shared rate.
+    """
+    for attempt in range(max_attempts):
+        limiter.acquire()
+        try:
+            result = func()
+        except (ClientError, BotoConnectionError, HTTPClientError) as e:
+            throttled = isinstance(e, ClientError) and e.response['Error']['Code'] in THROTTLE_CODES
+            if not (throttled or is_transient(e)) or attempt == max_attempts - 1:
+                raise
+            if throttled:
+                limiter.on_throttle()
+            progress.record(requests=1, throttled=int(throttled))
+            time.sleep(min(2 ** attempt * 0.1, 5))
+            continue
+        limiter.on_success()
+        progress.record(done=1, requests=1)
+        return result
 
-# Process each item to get embeddings and index in OpenSearch
-for i, item in enumerate(items):
+def embed_items(items, bucket_name, workers, limiter, progress):
+    """Yield (item, vector_data) pairs, embedding up to `workers` items concurrently.
+
+    Items without a description are skipped; items that fail are reported and
+    dropped. At most 2 * workers items are in flight, so a fast scan does not
+    pile up in memory.
+    """
+    def results(futures):
+        for future in futures:
+            item = futures_to_items.pop(future)
+            try:
+                yield item, future.result()
+            except Exception as e:
+                progress.record(errors=1)
+                print(f"Error processing item (ID: {item.get('ITEM_ID')}): {str(e)}")
+
+    futures_to_items = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='embed') as executor:
+        for item in items:
+            # 檢查是否有描述
+            if not item.get('DESCRIPTION'):
+                print(f"Skipping item (ID: {item.get('ITEM_ID')}) due to missing description.")
+                progress.record(skipped=1)
+                continue
+            future = executor.submit(embed_item, item, bucket_name, limiter, progress)
+            futures_to_items[future] = item
+            if len(futures_to_items) >= workers * 2:
+                done, _ = wait(futures_to_items, return_when=FIRST_COMPLETED)
+                yield from results(done)
+        yield from results(list(futures_to_items))
+
+def head_image(bucket_name, image_path):
     try:
-        # 檢查是否有描述
-        if not item.get('DESCRIPTION'):
-            print(f"Skipping item {i} (ID: {item.get('ITEM_ID')}) due to missing description.")
+        return s3_client.head_object(Bucket=bucket_name, Key=image_path)
+    except ClientError:
+        # Missing images still get hashed; embedding them will report the error.
+        return None
+
+def get_image_etag(bucket_name, image_path):
+    head = head_image(bucket_name, image_path)
+    return head['ETag'] if head else None
+
+def changed_items(items, bucket_name, checkpoint, counts, workers=16, force=False, progress=None):
+    """Yield only items whose content hash differs from the checkpoint.
+
+    The hash covers the image object's ETag plus DESCRIPTION, PRICE and
+    STYLE, and is attached to each yielded item as '_content_hash'. ETags
+    are fetched with concurrent HEAD requests, a chunk of items at a time.
+    counts is updated with new/changed/unchanged totals, and unchanged
+    items are recorded as skipped in progress so the ETA stays honest.
+    """
+    def classify(chunk):
+        etags = executor.map(lambda item: get_image_etag(bucket_name, item.get('IMAGE')), chunk)
+        for item, etag in zip(chunk, etags):
+            if not item.get('DESCRIPTION'):
+                yield item
+                continue
+            digest = content_hash(etag, item.get('DESCRIPTION'), item.get('PRICE'), item.get('STYLE'))
+            previous = checkpoint.get(item['ITEM_ID'])
+            if previous == digest and not force:
+                counts['unchanged'] += 1
+                if progress:
+                    progress.record(skipped=1)
+                continue
+            counts['new' if previous is None else 'changed'] += 1
+            item['_content_hash'] = digest
+            yield item
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='head') as executor:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= workers * 4:
+                yield from classify(chunk)
+                chunk = []
+        yield from classify(chunk)
+
+def dry_run_summary(items, counts):
+    """Drain changed_items() and describe what a real run would re-embed."""
+    missing = sum(1 for item in items if not item.get('DESCRIPTION'))
+    return (f"Would re-embed {counts['new'] + counts['changed']} items "
+            f"({counts['new']} new, {counts['changed']} changed); "
+            f"{counts['unchanged']} unchanged, {missing} without a description")
+
+def committer(checkpoint, pending_hashes):
+    """Return a BulkIndexer on_indexed callback that commits confirmed hashes.
+
+    Hashes wait in pending_hashes until the bulk response confirms the
+    document, so a crashed run resumes by skipping only what was indexed.
+    """
+    def commit_indexed(item_ids):
+        checkpoint.commit({item_id: pending_hashes.pop(item_id) for item_id in item_ids if item_id in pending_hashes})
+    return commit_indexed
+
+def main():
+    parser = argparse.ArgumentParser(description='Embedding')
+    parser.add_argument('--host', required=True, help='OpenSearch host domain')
+    parser.add_argument('--bucket', required=True, help='S3 bucket name')
+    parser.add_argument('--table', default='item_table', help='DynamoDB item table name')
+    parser.add_argument('--index', help='OpenSearch index to load (default: the live index named by the SSM pointer)')
+    parser.add_argument('--parameter-prefix', default=indexes.DEFAULT_PARAMETER_PREFIX,
+                        help='SSM prefix holding the aoss_index_name pointer')
+    parser.add_argument('--segments', type=int, default=4, help='parallel scan segments')
+    parser.add_argument('--queue-size', type=int, default=1000, help='max scanned items buffered in memory')
+    parser.add_argument('--bulk-docs', type=int, default=500, help='max documents per _bulk request')
+    parser.add_argument('--bulk-mb', type=float, default=5, help='max _bulk request size in MB')
+    parser.add_argument('--bulk-workers', type=int, default=4, help='parallel _bulk requests')
+    parser.add_argument('--workers', type=int, default=16, help='concurrent embedding requests')
+    parser.add_argument('--rate', type=float, default=10.0, help='initial Bedrock requests per second')
+    parser.add_argument('--max-rate', type=float, default=100.0, help='upper bound on Bedrock requests per second')
+    parser.add_argument('--checkpoint', default='embedding-checkpoint.sqlite',
+                        help='SQLite file recording the content hash of every indexed item')
+    parser.add_argument('--full', action='store_true', help='re-embed every item, ignoring the checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='only report how many items would be re-embedded')
+    imageprep.add_arguments(parser)
+    args = parser.parse_args()
+
+    global image_prep
+    image_prep = imageprep.from_args(args)
+
+    limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.max_rate, burst=args.workers)
+    # item_count is refreshed by DynamoDB about every six hours; good enough for an ETA.
+    progress = Progress(total=make_item_table(args.table).item_count or None, limiter=limiter)
+
+    index_name = args.index or indexes.live_index(args.parameter_prefix)
+    checkpoint = Checkpoint(args.checkpoint, namespace=indexes.checkpoint_namespace(index_name))
+    counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+    items = parallel_scan(per_thread_table(args.table), args.segments, args.queue_size)
+    items = changed_items(items, args.bucket, checkpoint, counts, args.workers, force=args.full, progress=progress)
+
+    if args.dry_run:
+        print(dry_run_summary(items, counts))
+        return
+
+    pending_hashes = {}
+    commit_indexed = committer(checkpoint, pending_hashes)
+
+    client = indexes.create_client(args.host)
+    global vector_settings
+    vector_settings = indexes.vector_settings(client, index_name)
+    print(f"Loading {index_name}: {vector_settings['embedding_dimension']}-dim "
+          f"{vector_settings['quantization']} vectors")
+    indexer = BulkIndexer(client, index_name, max_docs=args.bulk_docs,
+                          max_bytes=int(args.bulk_mb * 1024 * 1024), workers=args.bulk_workers,
+                          on_indexed=commit_indexed)
+
+    # Stream items from a parallel scan and process each one as it arrives
+    embedded = embed_items(items, args.bucket, args.workers, limiter, progress)
+    with indexer:
+        index_items(embedded, indexer, pending_hashes)
+    print(progress.line())
+    print(image_prep.stats.summary())
+    print(f"Re-embedded into {index_name}: {counts['new']} new and {counts['changed']} changed items; "
+          f"skipped {counts['unchanged']} unchanged ({checkpoint.count()} items in {args.checkpoint})")
+    checkpoint.close()
+
+def build_document(item, vector_data):
+    return {
+        "item_id": item['ITEM_ID'],
+        "image_path": item['IMAGE'],
+        "image_product_description": item['DESCRIPTION'],
+        "price": item.get('PRICE'),
+        "style": item.get('STYLE'),
+        "multimodal_vector": indexes.prepare_vector(vector_data['embedding'], vector_settings['quantization']),
+        "content_hash": item['_content_hash']
+    }
+
+def index_items(embedded, indexer, pending_hashes):
+    for item, vector_data in embedded:
+        try:
+            embedding_request_body = build_document(item, vector_data)
+
+            # item_id as the document id makes re-runs overwrite instead of duplicate
+            pending_hashes[item['ITEM_ID']] = item['_content_hash']
+            indexer.add(item['ITEM_ID'], embedding_request_body)
+
+        except Exception as e:
+            print(f"Error indexing item (ID: {item.get('ITEM_ID')}): {str(e)}")
             continue
 
-        vector_data = get_embedding_for_product_image_and_description(item.get('IMAGE'), item.get('DESCRIPTION'))
-        
-        embedding_request_body = {
-            "item_id": item['ITEM_ID'],
-            "image_path": item['IMAGE'],
-            "image_product_description": item['DESCRIPTION'],
-            "price": item.get('PRICE'),
-            "style": item.get('STYLE'),
-            "multimodal_vector": vector_data['embedding']
-        }
-        
-        response = client.index(
-            index="product-search-multimodal-index",
-            body=embedding_request_body
-        )
-        print(f"Indexed item {i} (ID: {item['ITEM_ID']}): {response}")
-    
-    except Exception as e:
-        print(f"Error processing item {i} (ID: {item.get('ITEM_ID')}): {str(e)}")
-        continue  
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import heapq
+import itertools
+import json
+import random
+import struct
+import time
+
+try:
+    import numpy as np
+except ImportError:  # optional (requirements-optional.txt); exact search falls back to pure Python
+    np = None
+
+import indexes
+from bulk import BulkIndexer
+from createIndex import QUANTIZATIONS, build_index_body
+from export import iter_documents
+
+# Engines whose HNSW search ignores index.knn.algo_param.ef_search (lucene
+# sizes its candidate queue from k), so they are measured once, not swept.
+FIXED_EF_SEARCH_ENGINES = ('lucene',)
+
+
+def export_vectors(client, index_name, path=None):
+    """Return {item_id: vector} for every document in the index, optionally saved as JSON lines."""
+    vectors = {}
+    for hit in iter_documents(client, index_name, fields=["item_id", "multimodal_vector"]):
+        vectors[hit['_source']['item_id']] = hit['_source']['multimodal_vector']
+    if path:
+        with open(path, 'w') as f:
+            for item_id, vector in vectors.items():
+                f.write(json.dumps({"item_id": item_id, "vector": vector}) + '\n')
+    print(f"Exported {len(vectors)} vectors from {index_name}" + (f" to {path}" if path else ""))
+    return vectors
+
+
+def load_export(path):
+    with open(path) as f:
+        return {row['item_id']: row['vector'] for row in map(json.loads, f)}
+
+
+def simulate_storage(vector, quantization):
+    """Float vector as the index would compare it after storing with this quantization."""
+    vector = indexes.prepare_vector(vector, quantization)
+    if quantization == 'fp16':
+        return list(struct.unpack(f'{len(vector)}e', struct.pack(f'{len(vector)}e', *vector)))
+    return [float(x) for x in vector]
+
+
+class ExactIndex:
+    """Brute-force cosine search, the ground truth every configuration is scored against."""
+
+    def __init__(self, vectors):
+        self.ids = list(vectors)
+        if np is not None:
+            matrix = np.asarray([vectors[i] for i in self.ids], dtype=np.float32)
+            self.matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True).clip(1e-12)
+        else:
+            self.matrix = [indexes.prepare_vector(vectors[i]) for i in self.ids]
+
+    def search(self, query, k):
+        query = indexes.prepare_vector(query)
+        if np is not None:
+            scores = self.matrix @ np.asarray(query, dtype=np.float32)
+            top = np.argpartition(-scores, min(k, len(self.ids) - 1))[:k]
+            return [self.ids[j] for j in sorted(top, key=lambda j: -scores[j])]
+        scored = ((sum(a * b for a, b in zip(query, v)), n) for n, v in enumerate(self.matrix))
+        return [self.ids[n] for _, n in heapq.nlargest(k, scored)]
+
+
+def recall(found, truth):
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / sum(len(t) for t in truth) if truth else 0.0
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def latency_summary(seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    return {"p50_ms": percentile(ms, 0.5), "p99_ms": percentile(ms, 0.99)}
+
+
+def load_eval_index(client, name, body, vectors, quantization, timeout=300):
+    if client.indices.exists(index=name):
+        client.indices.delete(index=name)
+    client.indices.create(index=name, body=body)
+    with BulkIndexer(client, name) as indexer:
+        for item_id, vector in vectors.items():
+            indexer.add(item_id, {"item_id": item_id, "multimodal_vector": indexes.prepare_vector(vector, quantization)})
+    try:
+        client.indices.refresh(index=name)
+    except Exception:
+        pass  # Serverless collections refresh on their own schedule
+    deadline = time.monotonic() + timeout
+    while client.count(index=name)['count'] < len(vectors):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{name} did not reach {len(vectors)} searchable documents in {timeout}s")
+        time.sleep(2)
+
+
+def set_ef_search(client, name, ef_search):
+    """Change ef_search in place; returns False if the service does not allow it."""
+    try:
+        client.indices.put_settings(index=name, body={"index": {"knn.algo_param.ef_search": ef_search}})
+        return True
+    except Exception:
+        return False
+
+
+def run_queries(client, name, queries, k, quantization, warmup=5):
+    for query in queries[:warmup]:
+        knn_search(client, name, query, k, quantization)
+    found, seconds = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found.append(knn_search(client, name, query, k, quantization))
+        seconds.append(time.perf_counter() - start)
+    return found, seconds
+
+
+def knn_search(client, name, query, k, quantization):
+    body = {"size": k, "_source": ["item_id"],
+            "query": {"knn": {"multimodal_vector": {"vector": indexes.prepare_vector(query, quantization), "k": k}}}}
+    return [hit['_source']['item_id'] for hit in client.search(index=name, body=body)['hits']['hits']]
+
+
+def evaluate_opensearch(client, sources, query_ids, truth, args):
+    rows = []
+    grid = itertools.product(args.engines, args.quantizations, args.m, args.ef_construction)
+    for (source, vectors), (engine, quantization, m, ef_construction) in itertools.product(sources.items(), grid):
+        if quantization not in QUANTIZATIONS[engine]:
+            continue
+        dimension = len(next(iter(vectors.values())))
+        name = f"{indexes.BASE_INDEX}-eval"
+        queries = [vectors[i] for i in query_ids]
+        built_ef = None
+        sweep = args.ef_search
+        if engine in FIXED_EF_SEARCH_ENGINES:
+            print(f"{engine} ignores ef_search; measuring it once")
+            sweep = [None]
+        for ef_search in sweep:
+            if built_ef is None or not set_ef_search(client, name, ef_search):
+                body = build_index_body(dimension, engine, quantization, ef_search or args.ef_search[0],
+                                        ef_construction, m)
+                started = time.perf_counter()
+                load_eval_index(client, name, body, vectors, quantization)
+                print(f"Built {engine}/{quantization} m={m} ef_construction={ef_construction} "
+                      f"over {len(vectors)} {dimension}-dim vectors from {source} in {time.perf_counter() - started:.0f}s")
+                built_ef = ef_search
+            found, seconds = run_queries(client, name, queries, args.k, quantization)
+            rows.append({"source": source, "dimension": dimension, "engine": engine, "quantization": quantization,
+                         "m": m, "ef_construction": ef_construction, "ef_search": ef_search, "k": args.k,
+                         "recall": recall(found, truth), **latency_summary(seconds)})
+            print(format_row(rows[-1]))
+        if not args.keep_index:
+            client.indices.delete(index=name)
+    return rows
+
+
+def evaluate_local(sources, query_ids, truth, args):
+    """Exact search over vectors as each quantization would store them.
+
+    This isolates the recall cost of a smaller dimension or a coarser
+    quantization from HNSW's approximation; latency is that of in-process
+    brute force, useful only for comparing rows with each other.
+    """
+    rows = []
+    for (source, vectors), quantization in itertools.product(sources.items(), args.quantizations):
+        exact = ExactIndex({i: simulate_storage(v, quantization) for i, v in vectors.items()})
+        queries = [simulate_storage(vectors[i], quantization) for i in query_ids]
+        found, seconds = [], []
+        for query in queries:
+            start = time.perf_counter()
+            found.append(exact.search(query, args.k))
+            seconds.append(time.perf_counter() - start)
+        rows.append({"source": source, "dimension": len(queries[0]), "engine": "exact", "quantization": quantization,
+                     "m": None, "ef_construction": None, "ef_search": None, "k": args.k,
+                     "recall": recall(found, truth), **latency_summary(seconds)})
+        print(format_row(rows[-1]))
+    return rows
+
+
+def mark_pareto(rows):
+    """Flag rows no other row beats on both recall and p50 latency."""
+    for row in rows:
+        row["pareto"] = not any(
+            other["recall"] >= row["recall"] and other["p50_ms"] <= row["p50_ms"]
+            and (other["recall"] > row["recall"] or other["p50_ms"] < row["p50_ms"])
+            for other in rows
+        )
+    return rows
+
+
+def format_row(row):
+    def show(value):
+        return '-' if value is None else str(value)
+    return (f"{'*' if row.get('pareto') else ' '} {row['source'][-24:]:>24} {row['dimension']:>5} {row['engine']:>7} "
+            f"{row['quantization']:>5} {show(row['m']):>3} {show(row['ef_construction']):>5} {show(row['ef_search']):>5} "
+            f"{row['recall']:>9.3f} {row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+
+def print_table(rows, target):
+    print(f"\n  {'source':>24} {'dim':>5} {'engine':>7} {'quant':>5} {'m':>3} {'efc':>5} {'efs':>5} "
+          f"{'recall@' + str(rows[0]['k']):>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for row in sorted(rows, key=lambda r: (-r["recall"], r["p50_ms"])):
+        print(format_row(row))
+    print("* = Pareto optimal (no other configuration has both higher recall and lower p50)")
+    if any(row["engine"] in FIXED_EF_SEARCH_ENGINES for row in rows):
+        print(f"efs is '-' for {', '.join(FIXED_EF_SEARCH_ENGINES)}: the engine ignores ef_search, so it is not swept")
+    meeting = [row for row in rows if row["recall"] >= target]
+    if not meeting:
+        print(f"No configuration reaches recall {target:.2f}")
+        return
+    best = min(meeting, key=lambda r: r["p50_ms"])
+    print(f"Fastest with recall >= {target:.2f}: {format_row({**best, 'pareto': False}).strip()}")
+    if best["engine"] != "exact":
+        print(f"  python createIndex.py --host <host> create --dimension {best['dimension']} --engine {best['engine']} "
+              f"--quantization {best['quantization']} --m {best['m']} --ef-construction {best['ef_construction']}"
+              + (f" --ef-search {best['ef_search']}" if best['ef_search'] is not None else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure recall@k and latency of k-NN index settings against exact search'
+    )
+    parser.add_argument('--host', help='OpenSearch host domain (not needed with --local and --from-export)')
+    parser.add_argument('--source', action='append',
+                        help='index to export vectors from; repeat to compare dimensions. The first one is the '
+                             'reference for exact ground truth (default: the live index)')
+    parser.add_argument('--from-export', action='append', help='JSON lines file written by --export, instead of --source')
+    parser.add_argument('--export', help='save the vectors of each source to <EXPORT>.<n>.jsonl')
+    parser.add_argument('--parameter-prefix', default=indexes.DEFAULT_PARAMETER_PREFIX,
+                        help='SSM prefix holding the aoss_index_name pointer')
+    parser.add_argument('--queries', type=int, default=200, help='documents sampled as queries')
+    parser.add_argument('--seed', type=int, default=7, help='random seed for the query sample')
+    parser.add_argument('--k', type=int, default=10, help='k for recall@k and the k-NN queries')
+    parser.add_argument('--local', action='store_true',
+                        help='evaluate quantization and dimension with in-process exact search instead of OpenSearch')
+    parser.add_argument('--engines', nargs='+', default=['nmslib', 'faiss', 'lucene'], help='k-NN engines to build')
+    parser.add_argument('--quantizations', nargs='+', default=['none', 'fp16', 'byte'], help='vector quantizations')
+    parser.add_argument('--m', type=int, nargs='+', default=[16], help='HNSW m values')
+    parser.add_argument('--ef-construction', type=int, nargs='+', default=[128, 512], help='HNSW ef_construction values')
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[64, 128, 256, 512], help='HNSW ef_search values')
+    parser.add_argument('--recall-target', type=float, default=0.95, help='recall@k the chosen settings must meet')
+    parser.add_argument('--keep-index', action='store_true', help='leave the last evaluation index in place')
+    parser.add_argument('--output', help='write the result rows as JSON')
+    args = parser.parse_args()
+
+    client = indexes.create_client(args.host) if args.host else None
+    sources = {}
+    if args.from_export:
+        for path in args.from_export:
+            sources[path] = load_export(path)
+    else:
+        if client is None:
+            parser.error('--host is required unless --from-export is given')
+        for n, name in enumerate(args.source or [indexes.live_index(args.parameter_prefix)]):
+            sources[name] = export_vectors(client, name, f"{args.export}.{n}.jsonl" if args.export else None)
+    if not args.local and client is None:
+        parser.error('--host is required unless --local is given')
+    if np is None:
+        print("numpy is not installed; exact search runs in pure Python and will be slow for large catalogs")
+
+    # Queries are documents present in every source, so each configuration
+    # answers the same questions; the reference gives the exact answers.
+    reference = next(iter(sources.values()))
+    common = sorted(set.intersection(*(set(v) for v in sources.values())))
+    query_ids = random.Random(args.seed).sample(common, min(args.queries, len(common)))
+    started = time.perf_counter()
+    exact = ExactIndex(reference)
+    truth = [exact.search(reference[i], args.k) for i in query_ids]
+    print(f"Ground truth for {len(query_ids)} queries over {len(reference)} vectors "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    if args.local:
+        rows = evaluate_local(sources, query_ids, truth, args)
+    else:
+        rows = evaluate_opensearch(client, sources, query_ids, truth, args)
+    mark_pareto(rows)
+    print_table(rows, args.recall_target)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import ast
+import itertools
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional (requirements-optional.txt); tables are then written as JSON lines
+    pa = pq = None
+
+import indexes
+from bulk import BulkIndexer
+from scan import parallel_scan, per_thread_table
+
+FORMAT_VERSION = 1
+# search_after sort keys tried in order when scrolling is unavailable.
+SORT_FIELDS = ('item_id', '_id')
+DOCUMENT_FIELDS = ('item_id', 'image_path', 'image_product_description', 'price', 'style', 'content_hash')
+# .npy header length, fixed so the final shape can be written in place once
+# the row count is known. A multiple of 64 keeps the data block aligned.
+NPY_HEADER_BYTES = 128
+
+
+class NpyWriter:
+    """Stream float32 rows into a .npy file without holding them in memory.
+
+    The result loads with numpy.load(path, mmap_mode='r') as an (n, dim)
+    float32 matrix that is paged in on demand rather than read up front.
+    """
+
+    def __init__(self, path, dimension):
+        self.path = path
+        self.dimension = dimension
+        self.rows = 0
+        self._file = open(path, 'wb')
+        self._file.write(self._header())
+
+    def _header(self):
+        header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (self.rows, self.dimension)
+        header = header.ljust(NPY_HEADER_BYTES - 10 - 1) + '\n'
+        return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+    def write(self, vectors):
+        block = array('f', itertools.chain.from_iterable(vectors))
+        if len(block) != len(vectors) * self.dimension:
+            raise ValueError(f"expected {self.dimension}-dim vectors")
+        if sys.byteorder == 'big':
+            block.byteswap()
+        block.tofile(self._file)
+        self.rows += len(vectors)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+
+def read_npy(path, start=0, stop=None):
+    """Yield rows start..stop of a float32 .npy matrix written by NpyWriter, as lists."""
+    with open(path, 'rb') as f:
+        f.seek(8)
+        header_len = struct.unpack('<H', f.read(2))[0]
+        rows, dimension = ast.literal_eval(f.read(header_len).decode('latin1'))['shape']
+        stop = rows if stop is None else min(stop, rows)
+        f.seek(10 + header_len + start * dimension * 4)
+        for _ in range(start, stop):
+            row = array('f')
+            row.fromfile(f, dimension)
+            if sys.byteorder == 'big':
+                row.byteswap()
+            yield row.tolist()
+
+
+class TableWriter:
+    """Write rows in chunks to Parquet (one row group per chunk) or JSON lines."""
+
+    def __init__(self, path_stem, schema=None):
+        self.schema = schema
+        self.rows = 0
+        if pq is not None:
+            self.path = path_stem + '.parquet'
+            self._writer = None
+        else:
+            self.path = path_stem + '.jsonl'
+            self._file = open(self.path, 'w')
+
+    def write(self, rows):
+        if not rows:
+            return
+        self.rows += len(rows)
+        if pq is None:
+            for row in rows:
+                self._file.write(json.dumps(row) + '\n')
+            return
+        if self._writer is None:
+            self.schema = self.schema or pa.schema([(name, pa.string()) for name in rows[0]])
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        if pq is None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+def read_table(directory, name):
+    """Yield the rows of a table written by TableWriter."""
+    parquet = os.path.join(directory, name + '.parquet')
+    if os.path.exists(parquet):
+        if pq is None:
+            raise SystemExit(f"{parquet} needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(parquet).iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open(os.path.join(directory, name + '.jsonl')) as f:
+        yield from map(json.loads, f)
+
+
+def iter_documents(client, index_name, page_size=500, fields=None):
+    """Yield every hit in the index.
+
+    Uses a scroll where the service supports it. OpenSearch Serverless does
+    not, so the fallback pages with search_after sorted on the item_id
+    keyword field, then on _id for indexes created before item_id was a
+    keyword. Only if neither can be sorted does it page with from/size,
+    which fails past the index's max_result_window (10,000 by default).
+    """
+    body = {"size": page_size, "query": {"match_all": {}}}
+    if fields:
+        body["_source"] = list(fields)
+    try:
+        page = client.search(index=index_name, body=body, scroll='5m')
+    except Exception as e:
+        print(f"Scroll not available ({e}); paging with search_after")
+        yield from _page_documents(client, index_name, body, page_size)
+        return
+    scroll_id = page.get('_scroll_id')
+    try:
+        while page['hits']['hits']:
+            yield from page['hits']['hits']
+            page = client.scroll(scroll_id=scroll_id, scroll='5m')
+            scroll_id = page.get('_scroll_id', scroll_id)
+    finally:
+        try:
+            client.clear_scroll(scroll_id=scroll_id)
+        except Exception:
+            pass
+
+
+def _page_documents(client, index_name, body, page_size):
+    for sort_field in SORT_FIELDS:
+        sorted_body = dict(body, sort=[{sort_field: "asc"}])
+        seen = 0
+        try:
+            while True:
+                hits = client.search(index=index_name, body=sorted_body)['hits']['hits']
+                yield from hits
+                seen += len(hits)
+                if len(hits) < page_size:
+                    return
+                sorted_body["search_after"] = hits[-1]['sort']
+        except Exception as e:
+            if seen:
+                raise
+            print(f"search_after on {sort_field} failed ({e})")
+    print("Falling back to from/size paging, which fails past the index's max_result_window")
+    for start in itertools.count(0, page_size):
+        hits = client.search(index=index_name, body=dict(body, **{"from": start}))['hits']['hits']
+        yield from hits
+        if len(hits) < page_size:
+            return
+
+
+def jsonable(value):
+    """DynamoDB attribute value with Decimals as strings and sets as sorted lists."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted((jsonable(v) for v in value), key=str)
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [jsonable(v) for v in value]
+    return value
+
+
+def to_text(value):
+    """Attribute as a string column value; numbers lose their DynamoDB type, structures become JSON."""
+    value = jsonable(value)
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def export_index(client, index_name, out_dir, chunk_rows):
+    settings = indexes.vector_settings(client, index_name)
+    dimension = settings['embedding_dimension']
+    vectors = NpyWriter(os.path.join(out_dir, 'vectors.npy'), dimension)
+    schema = None
+    if pa is not None:
+        schema = pa.schema([(name, pa.string()) for name in DOCUMENT_FIELDS] + [('vector_row', pa.int64())])
+    documents = TableWriter(os.path.join(out_dir, 'documents'), schema)
+    rows, block = [], []
+    for hit in iter_documents(client, index_name):
+        source = hit['_source']
+        vector = source.get('multimodal_vector')
+        if not vector:
+            continue
+        rows.append({**{name: to_text(source.get(name)) for name in DOCUMENT_FIELDS},
+                     'vector_row': vectors.rows + len(block)})
+        block.append(vector)
+        if len(block) >= chunk_rows:
+            vectors.write(block)
+            documents.write(rows)
+            rows, block = [], []
+            print(f"Exported {vectors.rows} documents")
+    vectors.write(block)
+    documents.write(rows)
+    vectors.close()
+    documents.close()
+    return {'index': index_name, 'vector_settings': settings, 'documents': documents.rows,
+            'dimension': dimension, 'documents_file': os.path.basename(documents.path)}
+
+
+def export_catalog(table_name, out_dir, chunk_rows, segments):
+    catalog = TableWriter(os.path.join(out_dir, 'catalog'))
+    # Columns come from the first chunk; attributes that only appear later
+    # are kept as JSON in _extra so every row group shares one schema.
+    columns, rows = None, []
+    for item in parallel_scan(per_thread_table(table_name), segments):
+        rows.append(item)
+        if len(rows) >= chunk_rows:
+            columns = columns or sorted({key for row in rows for key in row})
+            catalog.write([catalog_row(row, columns) for row in rows])
+            rows = []
+    if rows:
+        columns = columns or sorted({key for row in rows for key in row})
+        catalog.write([catalog_row(row, columns) for row in rows])
+    catalog.close()
+    return {'table': table_name, 'items': catalog.rows, 'catalog_file': os.path.basename(catalog.path)}
+
+
+def catalog_row(item, columns):
+    row = {name: to_text(item.get(name)) for name in columns}
+    extra = {key: value for key, value in item.items() if key not in row}
+    row['_extra'] = json.dumps(jsonable(extra)) if extra else None
+    return row
+
+
+def run_export(args):
+    os.makedirs(args.out, exist_ok=True)
+    started = time.perf_counter()
+    client = indexes.create_client(args.host)
+    index_name = args.index or indexes.live_index(args.parameter_prefix)
+    manifest = {'format_version': FORMAT_VERSION, 'exported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+    manifest.update(export_index(client, index_name, args.out, args.chunk_rows))
+    if not args.skip_catalog:
+        manifest.update(export_catalog(args.table, args.out, args.chunk_rows, args.segments))
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Exported {manifest['documents']} documents ({manifest['dimension']}-dim float32 in vectors.npy)"
+          + (f" and {manifest['items']} catalog items" if 'items' in manifest else "")
+          + f" to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+def run_import(args):
+    with open(os.path.join(args.src, 'manifest.json')) as f:
+        manifest = json.load(f)
+    client = indexes.create_client(args.host)
+    index_name = args.index or indexes.live_index(args.parameter_prefix)
+    settings = indexes.vector_settings(client, index_name)
+    if settings['embedding_dimension'] != manifest['dimension']:
+        raise SystemExit(f"{index_name} stores {settings['embedding_dimension']}-dim vectors but the export has "
+                         f"{manifest['dimension']}; create a matching index with createIndex.py --dimension")
+
+    vectors = read_npy(os.path.join(args.src, 'vectors.npy'))
+    with BulkIndexer(client, index_name, max_docs=args.bulk_docs, workers=args.bulk_workers) as indexer:
+        # Documents were written in vector_row order, so both files are read in step.
+        for row, vector in zip(read_table(args.src, 'documents'), vectors):
+            doc = {name: row.get(name) for name in DOCUMENT_FIELDS}
+            doc['multimodal_vector'] = indexes.prepare_vector(vector, settings['quantization'])
+            indexer.add(row['item_id'], doc)
+    print(f"Imported {manifest['documents']} documents from {args.src} into {index_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export the product index and item table to local files, or load an export back into OpenSearch'
+    )
+    parser.add_argument('--host', required=True, help='OpenSearch host domain')
+    parser.add_argument('--index', help='index to export from or import into (default: the live index)')
+    parser.add_argument('--parameter-prefix', default=indexes.DEFAULT_PARAMETER_PREFIX,
+                        help='SSM prefix holding the aoss_index_name pointer')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help='write vectors.npy, documents and catalog tables')
+    export_parser.add_argument('--out', required=True, help='output directory')
+    export_parser.add_argument('--table', default='item_table', help='DynamoDB item table name')
+    export_parser.add_argument('--skip-catalog', action='store_true', help='export only the index')
+    export_parser.add_argument('--chunk-rows', type=int, default=10000, help='rows per write (Parquet row group)')
+    export_parser.add_argument('--segments', type=int, default=4, help='parallel scan segments')
+
+    import_parser = commands.add_parser('import', help='bulk-load an export into an index')
+    import_parser.add_argument('--src', required=True, help='directory written by export')
+    import_parser.add_argument('--bulk-docs', type=int, default=500, help='max documents per _bulk request')
+    import_parser.add_argument('--bulk-workers', type=int, default=4, help='parallel _bulk requests')
+    args = parser.parse_args()
+
+    if pq is None:
+        print("pyarrow is not installed; tables are written as JSON lines. pip install pyarrow for Parquet.")
+    {'export': run_export, 'import': run_import}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,18 @@ import boto3
 import base64
 import json
 from botocore.config import Config
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 from botocore.exceptions import ClientError
 import argparse
+from datetime import datetime
+from boto3.dynamodb.conditions import Attr
+
+from checkpoint import Checkpoint, content_hash
+import imageprep
+from ratelimit import Progress
+from scan import parallel_scan, per_thread_table
 
 def retry_with_exponential_backoff(func):
     def wrapper(*args, **kwargs):
@@ -31,18 +39,28 @@ def create_aws_client(service_name, region='us-east-1'):
 
 s3_client = create_aws_client('s3')
 bedrock_runtime = create_aws_client('bedrock-runtime')
-dynamodb = boto3.resource('dynamodb', config=Config(retries={'max_attempts': 5, 'mode': 'standard'}))
-table = dynamodb.Table('item_table')
+# Called from the worker pool; each thread gets its own Table.
+item_table = per_thread_table('item_table')
+# Replaced in __main__ with the settings from the command line.
+image_prep = imageprep.ImagePreprocessor(enabled=False)
 
 @retry_with_exponential_backoff
-def get_image_base64(bucket, key):
+def get_image_base64(bucket, key, head=None):
+    """Return the (downscaled) image as base64 along with its S3 ETag.
+
+    head is a head_object response already fetched for key, if any.
+    """
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        return base64.b64encode(response['Body'].read()).decode('utf-8')
+        image_bytes, etag = image_prep.fetch(s3_client, bucket, key, head=head)
+        return base64.b64encode(image_bytes).decode('utf-8'), etag
     except Exception as e:
         print(f"Error retrieving image {key} from bucket {bucket}: {str(e)}")
         raise
 
+@retry_with_exponential_backoff
+def get_image_head(bucket, key):
+    return s3_client.head_object(Bucket=bucket, Key=key)
+
 @retry_with_exponential_backoff
 def call_bedrock(prompt, image_base64):
     model_id = 'anthropic.claude-3-haiku-20240307-v1:0'
@@ -59,50 +77,93 @@ def call_bedrock(prompt, image_base64):
             }
         ]
     })
-    response = bedrock_runtime.invoke_model(body=body, modelId=model_id)
+    response = image_prep.timed_call(bedrock_runtime.invoke_model, body=body, modelId=model_id)
     return json.loads(response['body'].read())['content'][0]['text']
 
 @retry_with_exponential_backoff
 def insert_description_to_dynamodb(item_id, description):
-    return table.update_item(
+    return item_table().update_item(
         Key={'ITEM_ID': item_id},
         UpdateExpression='SET DESCRIPTION = :desc',
         ExpressionAttributeValues={':desc': description},
         ReturnValues='UPDATED_NEW'
     )
 
-def process_item(item, bucket_name):
+def process_item(item, bucket_name, checkpoint=None, since=None):
+    """Describe one item; returns a (status, message) pair."""
     try:
-        image_base64 = get_image_base64(bucket_name, item.get('IMAGE'))
+        # The description depends only on the image and the name in the prompt.
+        # A HEAD request is enough to tell whether a resumed run can skip the
+        # item, so skipped images are never downloaded or resized.
+        head = None
+        if checkpoint and since is not None:
+            head = get_image_head(bucket_name, item.get('IMAGE'))
+            if checkpoint.is_current(item['ITEM_ID'], content_hash(head['ETag'], item['NAME']), since):
+                return 'skipped', f"Skipped item {item['ITEM_ID']}: already described from this image."
+        # Reuse the HEAD response so fetch does not send a second one.
+        image_base64, etag = get_image_base64(bucket_name, item.get('IMAGE'), head)
+        digest = content_hash(etag, item['NAME'])
         prompt = f"This is a {item['NAME']} photo, please write a description for this product."
         description = call_bedrock(prompt, image_base64)
         insert_description_to_dynamodb(item['ITEM_ID'], description)
-        return f"Processed item {item['ITEM_ID']}."
+        if checkpoint:
+            checkpoint.commit({item['ITEM_ID']: digest})
+        return 'done', f"Processed item {item['ITEM_ID']}."
     except Exception as e:
-        return f"Failed to process item {item['ITEM_ID']}: {str(e)}"
-
-def process_items(bucket_name):
-    items = []
-    last_evaluated_key = None
-
-    while True:
-        scan_kwargs = {'ExclusiveStartKey': last_evaluated_key} if last_evaluated_key else {}
-        response = table.scan(**scan_kwargs)
-        items.extend(response.get('Items', []))
-        last_evaluated_key = response.get('LastEvaluatedKey')
-        
-        if not last_evaluated_key:
-            break
-
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_item = {executor.submit(process_item, item, bucket_name): item for item in items}
-        for future in as_completed(future_to_item):
-            print(future.result())
+        return 'failed', f"Failed to process item {item['ITEM_ID']}: {str(e)}"
+
+def process_items(bucket_name, workers=10, max_in_flight=20, segments=4, queue_size=100,
+                  force=False, since=None, checkpoint_path='image2text-checkpoint.sqlite'):
+    # Scan pages stream through a bounded queue, and at most max_in_flight
+    # items (each holding one base64 image) are submitted at a time, so
+    # memory stays flat however large the catalog is.
+    progress = Progress(label='Described')
+    slots = threading.BoundedSemaphore(max(max_in_flight, workers))
+    checkpoint = Checkpoint(checkpoint_path, namespace='image2text')
+
+    def report(future):
+        slots.release()
+        status, message = future.result()
+        progress.record(done=status == 'done', skipped=status == 'skipped', errors=status == 'failed')
+        print(message)
+
+    # Unless forced, items that already have a description are filtered out
+    # server side and never reach the Claude vision call.
+    scan_kwargs = {}
+    if not force:
+        scan_kwargs['FilterExpression'] = Attr('DESCRIPTION').not_exists() | Attr('DESCRIPTION').eq('')
+    started = datetime.now().astimezone()
+    print(f"Run started at {started.isoformat(timespec='seconds')}; "
+          f"to resume it if interrupted, pass --since {started.isoformat(timespec='seconds')}")
+
+    items = parallel_scan(item_table, segments, queue_size, **scan_kwargs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            slots.acquire()
+            executor.submit(process_item, item, bucket_name, checkpoint, since).add_done_callback(report)
+    print(progress.line())
+    print(image_prep.stats.summary())
+    checkpoint.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process items and generate descriptions.")
     parser.add_argument("bucket_name", help="The name of the S3 bucket containing the images.")
-    
+    parser.add_argument("--workers", type=int, default=10, help="Concurrent Claude vision calls.")
+    parser.add_argument("--max-in-flight", type=int, default=20, help="Max items (and image payloads) in progress at once.")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel scan segments.")
+    parser.add_argument("--queue-size", type=int, default=100, help="Max scanned items buffered before processing.")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate descriptions for items that already have one.")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="Skip items the checkpoint shows were described from the same image at or after this "
+                             "ISO timestamp (e.g. the start of an interrupted --force run).")
+    parser.add_argument("--checkpoint", default="image2text-checkpoint.sqlite",
+                        help="SQLite file recording which image each description was generated from.")
+    imageprep.add_arguments(parser)
+
     args = parser.parse_args()
-    
-    process_items(args.bucket_name)
\ No newline at end of file
+
+    image_prep = imageprep.from_args(args)
+    since = args.since.timestamp() if args.since else None
+    process_items(args.bucket_name, args.workers, args.max_in_flight, args.segments, args.queue_size,
+                  force=args.force, since=since, checkpoint_path=args.checkpoint)
\ No newline at end of file
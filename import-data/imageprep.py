@@ -0,0 +1,159 @@
+import io
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from PIL import Image
+except ImportError:  # Listed in requirements.txt; without it images are sent unchanged
+    Image = None
+
+# Long edge in pixels. Claude downsizes anything larger than about 1.15
+# megapixels before looking at it, and Titan Multimodal Embeddings works at
+# lower resolution still, so larger uploads only add bytes and latency.
+DEFAULT_MAX_SIDE = 1024
+DEFAULT_QUALITY = 85
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.image-cache')
+
+
+class ImageStats:
+    def __init__(self):
+        self.images = 0
+        self.cache_hits = 0
+        self.original_bytes = 0
+        self.sent_bytes = 0
+        self.prep_seconds = 0.0
+        self.calls = 0
+        self.call_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        saved = self.original_bytes - self.sent_bytes
+        ratio = saved / self.original_bytes if self.original_bytes else 0.0
+        line = (f"Images: {self.images} ({self.cache_hits} from cache), "
+                f"{self.original_bytes / 1e6:.1f} MB original -> {self.sent_bytes / 1e6:.1f} MB sent, "
+                f"saved {saved / 1e6:.1f} MB ({ratio:.0%}), "
+                f"{self.prep_seconds * 1000 / max(self.images, 1):.1f} ms/image preprocessing")
+        if self.calls:
+            line += f", {self.call_seconds * 1000 / self.calls:.0f} ms mean Bedrock call"
+        return line
+
+
+class ImagePreprocessor:
+    """Downscale and recompress product images, caching the result by S3 ETag.
+
+    The cache key includes the ETag, size and quality, so embedding.py and
+    image2Text.py share entries whenever they use the same settings, and a
+    changed image or setting never serves a stale entry. An image that is
+    already small enough and would not shrink by recompression is sent as
+    is. Without Pillow, or with enabled=False, original bytes are returned.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_side=DEFAULT_MAX_SIDE, quality=DEFAULT_QUALITY,
+                 enabled=True, stats=None):
+        self.cache_dir = cache_dir
+        self.max_side = max_side
+        self.quality = quality
+        self.enabled = enabled and Image is not None
+        self.stats = stats or ImageStats()
+        if enabled and Image is None:
+            print("Pillow is not installed; sending original images. pip install Pillow to enable resizing.")
+        if self.enabled and cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, etag):
+        etag = etag.strip('"')
+        return os.path.join(self.cache_dir, f"{etag}-{self.max_side}-q{self.quality}.jpg")
+
+    def fetch(self, s3_client, bucket, key, head=None):
+        """Return (image_bytes, etag) ready to send to Bedrock.
+
+        Pass the head_object response already fetched for key as head to
+        skip a second HEAD request.
+        """
+        start = time.perf_counter()
+        if not self.enabled:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+            data = response['Body'].read()
+            self.stats.add(images=1, original_bytes=len(data), sent_bytes=len(data))
+            return data, response['ETag']
+
+        head = head or s3_client.head_object(Bucket=bucket, Key=key)
+        etag = head['ETag']
+        path = self._cache_path(etag) if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.stats.add(images=1, cache_hits=1, original_bytes=head['ContentLength'], sent_bytes=len(data),
+                           prep_seconds=time.perf_counter() - start)
+            return data, etag
+
+        response = s3_client.get_object(Bucket=bucket, Key=key, IfMatch=etag)
+        original = response['Body'].read()
+        data = self.shrink(original)
+        if path:
+            # Write then rename so concurrent workers never read a partial file.
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self.stats.add(images=1, original_bytes=len(original), sent_bytes=len(data),
+                       prep_seconds=time.perf_counter() - start)
+        return data, etag
+
+    def shrink(self, data):
+        try:
+            image = Image.open(io.BytesIO(data))
+            small_jpeg = image.format == 'JPEG' and max(image.size) <= self.max_side
+            image = to_rgb(image)
+            image.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format='JPEG', quality=self.quality, optimize=True)
+        except OSError as e:
+            print(f"Could not preprocess image ({e}); sending it unchanged")
+            return data
+        if small_jpeg and out.tell() >= len(data):
+            return data
+        return out.getvalue()
+
+    def timed_call(self, func, *args, **kwargs):
+        """Run a Bedrock call and add its latency to the stats."""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.stats.add(calls=1, call_seconds=time.perf_counter() - start)
+
+
+def to_rgb(image):
+    """Convert to RGB, flattening any transparency onto white.
+
+    A plain convert('RGB') drops the alpha channel, so transparent product
+    backgrounds would come out black in the JPEG.
+    """
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def add_arguments(parser):
+    parser.add_argument('--image-max-side', type=int, default=DEFAULT_MAX_SIDE,
+                        help='downscale images so the long edge is at most this many pixels')
+    parser.add_argument('--image-quality', type=int, default=DEFAULT_QUALITY, help='JPEG quality for recompressed images')
+    parser.add_argument('--image-cache', default=DEFAULT_CACHE_DIR, help='directory for preprocessed images')
+    parser.add_argument('--no-image-preprocess', action='store_true',
+                        help='send original images (use to compare bytes and latency)')
+
+
+def from_args(args):
+    return ImagePreprocessor(cache_dir=args.image_cache, max_side=args.image_max_side,
+                             quality=args.image_quality, enabled=not args.no_image_preprocess)
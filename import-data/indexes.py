@@ -0,0 +1,128 @@
+import os
+import re
+import time
+
+import boto3
+from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+
+REGION = 'us-east-1'
+
+# Readers query whatever index the pointer names; when no pointer has been
+# written yet this unversioned index (the original layout) is the live one.
+BASE_INDEX = 'product-search-multimodal-index'
+DEFAULT_PARAMETER_PREFIX = os.environ.get('PARAMETER_STORE_PREFIX', '/agentcore/sales-agent/production/')
+POINTER_PARAMETER = 'aoss_index_name'
+
+_VERSION_RE = re.compile(re.escape(BASE_INDEX) + r'-v(\d+)$')
+
+
+def create_client(host, region=REGION):
+    """SigV4-signed client for the OpenSearch Serverless collection at host."""
+    auth = AWSV4SignerAuth(boto3.Session().get_credentials(), region, 'aoss')
+    return OpenSearch(
+        hosts=[{'host': host, 'port': 443}],
+        http_auth=auth,
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        pool_maxsize=20
+    )
+
+
+def version_of(index_name):
+    """Version number of a versioned index name; the unversioned base index counts as 0."""
+    if index_name == BASE_INDEX:
+        return 0
+    match = _VERSION_RE.match(index_name)
+    return int(match.group(1)) if match else None
+
+
+def version_name(version):
+    return f"{BASE_INDEX}-v{version}"
+
+
+def pointer_name(prefix=DEFAULT_PARAMETER_PREFIX):
+    return prefix.rstrip('/') + '/' + POINTER_PARAMETER
+
+
+def read_pointer(prefix=DEFAULT_PARAMETER_PREFIX, ssm_client=None):
+    """Index named by the SSM pointer, or None if it has not been written."""
+    ssm_client = ssm_client or boto3.client('ssm')
+    try:
+        return ssm_client.get_parameter(Name=pointer_name(prefix))['Parameter']['Value']
+    except ssm_client.exceptions.ParameterNotFound:
+        return None
+
+
+def write_pointer(index_name, prefix=DEFAULT_PARAMETER_PREFIX, ssm_client=None):
+    ssm_client = ssm_client or boto3.client('ssm')
+    ssm_client.put_parameter(Name=pointer_name(prefix), Value=index_name, Type='String', Overwrite=True)
+
+
+def recent_targets(grace_seconds, prefix=DEFAULT_PARAMETER_PREFIX, ssm_client=None):
+    """Indexes the pointer named at any time in the last grace_seconds.
+
+    Readers cache the pointer for a short while (the Lambda for 30s, the
+    agent for 60s), so these may all still be queried. Includes the current
+    target, and the base index if the pointer was first written within the
+    window. Raises if the pointer history cannot be read.
+    """
+    ssm_client = ssm_client or boto3.client('ssm')
+    history = []
+    for page in ssm_client.get_paginator('get_parameter_history').paginate(Name=pointer_name(prefix)):
+        history.extend(page['Parameters'])
+    cutoff = time.time() - grace_seconds
+    targets = set()
+    for entry in sorted(history, key=lambda e: e['LastModifiedDate'], reverse=True):
+        targets.add(entry['Value'])
+        if entry['LastModifiedDate'].timestamp() < cutoff:
+            # This value was live when the window started; anything older was not.
+            return targets
+    targets.add(BASE_INDEX)
+    return targets
+
+
+def live_index(prefix=DEFAULT_PARAMETER_PREFIX, ssm_client=None):
+    """Index that search currently reads, falling back to the base index."""
+    try:
+        return read_pointer(prefix, ssm_client) or BASE_INDEX
+    except Exception as e:
+        print(f"Could not read {pointer_name(prefix)} ({e}); using {BASE_INDEX}")
+        return BASE_INDEX
+
+
+def checkpoint_namespace(index_name):
+    """Embedding checkpoint namespace, so each index version is tracked separately."""
+    return 'embedding' if index_name == BASE_INDEX else f"embedding:{index_name}"
+
+
+# Vector settings of an index created before createIndex.py recorded them in
+# the mapping's _meta: full-length float vectors.
+DEFAULT_VECTOR_SETTINGS = {'embedding_dimension': 1024, 'quantization': 'none'}
+
+
+def vector_settings(client, index_name):
+    """Embedding length and quantization the index was created with."""
+    if not client.indices.exists(index=index_name):
+        return dict(DEFAULT_VECTOR_SETTINGS)
+    mapping = client.indices.get_mapping(index=index_name)
+    meta = next(iter(mapping.values()))['mappings'].get('_meta', {})
+    return {**DEFAULT_VECTOR_SETTINGS, **meta}
+
+
+def prepare_vector(vector, quantization='none'):
+    """Normalize a vector to unit length and quantize it for storage.
+
+    Cosine scores are unaffected by normalizing, and inner-product (faiss)
+    indexes need it. 'byte' scales each vector by its largest component into
+    int8 range; that is only used with cosine similarity, where the per-vector
+    scale cancels out. The query-side copies in agent-core/tools/helpers.py
+    and lambda/handler.py must match this; TestSharedCopies in
+    tests/unit/test_lambda_handler.py checks that they do.
+    """
+    norm = sum(x * x for x in vector) ** 0.5 or 1.0
+    vector = [x / norm for x in vector]
+    if quantization == 'byte':
+        peak = max(abs(x) for x in vector) or 1.0
+        return [max(-128, min(127, round(x * 127 / peak))) for x in vector]
+    return vector
@@ -0,0 +1,185 @@
+import argparse
+import base64
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from boto3.dynamodb.conditions import Attr
+
+import embedding
+import image2Text
+import imageprep
+import indexes
+from bulk import BulkIndexer
+from checkpoint import Checkpoint, content_hash
+from ratelimit import AdaptiveRateLimiter, Progress
+from scan import parallel_scan, per_thread_table
+
+STAGES = ('describe', 'embed')
+
+
+class IngestWorker:
+    """Runs the selected stages for one item, fetching its image at most once."""
+
+    def __init__(self, bucket_name, stages, checkpoint, limiter, progress, force=False, full=False,
+                 table_name='item_table'):
+        self.bucket_name = bucket_name
+        self.table_name = table_name
+        self.stages = stages
+        self.checkpoint = checkpoint
+        self.limiter = limiter
+        self.progress = progress
+        self.force = force
+        self.full = full
+        self._table = per_thread_table(table_name)
+
+    def __call__(self, item):
+        result = {'item': item, 'described': False, 'vector': None}
+        describe = 'describe' in self.stages and (self.force or not item.get('DESCRIPTION'))
+        embed = 'embed' in self.stages
+        image = None
+        head = None
+
+        if describe:
+            image, etag = image2Text.image_prep.fetch(embedding.s3_client, self.bucket_name, item['IMAGE'])
+            prompt = f"This is a {item['NAME']} photo, please write a description for this product."
+            item['DESCRIPTION'] = image2Text.call_bedrock(prompt, base64.b64encode(image).decode('utf-8'))
+            # Only DESCRIPTION is written, so attributes changed since the
+            # scan read this item are left alone. BatchWriteItem only takes
+            # whole-item puts, which would overwrite those changes, so each
+            # item gets its own UpdateItem; the worker pool runs them in
+            # parallel and each is one small write next to a Bedrock call.
+            self._table().update_item(
+                Key={'ITEM_ID': item['ITEM_ID']},
+                UpdateExpression='SET DESCRIPTION = :desc',
+                ExpressionAttributeValues={':desc': item['DESCRIPTION']}
+            )
+            result['described'] = True
+        elif embed:
+            head = embedding.head_image(self.bucket_name, item.get('IMAGE'))
+            etag = head['ETag'] if head else None
+
+        if embed and item.get('DESCRIPTION'):
+            digest = content_hash(etag, item.get('DESCRIPTION'), item.get('PRICE'), item.get('STYLE'))
+            if self.full or not self.checkpoint.is_current(item['ITEM_ID'], digest):
+                if image is None:
+                    # Reuse the HEAD taken for the hash instead of sending another.
+                    image, _ = embedding.image_prep.fetch(embedding.s3_client, self.bucket_name, item['IMAGE'],
+                                                          head=head)
+                item['_content_hash'] = digest
+                result['vector'] = embedding.call_rate_limited(
+                    lambda: embedding.embed_image_and_description(image, item['DESCRIPTION']),
+                    self.limiter, self.progress
+                )
+        return result
+
+
+def run_pipeline(items, worker, workers):
+    """Yield worker results, with at most 2 * workers items in flight."""
+    def results(futures):
+        for future in futures:
+            item = pending.pop(future)
+            try:
+                yield future.result()
+            except Exception as e:
+                worker.progress.record(errors=1)
+                print(f"Error processing item (ID: {item.get('ITEM_ID')}): {str(e)}")
+
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+        for item in items:
+            pending[executor.submit(worker, item)] = item
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from results(done)
+        yield from results(list(pending))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Describe and embed the catalog in one pass: each image is fetched once, '
+                    'descriptions go to DynamoDB and embeddings to OpenSearch in _bulk batches.'
+    )
+    parser.add_argument('--bucket', required=True, help='S3 bucket name')
+    parser.add_argument('--host', help='OpenSearch host domain (required for the embed stage)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help='comma-separated stages to run: describe, embed (default: both)')
+    parser.add_argument('--table', default='item_table', help='DynamoDB item table name')
+    parser.add_argument('--index', help='OpenSearch index to load (default: the live index named by the SSM pointer)')
+    parser.add_argument('--parameter-prefix', default=indexes.DEFAULT_PARAMETER_PREFIX,
+                        help='SSM prefix holding the aoss_index_name pointer')
+    parser.add_argument('--segments', type=int, default=4, help='parallel scan segments')
+    parser.add_argument('--queue-size', type=int, default=1000, help='max scanned items buffered in memory')
+    parser.add_argument('--workers', type=int, default=16, help='items processed concurrently')
+    parser.add_argument('--rate', type=float, default=10.0, help='initial Titan requests per second')
+    parser.add_argument('--max-rate', type=float, default=100.0, help='upper bound on Titan requests per second')
+    parser.add_argument('--bulk-docs', type=int, default=500, help='max documents per _bulk request')
+    parser.add_argument('--bulk-mb', type=float, default=5, help='max _bulk request size in MB')
+    parser.add_argument('--bulk-workers', type=int, default=4, help='parallel _bulk requests')
+    parser.add_argument('--force', action='store_true', help='regenerate descriptions that already exist')
+    parser.add_argument('--full', action='store_true', help='re-embed every item, ignoring the checkpoint')
+    parser.add_argument('--checkpoint', default='embedding-checkpoint.sqlite',
+                        help='SQLite file shared with embedding.py recording indexed content hashes')
+    imageprep.add_arguments(parser)
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown or not stages:
+        parser.error(f"--stages must be a subset of {', '.join(STAGES)}")
+    if 'embed' in stages and not args.host:
+        parser.error('--host is required for the embed stage')
+
+    # One preprocessor (and cache) for both stages, so an image is fetched once.
+    image_prep = imageprep.from_args(args)
+    embedding.image_prep = image2Text.image_prep = image_prep
+
+    limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.max_rate, burst=args.workers)
+    progress = Progress(label='Embedded' if 'embed' in stages else 'Described', limiter=limiter)
+    index_name = indexes.BASE_INDEX
+    if 'embed' in stages:
+        index_name = args.index or indexes.live_index(args.parameter_prefix)
+    checkpoint = Checkpoint(args.checkpoint, namespace=indexes.checkpoint_namespace(index_name))
+    worker = IngestWorker(args.bucket, stages, checkpoint, limiter, progress, force=args.force, full=args.full,
+                          table_name=args.table)
+
+    scan_kwargs = {}
+    if stages == ['describe'] and not args.force:
+        scan_kwargs['FilterExpression'] = Attr('DESCRIPTION').not_exists() | Attr('DESCRIPTION').eq('')
+    items = parallel_scan(per_thread_table(args.table), args.segments, args.queue_size,
+                          **scan_kwargs)
+
+    pending_hashes = {}
+    commit_indexed = embedding.committer(checkpoint, pending_hashes)
+
+    indexer = None
+    if 'embed' in stages:
+        client = indexes.create_client(args.host)
+        embedding.vector_settings = indexes.vector_settings(client, index_name)
+        print(f"Loading {index_name}: {embedding.vector_settings['embedding_dimension']}-dim "
+              f"{embedding.vector_settings['quantization']} vectors")
+        indexer = BulkIndexer(client, index_name,
+                              max_docs=args.bulk_docs, max_bytes=int(args.bulk_mb * 1024 * 1024),
+                              workers=args.bulk_workers, on_indexed=commit_indexed)
+
+    described = 0
+    for result in run_pipeline(items, worker, args.workers):
+        item = result['item']
+        if result['described']:
+            described += 1
+            if 'embed' not in stages:
+                progress.record(done=1)
+        if result['vector'] is not None:
+            pending_hashes[item['ITEM_ID']] = item['_content_hash']
+            indexer.add(item['ITEM_ID'], embedding.build_document(item, result['vector']))
+        elif 'embed' in stages:
+            progress.record(skipped=1)
+    if indexer:
+        indexer.close()
+
+    print(progress.line())
+    print(f"Wrote {described} descriptions to DynamoDB")
+    print(image_prep.stats.summary())
+    checkpoint.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate adapts to throttling (AIMD).
+
+    Every request takes one token. A ThrottlingException cuts the rate by
+    decrease_factor (at most once per cooldown, so a burst of throttles from
+    requests already in flight counts once); successes raise it by
+    increase_step requests/sec per second of traffic at the current rate,
+    up to max_rate. Throughput therefore settles just under the account's
+    quota instead of repeatedly overshooting it.
+    """
+
+    def __init__(self, rate=10.0, min_rate=0.5, max_rate=100.0, burst=None,
+                 increase_step=1.0, decrease_factor=0.7, cooldown=2.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step / max(self.rate, 1.0))
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # Drop saved-up tokens so the lower rate applies immediately.
+            self._tokens = min(self._tokens, 0.0)
+
+
+class Progress:
+    """Thread-safe counters with a periodic one-line progress report."""
+
+    def __init__(self, total=None, label='Embedded', interval=5.0, limiter=None):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.limiter = limiter
+        self.done = 0
+        self.errors = 0
+        self.skipped = 0
+        self.requests = 0
+        self.throttled = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def record(self, done=0, errors=0, skipped=0, requests=0, throttled=0):
+        with self._lock:
+            self.done += done
+            self.errors += errors
+            self.skipped += skipped
+            self.requests += requests
+            self.throttled += throttled
+            now = time.monotonic()
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+        print(self.line())
+
+    def line(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        throttle_rate = self.throttled / self.requests if self.requests else 0.0
+        parts = [f"{self.label} {self.done}" + (f"/{self.total}" if self.total else ""),
+                 f"{rate:.1f} items/s",
+                 f"throttled {throttle_rate:.1%}",
+                 f"{self.errors} errors, {self.skipped} skipped"]
+        if self.limiter:
+            parts.append(f"limit {self.limiter.rate:.1f}/s")
+        if self.total and rate:
+            remaining = max(self.total - self.done - self.errors - self.skipped, 0)
+            parts.append(f"ETA {format_duration(remaining / rate)}")
+        return ', '.join(parts)
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
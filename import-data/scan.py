@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+
+REGION = 'us-east-1'
+_retry_config = Config(retries={'max_attempts': 5, 'mode': 'standard'})
+
+# Marks the end of one segment in the shared queue.
+_SEGMENT_DONE = object()
+
+
+class ScanStats:
+    def __init__(self, total_segments):
+        self.total_segments = total_segments
+        self.items = 0
+        self.pages = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add_page(self):
+        with self._lock:
+            self.pages += 1
+
+    def items_per_second(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.started)
+        return self.items / elapsed if elapsed else 0.0
+
+    def summary(self):
+        return (f"Scanned {self.items} items in {self.pages} pages across {self.total_segments} segments "
+                f"in {self.elapsed:.1f}s ({self.items_per_second():.1f} items/s)")
+
+
+def make_item_table(table_name='item_table', region=REGION):
+    """Return a new Table handle built on its own session.
+
+    boto3 resources are not thread safe, so every thread that talks to
+    DynamoDB needs its own handle.
+    """
+    return boto3.Session(region_name=region).resource('dynamodb', config=_retry_config).Table(table_name)
+
+
+def per_thread_table(table_name='item_table', region=REGION):
+    """Return a function that gives each calling thread its own Table.
+
+    Suitable as parallel_scan's make_table and for worker pools.
+    """
+    local = threading.local()
+
+    def table():
+        if not hasattr(local, 'table'):
+            local.table = make_item_table(table_name, region)
+        return local.table
+    return table
+
+
+def _put(out, value, stop):
+    # Blocks while the consumer is behind, so memory stays bounded by the
+    # queue size no matter how large the table is; gives up once stopped.
+    while not stop.is_set():
+        try:
+            out.put(value, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _scan_segment(make_table, segment, total_segments, out, stop, stats, scan_kwargs):
+    try:
+        # boto3 resources are not thread safe, so each segment builds its own.
+        table = make_table()
+        kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+        while not stop.is_set():
+            response = table.scan(**kwargs)
+            items = response.get('Items', [])
+            stats.add_page()
+            for item in items:
+                if not _put(out, item, stop):
+                    return
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+            kwargs['ExclusiveStartKey'] = last_evaluated_key
+    except Exception as e:
+        _put(out, e, stop)
+    finally:
+        _put(out, _SEGMENT_DONE, stop)
+
+
+def parallel_scan(make_table, total_segments=4, queue_size=1000, stats=None, report_every=1000, **scan_kwargs):
+    """Yield every item in a DynamoDB table using a parallel segmented scan.
+
+    make_table is called once per segment thread and returns a boto3 Table.
+    Each segment is scanned by its own thread and follows LastEvaluatedKey
+    until the segment is exhausted. Items are handed over through a bounded
+    queue, so at most queue_size items are held in memory at once. Extra
+    keyword arguments (e.g. ProjectionExpression) are passed to every scan
+    call. If a segment fails, the error is raised to the consumer.
+    """
+    stats = stats or ScanStats(total_segments)
+    out = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_scan_segment,
+            args=(make_table, segment, total_segments, out, stop, stats, scan_kwargs),
+            name=f"scan-segment-{segment}",
+            daemon=True
+        )
+        for segment in range(total_segments)
+    ]
+    for thread in threads:
+        thread.start()
+    remaining = total_segments
+    try:
+        while remaining:
+            item = out.get()
+            if item is _SEGMENT_DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            stats.items += 1
+            if report_every and stats.items % report_every == 0:
+                print(f"Scan progress: {stats.items} items ({stats.items_per_second():.1f} items/s)")
+            yield item
+    finally:
+        # Unblocks producers if the consumer stops early or a segment failed.
+        stop.set()
+        stats.elapsed = time.perf_counter() - stats.started
+    print(stats.summary())
@@ -1,15 +1,65 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
 import os
 import base64
 import io
+import time
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+from opensearchpy.exceptions import AuthenticationException, AuthorizationException
+
+# Clients are created once per execution environment during the init phase and
+# reused by every warm invocation, keeping their HTTP connection pools alive.
+boto_config = Config(
+    retries={'max_attempts': 5, 'mode': 'standard'},
+    max_pool_connections=20,
+    tcp_keepalive=True
+)
+session = boto3.Session()
+bedrock_runtime = session.client(service_name='bedrock-runtime', region_name='us-east-1', config=boto_config)
+personalize_runtime = session.client('personalize-runtime', config=boto_config)
+# The fan-out threads share this low-level client: unlike boto3 resources and
+# their Table objects, clients are thread safe.
+dynamodb = session.client('dynamodb', config=boto_config)
+ssm = session.client('ssm', config=boto_config)
+deserializer = TypeDeserializer()
+ITEM_TABLE_NAME = os.environ.get('ITEM_TABLE_NAME', 'item_table')
+USER_TABLE_NAME = os.environ.get('USER_TABLE_NAME', 'user_table')
+# Live index named by the SSM pointer that import-data/createIndex.py promote
+# writes. It is re-read at most every INDEX_POINTER_TTL_SECONDS, so warm
+# environments follow a switch-over; AOSS_INDEX_NAME is used while no pointer
+# has been written.
+INDEX_NAME = os.environ.get('AOSS_INDEX_NAME', 'product-search-multimodal-index')
+INDEX_POINTER = os.environ.get('PARAMETER_STORE_PREFIX', '/agentcore/sales-agent/production/').rstrip('/') + '/aoss_index_name'
+INDEX_POINTER_TTL_SECONDS = float(os.environ.get('INDEX_POINTER_TTL_SECONDS', '30'))
+index_pointer = {'name': INDEX_NAME, 'expires': 0.0}
+# Embedding length and quantization recorded in each index mapping's _meta,
+# read once per index so queries match the stored vectors. After a failed
+# read the defaults are used for INDEX_POINTER_TTL_SECONDS before retrying.
+index_settings = {}
+index_settings_retry_at = {}
+opensearch_client = None
+# Independent lookups (search, Personalize, DynamoDB) fan out on this pool and
+# share one deadline, capped by the time Lambda has left for the invocation.
+executor = ThreadPoolExecutor(max_workers=16)
+FANOUT_TIMEOUT_SECONDS = float(os.environ.get('FANOUT_TIMEOUT_SECONDS', '20'))
+DEADLINE_MARGIN_SECONDS = 1.0
+# Prompt budget for each product description passed to Claude.
+DESCRIPTION_TOKEN_BUDGET = int(os.environ.get('DESCRIPTION_TOKEN_BUDGET', '40'))
+CHARS_PER_TOKEN = 4
+HISTORY_EVENTS = ('visted', 'add_to_cart', 'purchased')
+CLAUDE_MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'
+# Stream Claude responses so callers see tokens early and can stop once the
+# JSON answer is complete; set BEDROCK_STREAMING=false to wait for the full body.
+BEDROCK_STREAMING = os.environ.get('BEDROCK_STREAMING', 'true').lower() == 'true'
 
 def lambda_handler(event, context):
     print("Event Received:", event)
     api_path = event['apiPath']
+    deadline = get_deadline(context)
     response_code = 200
     result = ''
     try:
@@ -20,11 +70,11 @@ def lambda_handler(event, context):
             user_id = get_parameter(event, 'user_id')
             condition = get_parameter(event, 'condition')
             preference = get_parameter(event, 'preference')
-            result = compare_product(user_id, condition, preference)
+            result = compare_product(user_id, condition, preference, deadline)
         elif api_path == '/getRecommendation':
             user_id = get_parameter(event, 'user_id')
             preference = get_parameter(event, 'preference')
-            result = get_recommendation(user_id, preference)
+            result = get_recommendation(user_id, preference, deadline)
         else:
             response_code = 404
             result = "Unrecognized API path: {}".format(api_path)
@@ -48,84 +98,172 @@ def get_parameter(event, name):
             return param['value']
     return None
 
-def get_recommendation(user_id, preference):
-    client = boto3.client('personalize-runtime')
+def get_deadline(context=None):
+    timeout = FANOUT_TIMEOUT_SECONDS
+    if context is not None:
+        timeout = min(timeout, context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN_SECONDS)
+    return time.monotonic() + max(timeout, 0)
+
+def submit_branch(name, fn, *args):
+    def run():
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            return fn(*args)
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            print(f"Branch {name} {status} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return executor.submit(run)
+
+def wait_branch(name, future, deadline):
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeoutError:
+        future.cancel()
+        raise Exception(f"Timed out waiting for {name}")
+
+def get_user_history(user, deadline):
+    # One lookup per history item, all in flight at once.
+    futures = {
+        key: [submit_branch(f"get_item_info:{item_id}", get_item_info, item_id) for item_id in user[key]]
+        for key in HISTORY_EVENTS
+    }
+    return {
+        key: [wait_branch(f"get_item_info:{item_id}", future, deadline) for item_id, future in zip(user[key], pending)]
+        for key, pending in futures.items()
+    }
+
+def get_personalize_items(user_id):
     # TODO REAd from ENV. However, personalize runtime will be part of workshop
     # recommender_arn = 'arn:aws:personalize:us-east-1:xxx:recommender/recommended-for-you'
     recommender_arn = os.environ.get('RECOMMENDER_ARN', None)
     if recommender_arn is None:
         raise Exception("No recommender arn found")
-    response = client.get_recommendations(
+    response = personalize_runtime.get_recommendations(
         recommenderArn=recommender_arn,
         userId=str(user_id),
         numResults=5
     )
-    items = response.get('itemList', [])
-    user = get_user_info(user_id)
-    visted = []
-    for item_id in user['visted']:
-        visted.append(get_item_info(item_id))
-    add_to_cart = []
-    for item_id in user['add_to_cart']:
-        add_to_cart.append(get_item_info(item_id))
-    purchased = []
-    for item_id in user['purchased']:
-        purchased.append(get_item_info(item_id))
-    prompt = f" You are a sales assistant tasked with recommending products. Consider the following\
-        <rules>\
-        1. Recommend lower-priced items.\
-        2. Take user age {user['age']}, gender {user['gender']} into account.\
-        3. Reflect on historical visit product: {visted}.\
-        4. Reflect on historical add-to-cart actions: {add_to_cart}.\
-        5. Reflect on historical purchases: {purchased}.\
-        6. Take user preferences into account: {preference}.\
-        7. Available items: {items}.\
-        8. Output the recommended item in JSON format, preserving the original format.\
-        9. Sort by score in item.\
-        <\rules>"
+    return response.get('itemList', [])
+
+def gather_context(items_name, items_fn, items_args, user_id, deadline):
+    # The candidate items and the user's profile are independent; item lookups
+    # for the history start as soon as the profile arrives, while the
+    # candidate branch may still be running.
+    start = time.perf_counter()
+    items_future = submit_branch(items_name, items_fn, *items_args)
+    user_future = submit_branch('get_user_info', get_user_info, user_id)
+    try:
+        user = wait_branch('get_user_info', user_future, deadline)
+        history = get_user_history(user, deadline)
+        items = wait_branch(items_name, items_future, deadline)
+    finally:
+        items_future.cancel()
+    print(f"Context fan-out took {(time.perf_counter() - start) * 1000:.1f} ms")
+    return items, user, history
+
+def truncate_to_tokens(text, max_tokens):
+    # Roughly four characters per token; cut on a word boundary.
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    text = ' '.join(str(text).split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(' ', 1)[0] + '...'
+
+def to_table(rows, columns):
+    # Pipe-separated header plus one line per row; far fewer tokens than
+    # repeating every key in a dict repr or JSON object. The first column
+    # is the key and always kept. Other columns that are empty in every row
+    # are dropped, and a value shared by every row is stated once above the
+    # table instead of on each line.
+    values = {column: [str(row.get(column, '')).replace('|', '/') for row in rows] for column in columns}
+    key, rest = columns[0], columns[1:]
+    shared = {c: values[c][0] for c in rest if len(rows) > 1 and len(set(values[c])) == 1}
+    kept = [key] + [c for c in rest if c not in shared and any(values[c])]
+    lines = []
+    if any(shared.values()):
+        lines.append('All rows: ' + ', '.join(f'{c}={v}' for c, v in shared.items() if v))
+    lines.append('|'.join(kept))
+    for i in range(len(rows)):
+        lines.append('|'.join(values[column][i] for column in kept))
+    return '\n'.join(lines)
+
+def compact_history(history):
+    # An item can appear in several history lists; list it once with every
+    # event it took part in.
+    merged = {}
+    for event in HISTORY_EVENTS:
+        for item in history[event]:
+            entry = merged.setdefault(item['item_id'], {**item, 'events': []})
+            entry['events'].append(event)
+    rows = [{**item, 'events': '+'.join(item['events'])} for item in merged.values()]
+    return to_table(rows, ['item_id', 'title', 'price', 'style', 'events'])
+
+def compact_items(items):
+    if isinstance(items, str):
+        items = json.loads(items)
+    rows = []
+    for item in items:
+        # Personalize returns itemId/score; search_product returns the catalog fields.
+        row = {
+            'item_id': item.get('item_id', item.get('itemId', '')),
+            'score': round(float(item['score']), 3) if item.get('score') is not None else '',
+            'price': item.get('price', ''),
+            'style': item.get('style', ''),
+            'description': truncate_to_tokens(item.get('description', ''), DESCRIPTION_TOKEN_BUDGET),
+        }
+        rows.append(row)
+    return to_table(rows, ['item_id', 'score', 'price', 'style', 'description'])
+
+def build_prompt(user, history, preference, items):
+    return (
+        "You are a sales assistant tasked with recommending products. Consider the following\n"
+        "<rules>\n"
+        "1. Recommend lower-priced items.\n"
+        f"2. Take user age {user['age']}, gender {user['gender']} into account.\n"
+        "3. Reflect on the user's history (events: visted, add_to_cart, purchased):\n"
+        f"{compact_history(history)}\n"
+        f"4. Take user preferences into account: {preference}.\n"
+        "5. Available items:\n"
+        f"{compact_items(items)}\n"
+        "6. Output the recommended items as a JSON list of objects using the available item columns as keys.\n"
+        "7. Sort by score in item.\n"
+        "</rules>"
+    )
+
+def get_recommendation(user_id, preference, deadline=None):
+    if deadline is None:
+        deadline = get_deadline()
+    items, user, history = gather_context('get_recommendations', get_personalize_items, (user_id,), user_id, deadline)
+    prompt = build_prompt(user, history, preference, items)
     result = {
         'items': items,
         'summarize': call_bedrock(prompt)
     }
     return json.dumps(result)
 
-def compare_product(user_id, condition, preference):
-    items = search_product(condition)
-    user = get_user_info(user_id)
-    visted = []
-    for item_id in user['visted']:
-        visted.append(get_item_info(item_id))
-    add_to_cart = []
-    for item_id in user['add_to_cart']:
-        add_to_cart.append(get_item_info(item_id))
-    purchased = []
-    for item_id in user['purchased']:
-        purchased.append(get_item_info(item_id))
-    prompt = f" You are a sales assistant tasked with recommending products. Consider the following\
-        <rules>\
-        1. Recommend lower-priced items.\
-        2. Take user age {user['age']}, gender {user['gender']} into account.\
-        3. Reflect on historical visit product: {visted}.\
-        4. Reflect on historical add-to-cart actions: {add_to_cart}.\
-        5. Reflect on historical purchases: {purchased}.\
-        6. Take user preferences into account: {preference}.\
-        7. Available items: {items}.\
-        8. Output the recommended item in JSON format, preserving the original format.\
-        9. Sort by score in item.\
-        <\rules>"
+def compare_product(user_id, condition, preference, deadline=None):
+    if deadline is None:
+        deadline = get_deadline()
+    items, user, history = gather_context('search_product', search_product, (condition,), user_id, deadline)
+    prompt = build_prompt(user, history, preference, items)
     result = {
         'items': items,
         'summarize': call_bedrock(prompt)
     }
     return json.dumps(result)
 
-def search_product(condition):
+def create_opensearch_client():
     # TODO Double check collection id is part of endpoint
     host = os.environ['AOSS_COLLECTION_ID']+'.'+os.environ['AOSS_REGION']+'.aoss.amazonaws.com'
     service = 'aoss'
-    credentials = boto3.Session().get_credentials()
+    # The signer calls get_frozen_credentials() on every request, so refreshable
+    # credentials are renewed without rebuilding the client.
+    credentials = session.get_credentials()
     auth = AWSV4SignerAuth(credentials, os.environ['AOSS_REGION'], service)
-    client = OpenSearch(
+    return OpenSearch(
         hosts = [{'host': host, 'port': 443}],
         http_auth = auth,
         use_ssl = True,
@@ -133,23 +271,85 @@ def search_product(condition):
         connection_class = RequestsHttpConnection,
         pool_maxsize = 20
     )
-    text_embedding = get_embedding_for_text(condition)
+
+def get_opensearch_client(refresh=False):
+    global session, opensearch_client
+    if refresh:
+        # Fresh session so credentials are resolved again from the environment.
+        session = boto3.Session()
+        opensearch_client = None
+    if opensearch_client is None:
+        opensearch_client = create_opensearch_client()
+    return opensearch_client
+
+def get_index_name():
+    now = time.monotonic()
+    if now < index_pointer['expires']:
+        return index_pointer['name']
+    try:
+        index_pointer['name'] = ssm.get_parameter(Name=INDEX_POINTER)['Parameter']['Value']
+    except ssm.exceptions.ParameterNotFound:
+        index_pointer['name'] = INDEX_NAME
+    except Exception as e:
+        # Keep the last known index; createIndex.py gc never deletes an index
+        # that was live within its grace period.
+        print(f"Could not read {INDEX_POINTER}: {e}")
+    index_pointer['expires'] = now + INDEX_POINTER_TTL_SECONDS
+    return index_pointer['name']
+
+def get_index_settings(index_name):
+    if index_name not in index_settings:
+        settings = {'embedding_dimension': 1024, 'quantization': 'none'}
+        now = time.monotonic()
+        if now < index_settings_retry_at.get(index_name, 0.0):
+            return settings
+        try:
+            mapping = get_opensearch_client().indices.get_mapping(index=index_name)
+            settings.update(next(iter(mapping.values()))['mappings'].get('_meta', {}))
+        except Exception as e:
+            print(f"Could not read vector settings of {index_name}: {e}")
+            index_settings_retry_at[index_name] = now + INDEX_POINTER_TTL_SECONDS
+            return settings
+        index_settings[index_name] = settings
+    return index_settings[index_name]
+
+def prepare_query_vector(vector, quantization):
+    # Same normalization and int8 scaling as import-data/indexes.prepare_vector.
+    norm = sum(x * x for x in vector) ** 0.5 or 1.0
+    vector = [x / norm for x in vector]
+    if quantization == 'byte':
+        peak = max(abs(x) for x in vector) or 1.0
+        return [max(-128, min(127, round(x * 127 / peak))) for x in vector]
+    return vector
+
+def search_product(condition):
+    # Resolved once so the mapping and the query use the same index.
+    index_name = get_index_name()
+    settings = get_index_settings(index_name)
+    text_embedding = get_embedding_for_text(condition, settings['embedding_dimension'])
     query = {
         "size": 5,
         "query": {
             "knn": {
                 "multimodal_vector": {
-                    "vector": text_embedding[0]['embedding'],
+                    "vector": prepare_query_vector(text_embedding[0]['embedding'], settings['quantization']),
                     "k": 5
                 }
             }
         },
         "_source": ["item_id", "price", "style", "image_product_description", "image_path"]
     }
-    text_based_search_response = client.search(
-        body=query,
-        index="product-search-multimodal-index"
-    )
+    try:
+        text_based_search_response = get_opensearch_client().search(
+            body=query,
+            index=index_name
+        )
+    except (AuthenticationException, AuthorizationException):
+        # Credentials captured by a warm client may have expired; rebuild once and retry.
+        text_based_search_response = get_opensearch_client(refresh=True).search(
+            body=query,
+            index=index_name
+        )
     result = []
     hits = text_based_search_response['hits']['hits']
     for hit in hits:
@@ -164,13 +364,13 @@ def search_product(condition):
         result.append(data)
     return json.dumps(result)
 
-def get_embedding_for_text(text):
+def get_embedding_for_text(text, dimension=1024):
     body = json.dumps(
         {
-            "inputText": text
+            "inputText": text,
+            "embeddingConfig": {"outputEmbeddingLength": dimension}
         }
     )
-    bedrock_runtime = boto3.client(service_name='bedrock-runtime', region_name='us-east-1')
     response = bedrock_runtime.invoke_model(
         body=body,
         modelId="amazon.titan-embed-image-v1",
@@ -180,10 +380,69 @@ def get_embedding_for_text(text):
     vector_json = json.loads(response['body'].read().decode('utf8'))
     return vector_json, text
 
-def call_bedrock(prompt, image_data = None):
-    # TODO read from ENV?
-    model_id = 'anthropic.claude-3-haiku-20240307-v1:0'
-    max_tokens = 1000
+class JsonCloseTracker:
+    # Follows bracket depth across streamed chunks, ignoring brackets inside
+    # strings, to tell when the JSON answer closes. Only a [ or { that begins
+    # a line or follows a ```json fence can start the answer, so bracketed
+    # prose such as "rules [1] and [2]" is never mistaken for it, and a
+    # closed candidate must parse as an object or a list of objects.
+    def __init__(self):
+        self.reset()
+        self.line_start = True
+        self.recent = ''
+
+    def reset(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.candidate = []
+
+    def feed(self, text):
+        # Returns the offset just past the closing bracket within text, or None.
+        for index, char in enumerate(text):
+            if not self.started:
+                if char in '[{' and (self.line_start or self.recent.rstrip(' ').endswith('```json')):
+                    self.started = True
+                    self.depth = 1
+                    self.candidate = [char]
+                else:
+                    if char == '\n':
+                        self.line_start = True
+                    elif char not in ' \t\r':
+                        self.line_start = False
+                    self.recent = (self.recent + char)[-16:]
+                continue
+            self.candidate.append(char)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '[{':
+                self.depth += 1
+            elif char in ']}':
+                self.depth -= 1
+                if self.depth == 0:
+                    if is_json_answer(''.join(self.candidate)):
+                        return index + 1
+                    self.reset()
+                    self.line_start = False
+                    self.recent = ''
+        return None
+
+def is_json_answer(text):
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(value, dict) or (isinstance(value, list) and all(isinstance(v, dict) for v in value))
+
+def build_claude_body(prompt, image_data=None, max_tokens=1000):
     # Create the text content
     text_content = {
         "type": "text",
@@ -206,25 +465,91 @@ def call_bedrock(prompt, image_data = None):
         "role": "user",
         "content": content
     }]
-    bedrock_runtime = boto3.client(service_name='bedrock-runtime', region_name='us-east-1')
-    body = json.dumps(
+    return json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": max_tokens,
             "messages": messages
         }
     )
-    response = bedrock_runtime.invoke_model(body=body, modelId=model_id)
-    result = json.loads(response.get('body').read())['content'][0]['text']
+
+def stream_bedrock(prompt, image_data=None, model_id=CLAUDE_MODEL_ID, usage=None):
+    # Yields text deltas as Claude produces them. Input/output token counts are
+    # written into usage when given. Closing the generator closes the stream.
+    response = bedrock_runtime.invoke_model_with_response_stream(
+        body=build_claude_body(prompt, image_data),
+        modelId=model_id
+    )
+    events = response['body']
+    try:
+        for event in events:
+            if 'chunk' not in event:
+                continue
+            chunk = json.loads(event['chunk']['bytes'])
+            if chunk['type'] == 'message_start' and usage is not None:
+                usage['input_tokens'] = chunk['message'].get('usage', {}).get('input_tokens')
+            elif chunk['type'] == 'content_block_delta' and chunk['delta'].get('type') == 'text_delta':
+                yield chunk['delta']['text']
+            elif chunk['type'] == 'message_delta' and usage is not None:
+                usage['output_tokens'] = chunk.get('usage', {}).get('output_tokens')
+    finally:
+        events.close()
+
+def call_bedrock(prompt, image_data = None):
+    # TODO read from ENV?
+    model_id = CLAUDE_MODEL_ID
+    start = time.perf_counter()
+    if not BEDROCK_STREAMING:
+        response = bedrock_runtime.invoke_model(body=build_claude_body(prompt, image_data), modelId=model_id)
+        payload = json.loads(response.get('body').read())
+        usage = payload.get('usage', {})
+        print(f"Bedrock {model_id} took {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"input_tokens={usage.get('input_tokens')} output_tokens={usage.get('output_tokens')} prompt_chars={len(prompt)}")
+        result = payload['content'][0]['text']
+        print(result)
+        return result
+
+    usage = {}
+    chunks = 0
+    parts = []
+    first_token_ms = None
+    stopped_early = False
+    tracker = JsonCloseTracker()
+    deltas = stream_bedrock(prompt, image_data, model_id, usage)
+    try:
+        for text in deltas:
+            chunks += 1
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            end = tracker.feed(text)
+            if end is not None:
+                text = text[:end]
+            parts.append(text)
+            if end is not None:
+                # The answer is complete; stop paying for the model's trailing prose.
+                stopped_early = True
+                break
+    finally:
+        deltas.close()
+    result = ''.join(parts)
+    ttft = f"{first_token_ms:.1f}" if first_token_ms is not None else "n/a"
+    print(f"Bedrock {model_id} streamed in {(time.perf_counter() - start) * 1000:.1f} ms, ttft={ttft} ms, "
+          f"stopped_early={stopped_early} chunks={chunks} input_tokens={usage.get('input_tokens')} "
+          f"output_tokens={usage.get('output_tokens')} prompt_chars={len(prompt)}")
     print(result)
     return result
 
+def query_first(table_name, key, value):
+    response = dynamodb.query(
+        TableName=table_name,
+        KeyConditionExpression='#k = :v',
+        ExpressionAttributeNames={'#k': key},
+        ExpressionAttributeValues={':v': value}
+    )
+    return {name: deserializer.deserialize(attr) for name, attr in response['Items'][0].items()}
+
 def get_item_info(item_id):
-    dynamodb = boto3.resource('dynamodb')
-    # TODO Read from ENV
-    table = dynamodb.Table('item_table')
-    response = table.query(KeyConditionExpression=Key('ITEM_ID').eq(item_id))
-    item = response['Items'][0]
+    item = query_first(ITEM_TABLE_NAME, 'ITEM_ID', {'S': str(item_id)})
     result = {
         "item_id": str(item['ITEM_ID']),
         "title": str(item['NAME']),
@@ -235,11 +560,7 @@ def get_item_info(item_id):
     return result
 
 def get_user_info(user_id):
-    dynamodb = boto3.resource('dynamodb')
-    # TODO Read from ENV
-    table = dynamodb.Table('user_table')
-    response = table.query(KeyConditionExpression=Key('USER_ID').eq(int(user_id)))
-    item = response['Items'][0]
+    item = query_first(USER_TABLE_NAME, 'USER_ID', {'N': str(int(user_id))})
     # TODO where is visited, add_to_cart, purchased?
     result = {
         "user_id": str(item['USER_ID']),
@@ -126,6 +126,16 @@ class SalesAgentStack(Stack):
         _item_table.grant_read_data(bedrock_agent_lambda_role)
         _user_table.grant_read_data(bedrock_agent_lambda_role)
         _sales_agent_kb.vector_store.grant_data_access(bedrock_agent_lambda_role)
+        # Live product index pointer written by import-data/createIndex.py promote
+        _index_pointer_prefix = "/agentcore/sales-agent/production/"
+        bedrock_agent_lambda_role.add_to_policy(iam.PolicyStatement(
+            actions=["ssm:GetParameter"],
+            resources=[self.format_arn(
+                service="ssm",
+                resource="parameter",
+                resource_name=_index_pointer_prefix.strip("/") + "/aoss_index_name",
+            )],
+        ))
 
         #opensearch-layer
         _opensearch_layer = lambda_.LayerVersion(self, 'OpenSearchLayer',
@@ -154,6 +164,7 @@ class SalesAgentStack(Stack):
                 'AOSS_COLLECTION_ARN': _sales_agent_kb.vector_store.collection_arn,
                 'AOSS_COLLECTION_ENDPOINT': _sales_agent_kb.vector_store.collection_endpoint,
                 'AOSS_REGION': 'us-east-1',
+                'PARAMETER_STORE_PREFIX': _index_pointer_prefix,
             },
             role=bedrock_agent_lambda_role,
             tracing=lambda_.Tracing.ACTIVE
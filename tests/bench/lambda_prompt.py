@@ -0,0 +1,94 @@
+"""Prompt size and LLM latency benchmark for lambda/handler.py.
+
+Runs the API paths that call Claude against local stand-ins, captures every
+prompt the handler sends, and reports its size (characters and estimated
+tokens) next to the end-to-end latency. The fake model's latency grows with
+the input size (``--llm-ms-per-1k-tokens``), so smaller prompts show up as
+faster responses::
+
+    python -m tests.bench.lambda_prompt --compare-to HEAD~1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+
+from tests.bench.lambda_stand_ins import (
+    DEFAULT_EVENTS,
+    HANDLER_PATH,
+    Latency,
+    estimate_tokens,
+    handler_at_revision,
+    lambda_stand_ins,
+    load_handler,
+    summarize_ms,
+)
+
+LLM_PATHS = ("/compareProduct", "/getRecommendation")
+
+
+def _prompt_text(body: bytes) -> str:
+    messages = json.loads(body)["messages"]
+    return "".join(part.get("text", "") for message in messages for part in message["content"])
+
+
+def bench_prompts(path: Path, invocations: int, latency: Latency) -> dict:
+    """Return prompt size and latency per LLM-backed API path."""
+    results = {}
+    with lambda_stand_ins(latency) as fakes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            handler = load_handler(path)
+            for api_path in LLM_PATHS:
+                event = DEFAULT_EVENTS[api_path]
+                fakes.requests.clear()
+                samples = []
+                for _ in range(invocations):
+                    start = time.perf_counter()
+                    response = handler.lambda_handler(event, None)
+                    samples.append(time.perf_counter() - start)
+                    if response["response"]["httpStatusCode"] != 200:
+                        raise RuntimeError(f"{api_path}: {response['response']['responseBody']}")
+                prompts = [_prompt_text(body) for url, body in fakes.requests if "titan-embed" not in url]
+                results[api_path] = {
+                    "prompt_chars": len(prompts[-1]),
+                    "prompt_tokens": estimate_tokens(prompts[-1]),
+                    "request_bytes": max(len(body) for url, body in fakes.requests if "titan-embed" not in url),
+                    "latency": summarize_ms(samples),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure LLM prompt size and latency against local stand-ins")
+    parser.add_argument("--handler", type=Path, default=HANDLER_PATH, help="handler.py to benchmark")
+    parser.add_argument("--compare-to", metavar="REV", help="also benchmark lambda/handler.py at this git revision")
+    parser.add_argument("--invocations", type=int, default=10, help="invocations per API path")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fixed simulated Claude latency in seconds")
+    parser.add_argument("--llm-ms-per-1k-tokens", type=float, default=100.0,
+                        help="simulated Claude latency per 1,000 input tokens, in milliseconds")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    latency = Latency(embed=0.0, llm=args.llm_latency, personalize=0.0, knn=0.0,
+                      llm_per_1k_input_tokens=args.llm_ms_per_1k_tokens / 1000)
+    variants = {"current": args.handler}
+    if args.compare_to:
+        variants = {args.compare_to: handler_at_revision(args.compare_to), **variants}
+
+    report = {name: bench_prompts(path, args.invocations, latency) for name, path in variants.items()}
+
+    print(f"{'variant':<12}{'api path':<20}{'chars':>8}{'~tokens':>9}{'p50 ms':>9}{'mean ms':>9}")
+    for name, results in report.items():
+        for api_path, r in results.items():
+            print(f"{name:<12}{api_path:<20}{r['prompt_chars']:>8}{r['prompt_tokens']:>9}"
+                  f"{r['latency']['p50_ms']:>9.1f}{r['latency']['mean_ms']:>9.1f}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Local stand-ins for running lambda/handler.py without AWS.
+
+DynamoDB is served by moto. Bedrock Runtime and Personalize Runtime
+requests are answered by a botocore ``before-send`` hook, and requests to
+``*.aoss.amazonaws.com`` are answered by patching ``requests.Session.send``.
+Real boto3 and opensearch-py clients are still built, serialise and sign
+every request, so client construction and connection setup costs are part
+of what gets measured; only the network round trip is replaced by a sleep.
+"""
+
+import base64
+import binascii
+import csv
+import importlib.util
+import io
+import itertools
+import json
+import math
+import os
+import struct
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from unittest.mock import patch
+
+import boto3
+import requests
+from botocore.awsrequest import AWSResponse
+from botocore.handlers import BUILTIN_HANDLERS, REGISTER_FIRST
+from requests.structures import CaseInsensitiveDict
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+HANDLER_PATH = REPO_ROOT / "lambda" / "handler.py"
+_DATA_DIR = REPO_ROOT / "data" / "DynamoDB"
+_REGION = "us-east-1"
+
+DEFAULT_COMPLETION = json.dumps([
+    {"item_id": "e1669081-8ffc-4dec-97a6-e9176d7f6651", "reason": "Lowest price that matches the request"},
+]) + (
+    "\n\nI picked this item because it is the lowest-priced option that still fits the stated"
+    " preference, and it complements the user's recent purchases. The other candidates were"
+    " either more expensive or less aligned with the user's history."
+)
+
+
+@dataclass
+class Latency:
+    """Simulated service round-trip times in seconds."""
+
+    embed: float = 0.05
+    llm: float = 0.4
+    personalize: float = 0.05
+    knn: float = 0.02
+    # Added to ``llm`` per 1,000 estimated input tokens, so prompt size shows up in latency.
+    llm_per_1k_input_tokens: float = 0.0
+    # Delay between streamed output tokens (and per output token for invoke_model).
+    llm_per_output_token: float = 0.0
+
+
+def estimate_tokens(text: str | bytes) -> int:
+    """Rough token count (four characters per token), as used by the fake usage block."""
+    return math.ceil(len(text) / 4)
+
+
+class _RawBody(io.BytesIO):
+    def stream(self, **kwargs):
+        contents = self.read()
+        while contents:
+            yield contents
+            contents = self.read()
+
+
+class _EventStreamBody:
+    """Raw body that releases pre-encoded event-stream messages with delays."""
+
+    def __init__(self, messages: list[tuple[float, bytes]]):
+        self._messages = messages
+        self.closed = False
+
+    def stream(self, **kwargs):
+        for delay, message in self._messages:
+            if self.closed:
+                return
+            time.sleep(delay)
+            yield message
+
+    def close(self):
+        self.closed = True
+
+
+def _event_message(payload: dict) -> bytes:
+    """Encode a Bedrock ``chunk`` event in the AWS event-stream wire format."""
+    headers = b""
+    for name, value in ((":event-type", "chunk"), (":content-type", "application/json"), (":message-type", "event")):
+        headers += bytes([len(name)]) + name.encode() + b"\x07" + struct.pack(">H", len(value)) + value.encode()
+    body = json.dumps({"bytes": base64.b64encode(json.dumps(payload).encode()).decode()}).encode()
+    prelude = struct.pack(">II", 12 + len(headers) + len(body) + 4, len(headers))
+    message = prelude + struct.pack(">I", binascii.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", binascii.crc32(message))
+
+
+def _aws_response(request, payload: dict) -> AWSResponse:
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+    return AWSResponse(request.url, 200, headers, _RawBody(body))
+
+
+def load_catalog(size: int) -> tuple[list[dict], list[dict]]:
+    """Return up to *size* items and all users from ``data/DynamoDB``."""
+    with open(_DATA_DIR / "items.csv", newline="") as f:
+        items = list(itertools.islice(csv.DictReader(f), size))
+    with open(_DATA_DIR / "users.csv", newline="") as f:
+        users = list(csv.DictReader(f))
+    return items, users
+
+
+class ServiceFakes:
+    """Canned responses for the services moto does not cover."""
+
+    def __init__(self, items: list[dict], latency: Latency, completion: str = DEFAULT_COMPLETION):
+        self.items = items
+        self.latency = latency
+        self.completion = completion
+        self.calls: dict[str, int] = {}
+        self.requests: list[tuple[str, bytes]] = []
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def bedrock(self, request, **kwargs):
+        body = request.body or b"{}"
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.requests.append((request.url, body))
+        if "titan-embed" in request.url:
+            self._count("embed")
+            time.sleep(self.latency.embed)
+            return _aws_response(request, {"embedding": [0.0] * 1024, "inputTextTokenCount": 8})
+        input_tokens = estimate_tokens(body)
+        first_token = self.latency.llm + self.latency.llm_per_1k_input_tokens * input_tokens / 1000
+        output_tokens = estimate_tokens(self.completion)
+        if request.url.endswith("/invoke-with-response-stream"):
+            self._count("llm_stream")
+            return self._stream_response(request, first_token, input_tokens)
+        self._count("llm")
+        time.sleep(first_token + self.latency.llm_per_output_token * output_tokens)
+        return _aws_response(request, {
+            "content": [{"type": "text", "text": self.completion}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        })
+
+    def _stream_response(self, request, first_token: float, input_tokens: int) -> AWSResponse:
+        per_token = self.latency.llm_per_output_token
+        tokens = [self.completion[i:i + 4] for i in range(0, len(self.completion), 4)]
+        events = [(first_token, {"type": "message_start", "message": {"usage": {"input_tokens": input_tokens}}}),
+                  (0.0, {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})]
+        events += [(per_token, {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}})
+                   for token in tokens]
+        events += [(0.0, {"type": "content_block_stop", "index": 0}),
+                   (0.0, {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                          "usage": {"output_tokens": len(tokens)}}),
+                   (0.0, {"type": "message_stop"})]
+        raw = _EventStreamBody([(delay, _event_message(event)) for delay, event in events])
+        return AWSResponse(request.url, 200, {"Content-Type": "application/vnd.amazon.eventstream"}, raw)
+
+    def personalize(self, request, **kwargs):
+        self._count("personalize")
+        time.sleep(self.latency.personalize)
+        return _aws_response(request, {
+            "itemList": [{"itemId": item["ITEM_ID"], "score": 0.5} for item in self.items[3:8]],
+            "recommendationId": "bench",
+        })
+
+    def opensearch_search(self, prepared) -> requests.Response:
+        self._count("knn")
+        time.sleep(self.latency.knn)
+        hits = [
+            {
+                "_id": item["ITEM_ID"],
+                "_score": 0.9 - rank * 0.01,
+                "_source": {
+                    "item_id": item["ITEM_ID"],
+                    "price": item["PRICE"],
+                    "style": item["STYLE"],
+                    "image_path": item["IMAGE"],
+                    "image_product_description": f"{item['NAME']}. " + "A versatile piece for everyday use. " * 12,
+                },
+            }
+            for rank, item in enumerate(self.items[:5])
+        ]
+        return _json_response(prepared, {"hits": {"total": {"value": len(hits)}, "hits": hits}})
+
+    def opensearch_mapping(self, prepared) -> requests.Response:
+        # An index created before vector settings were recorded in _meta.
+        return _json_response(prepared, {"product-search-multimodal-index": {"mappings": {"properties": {}}}})
+
+
+def _json_response(prepared, payload: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode("utf-8")
+    response.headers = CaseInsensitiveDict({"content-type": "application/json"})
+    response.url = prepared.url
+    response.request = prepared
+    return response
+
+
+def _seed_dynamodb(items: list[dict], users: list[dict]) -> None:
+    dynamodb = boto3.resource("dynamodb", region_name=_REGION)
+    for name, key, key_type in (("item_table", "ITEM_ID", "S"), ("user_table", "USER_ID", "N")):
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": key_type}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+    with dynamodb.Table("item_table").batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=dict(item))
+    with dynamodb.Table("user_table").batch_writer() as batch:
+        for user in users:
+            batch.put_item(Item={"USER_ID": int(user["USER_ID"]), "AGE": int(user["AGE"]), "GENDER": user["GENDER"]})
+
+
+_MOTO_CONFIG = {"core": {"passthrough": {"urls": [r"https://bedrock-runtime\..*", r"https://personalize-runtime\..*"]}}}
+
+
+@contextmanager
+def lambda_stand_ins(latency: Latency | None = None, catalog_size: int = 200, completion: str = DEFAULT_COMPLETION):
+    """Serve every AWS dependency of lambda/handler.py locally.
+
+    Yields the :class:`ServiceFakes` instance so callers can inspect call
+    counts and captured request bodies.
+    """
+    from moto import mock_aws
+
+    env = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": _REGION,
+        "AOSS_COLLECTION_ID": "bench",
+        "AOSS_REGION": _REGION,
+        "ITEM_TABLE_NAME": "item_table",
+        "USER_TABLE_NAME": "user_table",
+        "RECOMMENDER_ARN": "arn:aws:personalize:us-east-1:123456789012:recommender/bench",
+    }
+    items, users = load_catalog(catalog_size)
+    fakes = ServiceFakes(items, latency or Latency(), completion)
+    # Registered ahead of moto's catch-all stubber. botocore still calls every
+    # before-send handler, so moto is also told to pass these hosts through.
+    hooks = [
+        ("before-send.bedrock-runtime", fakes.bedrock, REGISTER_FIRST),
+        ("before-send.personalize-runtime", fakes.personalize, REGISTER_FIRST),
+    ]
+    real_send = requests.Session.send
+
+    def _send(self, prepared, **kwargs):
+        if ".aoss.amazonaws.com" in prepared.url:
+            if "/_mapping" in prepared.url:
+                return fakes.opensearch_mapping(prepared)
+            return fakes.opensearch_search(prepared)
+        return real_send(self, prepared, **kwargs)
+
+    # Builtin handlers are copied into each session when it is created, so
+    # the hooks go in first and any cached default session is dropped.
+    BUILTIN_HANDLERS[:0] = hooks
+    boto3.DEFAULT_SESSION = None
+    try:
+        with patch.dict(os.environ, env), mock_aws(config=_MOTO_CONFIG), patch.object(requests.Session, "send", _send):
+            _seed_dynamodb(items, users)
+            yield fakes
+    finally:
+        for hook in hooks:
+            BUILTIN_HANDLERS.remove(hook)
+        boto3.DEFAULT_SESSION = None
+
+
+_loaded = itertools.count()
+
+
+def load_handler(path: Path = HANDLER_PATH):
+    """Import a handler.py from *path* as a fresh module (runs its init code)."""
+    spec = importlib.util.spec_from_file_location(f"bench_handler_{next(_loaded)}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def handler_at_revision(rev: str) -> Path:
+    """Write lambda/handler.py as of git revision *rev* to a temporary file."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:lambda/handler.py"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    fd, name = tempfile.mkstemp(prefix=f"handler-{rev}-", suffix=".py")
+    with os.fdopen(fd, "w") as f:
+        f.write(source)
+    return Path(name)
+
+
+def make_event(api_path: str, **parameters) -> dict:
+    """Build a Bedrock Agent action-group event for *api_path*."""
+    return {
+        "messageVersion": "1.0",
+        "actionGroup": "sales-agent-action-group",
+        "apiPath": api_path,
+        "httpMethod": "GET",
+        "parameters": [{"name": k, "type": "string", "value": v} for k, v in parameters.items()],
+    }
+
+
+DEFAULT_EVENTS = {
+    "/searchProduct": make_event("/searchProduct", condition="warm scarf for winter"),
+    "/compareProduct": make_event("/compareProduct", user_id="1", condition="sofa", preference="modern"),
+    "/getRecommendation": make_event("/getRecommendation", user_id="2", preference="christmas gifts"),
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated *q*-th percentile (0-100) of a non-empty sorted list."""
+    rank = (q / 100.0) * (len(sorted_values) - 1)
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize_ms(samples: list[float]) -> dict:
+    """Mean/p50/p95/p99/max of *samples* (seconds), in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
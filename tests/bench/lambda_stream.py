@@ -0,0 +1,106 @@
+"""Buffered vs streamed Claude calls in lambda/handler.py.
+
+Runs ``/compareProduct`` and ``/getRecommendation`` against local stand-ins
+whose fake model emits one token every ``--ms-per-token`` milliseconds after
+``--llm-latency`` seconds, then reports time to first token and end-to-end
+latency with ``BEDROCK_STREAMING`` off and on. With streaming on, the handler
+stops reading as soon as the JSON answer closes, so the trailing prose the
+model adds after it is never waited for::
+
+    python -m tests.bench.lambda_stream --invocations 10
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import time
+from pathlib import Path
+
+from tests.bench.lambda_stand_ins import (
+    DEFAULT_EVENTS,
+    HANDLER_PATH,
+    Latency,
+    lambda_stand_ins,
+    load_handler,
+    summarize_ms,
+)
+
+LLM_PATHS = ("/compareProduct", "/getRecommendation")
+
+
+def bench_streaming(path: Path, invocations: int, latency: Latency, streaming: bool) -> dict:
+    """Return TTFT and end-to-end latency per LLM-backed API path."""
+    results = {}
+    with lambda_stand_ins(latency):
+        with contextlib.redirect_stdout(io.StringIO()):
+            handler = load_handler(path)
+            handler.BEDROCK_STREAMING = streaming
+            call_bedrock = handler.call_bedrock
+            first_tokens = []
+            call_started = []
+
+            def timed_call(prompt, *args, **kwargs):
+                call_started[:] = [time.perf_counter()]
+                result = call_bedrock(prompt, *args, **kwargs)
+                if not streaming:
+                    first_tokens.append(time.perf_counter() - call_started[0])
+                return result
+
+            handler.call_bedrock = functools.wraps(call_bedrock)(timed_call)
+            if streaming:
+                stream_bedrock = handler.stream_bedrock
+
+                def timed_stream(*args, **kwargs):
+                    deltas = stream_bedrock(*args, **kwargs)
+                    try:
+                        for i, text in enumerate(deltas):
+                            if i == 0:
+                                first_tokens.append(time.perf_counter() - call_started[0])
+                            yield text
+                    finally:
+                        deltas.close()
+
+                handler.stream_bedrock = timed_stream
+            for api_path in LLM_PATHS:
+                first_tokens.clear()
+                samples = []
+                for _ in range(invocations):
+                    start = time.perf_counter()
+                    response = handler.lambda_handler(DEFAULT_EVENTS[api_path], None)
+                    samples.append(time.perf_counter() - start)
+                    if response["response"]["httpStatusCode"] != 200:
+                        raise RuntimeError(f"{api_path}: {response['response']['responseBody']}")
+                results[api_path] = {"ttft": summarize_ms(first_tokens), "total": summarize_ms(samples)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare buffered and streamed Claude calls against local stand-ins")
+    parser.add_argument("--handler", type=Path, default=HANDLER_PATH, help="handler.py to benchmark")
+    parser.add_argument("--invocations", type=int, default=10, help="invocations per API path")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="simulated time to first token in seconds")
+    parser.add_argument("--ms-per-token", type=float, default=15.0, help="simulated delay between output tokens")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    latency = Latency(embed=0.0, llm=args.llm_latency, personalize=0.0, knn=0.0,
+                      llm_per_output_token=args.ms_per_token / 1000)
+    report = {
+        mode: bench_streaming(args.handler, args.invocations, latency, streaming=mode == "streamed")
+        for mode in ("buffered", "streamed")
+    }
+
+    print(f"{'mode':<10}{'api path':<20}{'ttft p50':>10}{'total p50':>11}{'total p95':>11}")
+    for mode, results in report.items():
+        for api_path, r in results.items():
+            print(f"{mode:<10}{api_path:<20}{r['ttft']['p50_ms']:>10.1f}"
+                  f"{r['total']['p50_ms']:>11.1f}{r['total']['p95_ms']:>11.1f}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Warm-invocation latency benchmark for lambda/handler.py.
+
+Loads the handler (running its init code once, as Lambda does for a new
+execution environment), then times repeated invocations of each API path
+against local stand-ins. Pass ``--compare-to REV`` to benchmark the handler
+from another git revision in the same run, e.g. to show the effect of a
+change before and after::
+
+    python -m tests.bench.lambda_warm --compare-to HEAD~1 --output warm.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+
+from tests.bench.lambda_stand_ins import (
+    DEFAULT_EVENTS,
+    HANDLER_PATH,
+    Latency,
+    handler_at_revision,
+    lambda_stand_ins,
+    load_handler,
+    summarize_ms,
+)
+
+
+def bench_handler(path: Path, invocations: int, latency: Latency) -> dict:
+    """Return init time plus first and warm invocation latency per API path."""
+    results = {}
+    with lambda_stand_ins(latency):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            handler = load_handler(path)
+            results["init_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            for api_path, event in DEFAULT_EVENTS.items():
+                samples = []
+                for _ in range(invocations + 1):
+                    start = time.perf_counter()
+                    response = handler.lambda_handler(event, None)
+                    samples.append(time.perf_counter() - start)
+                    status = response["response"]["httpStatusCode"]
+                    if status != 200:
+                        raise RuntimeError(f"{api_path} returned {status}: {response['response']['responseBody']}")
+                results[api_path] = {
+                    "first_ms": round(samples[0] * 1000, 2),
+                    "warm": summarize_ms(samples[1:]),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark warm Lambda invocations against local stand-ins")
+    parser.add_argument("--handler", type=Path, default=HANDLER_PATH, help="handler.py to benchmark")
+    parser.add_argument("--compare-to", metavar="REV", help="also benchmark lambda/handler.py at this git revision")
+    parser.add_argument("--invocations", type=int, default=20, help="warm invocations per API path")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated Claude latency in seconds")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="simulated Titan latency in seconds")
+    parser.add_argument("--personalize-latency", type=float, default=0.0, help="simulated Personalize latency in seconds")
+    parser.add_argument("--knn-latency", type=float, default=0.0, help="simulated AOSS kNN latency in seconds")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    # Service latency defaults to zero so the report isolates handler overhead.
+    latency = Latency(embed=args.embed_latency, llm=args.llm_latency, personalize=args.personalize_latency, knn=args.knn_latency)
+    variants = {"current": args.handler}
+    if args.compare_to:
+        variants = {args.compare_to: handler_at_revision(args.compare_to), **variants}
+
+    report = {name: bench_handler(path, args.invocations, latency) for name, path in variants.items()}
+
+    print(f"{'variant':<12}{'api path':<20}{'first ms':>10}{'warm p50':>10}{'warm p95':>10}{'warm mean':>11}")
+    for name, results in report.items():
+        print(f"{name:<12}{'(init)':<20}{results['init_ms']:>10.1f}")
+        for api_path in DEFAULT_EVENTS:
+            r = results[api_path]
+            print(f"{'':<12}{api_path:<20}{r['first_ms']:>10.1f}{r['warm']['p50_ms']:>10.1f}"
+                  f"{r['warm']['p95_ms']:>10.1f}{r['warm']['mean_ms']:>11.1f}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
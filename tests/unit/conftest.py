@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# import-data holds standalone scripts that import each other by module name.
+IMPORT_DATA = Path(__file__).resolve().parents[2] / "import-data"
+if str(IMPORT_DATA) not in sys.path:
+    sys.path.insert(0, str(IMPORT_DATA))
@@ -0,0 +1,125 @@
+"""Batching and partial-failure retries in import-data/bulk.py."""
+
+import json
+import threading
+
+import pytest
+
+from bulk import BulkIndexer
+
+
+class FakeClient:
+    """Answers _bulk requests with per-document statuses from a script.
+
+    statuses maps a document id to the statuses it gets on successive
+    attempts; ids not listed are indexed on the first try.
+    """
+
+    def __init__(self, statuses=None, errors=0):
+        self.statuses = {doc_id: list(codes) for doc_id, codes in (statuses or {}).items()}
+        self.errors = errors
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def bulk(self, body):
+        with self._lock:
+            lines = body.splitlines()
+            ids = [json.loads(action)["index"]["_id"] for action in lines[::2]]
+            self.requests.append((ids, len(body)))
+            if self.errors:
+                self.errors -= 1
+                raise ConnectionError("connection reset")
+            items = []
+            for doc_id in ids:
+                codes = self.statuses.get(doc_id)
+                status = codes.pop(0) if codes else 201
+                outcome = {"_id": doc_id, "status": status}
+                if status >= 300:
+                    outcome["error"] = {"type": "rejected" if status == 429 else "mapper_parsing_exception"}
+                items.append({"index": outcome})
+            return {"errors": any(i["index"]["status"] >= 300 for i in items), "items": items}
+
+
+def _index(client, docs, **kwargs):
+    indexed = []
+    indexer = BulkIndexer(client, "products", workers=1, retry_delay=0, on_indexed=indexed.extend, **kwargs)
+    with indexer:
+        for doc_id in docs:
+            indexer.add(doc_id, {"item_id": doc_id, "text": "x" * 50})
+    return indexer.stats, indexed
+
+
+def test_only_retryable_failures_are_resent():
+    client = FakeClient({"b": [429], "c": [400], "d": [503, 429]})
+
+    stats, indexed = _index(client, ["a", "b", "c", "d"])
+
+    assert [ids for ids, _ in client.requests] == [["a", "b", "c", "d"], ["b", "d"], ["d"]]
+    assert sorted(indexed) == ["a", "b", "d"]
+    assert stats.docs == 3 and stats.requests == 3 and stats.retried == 3
+    assert [doc_id for doc_id, _ in stats.failed] == ["c"]
+    assert "mapper_parsing_exception" in stats.failed[0][1]
+
+
+def test_retryable_failure_gives_up_after_max_retries():
+    client = FakeClient({"a": [429, 429, 429]})
+
+    stats, indexed = _index(client, ["a", "b"], max_retries=2)
+
+    assert len(client.requests) == 3
+    assert indexed == ["b"]
+    assert [doc_id for doc_id, _ in stats.failed] == ["a"]
+
+
+def test_request_errors_resend_the_whole_batch():
+    client = FakeClient(errors=1)
+
+    stats, indexed = _index(client, ["a", "b"])
+
+    assert [ids for ids, _ in client.requests] == [["a", "b"], ["a", "b"]]
+    assert sorted(indexed) == ["a", "b"]
+    assert stats.retried == 2 and not stats.failed
+
+
+def test_batches_split_on_document_count():
+    client = FakeClient()
+
+    stats, _ = _index(client, [str(i) for i in range(7)], max_docs=3)
+
+    assert [len(ids) for ids, _ in client.requests] == [3, 3, 1]
+    assert stats.docs == 7
+
+
+def test_batches_split_on_size():
+    client = FakeClient()
+    doc_size = len(json.dumps({"index": {"_index": "products", "_id": "0"}})) + \
+        len(json.dumps({"item_id": "0", "text": "x" * 50})) + 2
+
+    stats, _ = _index(client, [str(i) for i in range(5)], max_bytes=doc_size * 2)
+
+    assert [len(ids) for ids, _ in client.requests] == [2, 2, 1]
+    assert all(size <= doc_size * 2 for _, size in client.requests)
+    assert stats.bytes == doc_size * 5
+
+
+def test_on_indexed_reports_each_confirmed_document_once():
+    client = FakeClient({"b": [429]})
+    calls = []
+    indexer = BulkIndexer(client, "products", workers=2, retry_delay=0, on_indexed=calls.append, max_docs=2)
+    with indexer:
+        for doc_id in "abcd":
+            indexer.add(doc_id, {"item_id": doc_id})
+
+    assert sorted(doc_id for call in calls for doc_id in call) == ["a", "b", "c", "d"]
+    assert all(calls)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_close_waits_for_every_batch(workers):
+    client = FakeClient()
+    indexer = BulkIndexer(client, "products", workers=workers, max_docs=1, retry_delay=0)
+    with indexer:
+        for i in range(20):
+            indexer.add(str(i), {"item_id": str(i)})
+
+    assert indexer.stats.docs == 20 and len(client.requests) == 20
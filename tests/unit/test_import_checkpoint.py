@@ -0,0 +1,163 @@
+"""Incremental re-embedding: import-data/checkpoint.py and embedding.changed_items."""
+
+import time
+
+import pytest
+
+import embedding
+from bulk import BulkIndexer
+from checkpoint import Checkpoint, content_hash
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoint.sqlite")
+
+
+@pytest.fixture
+def checkpoint(path):
+    checkpoint = Checkpoint(path)
+    yield checkpoint
+    checkpoint.close()
+
+
+class TestCheckpoint:
+    def test_commit_survives_reopen(self, path):
+        first = Checkpoint(path)
+        first.commit({"a": "h1", "b": "h2"})
+        first.close()
+
+        reopened = Checkpoint(path)
+        assert (reopened.get("a"), reopened.get("b"), reopened.get("c")) == ("h1", "h2", None)
+        assert reopened.count() == 2
+        reopened.close()
+
+    def test_namespaces_are_separate(self, path, checkpoint):
+        other = Checkpoint(path, namespace="embedding:product-search-multimodal-index-v2")
+        checkpoint.commit({"a": "h1"})
+
+        assert other.get("a") is None and other.count() == 0
+        other.close()
+
+    def test_is_current_checks_hash_and_since(self, checkpoint):
+        before = time.time() - 1
+        checkpoint.commit({"a": "h1"})
+
+        assert checkpoint.is_current("a", "h1")
+        assert checkpoint.is_current("a", "h1", since=before)
+        assert not checkpoint.is_current("a", "h1", since=time.time() + 1)
+        assert not checkpoint.is_current("a", "h2")
+        assert not checkpoint.is_current("b", "h1")
+
+    def test_content_hash_distinguishes_missing_values(self):
+        assert content_hash("etag", "desc", None) != content_hash("etag", "desc", "None")
+        assert content_hash("etag", "desc", 10) == content_hash("etag", "desc", "10")
+
+
+def _item(item_id, description="A scarf", price="10"):
+    return {"ITEM_ID": item_id, "IMAGE": f"{item_id}.jpg", "DESCRIPTION": description, "PRICE": price, "STYLE": "s"}
+
+
+@pytest.fixture(autouse=True)
+def etags(monkeypatch):
+    etags = {}
+    monkeypatch.setattr(embedding, "get_image_etag", lambda bucket, key: etags.get(key, '"v1"'))
+    return etags
+
+
+def _counts():
+    return {"new": 0, "changed": 0, "unchanged": 0}
+
+
+def _changed(items, checkpoint, force=False):
+    counts = _counts()
+    out = list(embedding.changed_items(items, "bucket", checkpoint, counts, workers=2, force=force))
+    return [item["ITEM_ID"] for item in out], counts
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def bulk(self, body):
+        self.calls += 1
+        ids = [line.split('"_id": "')[1].split('"')[0] for line in body.splitlines()[::2]]
+        return {"items": [{"index": {"_id": i, "status": 201}} for i in ids]}
+
+
+def _index(items, checkpoint):
+    """Index changed items the way embedding.main does, committing on confirmation."""
+    pending = {}
+    with BulkIndexer(FakeClient(), "products", workers=1,
+                     on_indexed=embedding.committer(checkpoint, pending)) as indexer:
+        for item in items:
+            pending[item["ITEM_ID"]] = item["_content_hash"]
+            indexer.add(item["ITEM_ID"], {"item_id": item["ITEM_ID"]})
+
+
+class TestChangedItems:
+    def test_unchanged_items_are_skipped(self, checkpoint):
+        items = [_item("a"), _item("b")]
+        _index(embedding.changed_items(items, "bucket", checkpoint, _counts(), workers=2), checkpoint)
+
+        ids, counts = _changed([_item("a"), _item("b")], checkpoint)
+
+        assert ids == []
+        assert counts == {"new": 0, "changed": 0, "unchanged": 2}
+
+    def test_changed_fields_and_images_are_re_embedded(self, checkpoint, etags):
+        _index(embedding.changed_items([_item("a"), _item("b"), _item("c")], "bucket", checkpoint,
+                                       _counts(), workers=2), checkpoint)
+        etags["b.jpg"] = '"v2"'
+
+        ids, counts = _changed([_item("a", price="12"), _item("b"), _item("c"), _item("d")], checkpoint)
+
+        assert sorted(ids) == ["a", "b", "d"]
+        assert counts == {"new": 1, "changed": 2, "unchanged": 1}
+
+    def test_crash_before_bulk_confirmation_re_embeds(self, checkpoint):
+        pending = {}
+        commit_indexed = embedding.committer(checkpoint, pending)
+        for item in embedding.changed_items([_item("a"), _item("b")], "bucket", checkpoint,
+                                            _counts(), workers=2):
+            pending[item["ITEM_ID"]] = item["_content_hash"]
+        # Only "a" was confirmed by a bulk response before the process died.
+        commit_indexed(["a"])
+
+        ids, counts = _changed([_item("a"), _item("b")], checkpoint)
+
+        assert ids == ["b"]
+        assert counts == {"new": 1, "changed": 0, "unchanged": 1}
+
+    def test_commit_ignores_ids_without_a_pending_hash(self, checkpoint):
+        embedding.committer(checkpoint, {"a": "h1"})(["a", "b"])
+
+        assert checkpoint.get("a") == "h1" and checkpoint.get("b") is None
+
+    def test_full_overrides_the_checkpoint(self, checkpoint):
+        _index(embedding.changed_items([_item("a")], "bucket", checkpoint, _counts(), workers=2),
+               checkpoint)
+
+        ids, counts = _changed([_item("a"), _item("b")], checkpoint, force=True)
+
+        assert ids == ["a", "b"]
+        assert counts == {"new": 1, "changed": 1, "unchanged": 0}
+
+    def test_items_without_description_pass_through_uncounted(self, checkpoint):
+        ids, counts = _changed([_item("a", description=""), _item("b")], checkpoint)
+
+        assert ids == ["a", "b"]
+        assert counts == {"new": 1, "changed": 0, "unchanged": 0}
+
+    def test_dry_run_counts(self, checkpoint, etags):
+        _index(embedding.changed_items([_item("a"), _item("b")], "bucket", checkpoint,
+                                       _counts(), workers=2), checkpoint)
+        etags["b.jpg"] = '"v2"'
+        counts = _counts()
+        items = embedding.changed_items([_item("a"), _item("b"), _item("c"), _item("d", description=None)],
+                                        "bucket", checkpoint, counts, workers=2)
+
+        summary = embedding.dry_run_summary(items, counts)
+
+        assert summary == "Would re-embed 2 items (1 new, 1 changed); 1 unchanged, 1 without a description"
+        assert checkpoint.count() == 2
@@ -0,0 +1,50 @@
+"""Ground-truth search in import-data/evaluate.py, with and without numpy."""
+
+import random
+from argparse import Namespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import evaluate
+
+
+@pytest.fixture
+def vectors():
+    rng = random.Random(7)
+    return {f"item-{i}": [rng.uniform(-1, 1) for _ in range(16)] for i in range(200)}
+
+
+def _queries(vectors):
+    return [vectors["item-3"], vectors["item-150"], [1.0] * 16]
+
+
+def test_pure_python_search_finds_the_query_itself(vectors, monkeypatch):
+    monkeypatch.setattr(evaluate, "np", None)
+    index = evaluate.ExactIndex(vectors)
+
+    assert index.search(vectors["item-42"], 5)[0] == "item-42"
+
+
+def test_numpy_and_pure_python_agree(vectors, monkeypatch):
+    pytest.importorskip("numpy")
+    fast = [evaluate.ExactIndex(vectors).search(q, 10) for q in _queries(vectors)]
+    monkeypatch.setattr(evaluate, "np", None)
+    slow = [evaluate.ExactIndex(vectors).search(q, 10) for q in _queries(vectors)]
+
+    assert fast == slow
+
+
+def test_lucene_is_measured_once_instead_of_swept(vectors, monkeypatch):
+    built, swept = [], []
+    monkeypatch.setattr(evaluate, "load_eval_index", lambda client, name, body, vectors, quantization: built.append(body))
+    monkeypatch.setattr(evaluate, "set_ef_search", lambda client, name, ef_search: swept.append(ef_search) or True)
+    monkeypatch.setattr(evaluate, "run_queries", lambda client, name, queries, k, quantization: ([["item-0"]], [0.001]))
+    args = Namespace(engines=["nmslib", "lucene"], quantizations=["none"], m=[16], ef_construction=[128],
+                     ef_search=[64, 256], k=1, keep_index=False)
+
+    rows = evaluate.evaluate_opensearch(MagicMock(), {"src": vectors}, ["item-0"], [["item-0"]], args)
+
+    assert [(r["engine"], r["ef_search"]) for r in rows] == [("nmslib", 64), ("nmslib", 256), ("lucene", None)]
+    assert swept == [256]
+    assert len(built) == 2
@@ -0,0 +1,108 @@
+"""Round trips through the export file formats in import-data/export.py."""
+
+import json
+
+import pytest
+
+import export
+from export import NpyWriter, TableWriter, read_npy, read_table
+
+# Exactly representable in float32, so rows compare equal after the round trip.
+ROWS = [[float(i), -0.5 * i, 0.25, i / 8] for i in range(10)]
+
+
+@pytest.fixture
+def npy(tmp_path):
+    path = str(tmp_path / "vectors.npy")
+    writer = NpyWriter(path, 4)
+    writer.write(ROWS[:3])
+    writer.write([])
+    writer.write(ROWS[3:])
+    writer.close()
+    return path
+
+
+class TestNpy:
+    def test_round_trip(self, npy):
+        assert list(read_npy(npy)) == ROWS
+
+    def test_reads_a_slice(self, npy):
+        assert list(read_npy(npy, start=4, stop=7)) == ROWS[4:7]
+        assert list(read_npy(npy, start=8, stop=100)) == ROWS[8:]
+
+    def test_rejects_rows_of_the_wrong_dimension(self, tmp_path):
+        writer = NpyWriter(str(tmp_path / "bad.npy"), 4)
+        with pytest.raises(ValueError):
+            writer.write([[1.0, 2.0, 3.0]])
+        writer.close()
+
+    def test_loads_with_numpy(self, npy):
+        np = pytest.importorskip("numpy")
+
+        matrix = np.load(npy, mmap_mode="r")
+
+        assert matrix.shape == (10, 4) and matrix.dtype == np.float32
+        assert matrix.tolist() == ROWS
+
+
+TABLE = [{"item_id": str(i), "price": f"{i}.99", "style": None if i % 2 else "scarf"} for i in range(5)]
+
+
+def _write_table(tmp_path):
+    writer = TableWriter(str(tmp_path / "documents"))
+    writer.write(TABLE[:2])
+    writer.write([])
+    writer.write(TABLE[2:])
+    writer.close()
+    return writer
+
+
+def test_table_jsonl_fallback_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "pq", None)
+
+    writer = _write_table(tmp_path)
+
+    assert writer.path.endswith("documents.jsonl") and writer.rows == 5
+    assert [json.loads(line) for line in open(writer.path)] == TABLE
+    assert list(read_table(str(tmp_path), "documents")) == TABLE
+
+
+def test_table_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    writer = _write_table(tmp_path)
+
+    assert writer.path.endswith("documents.parquet")
+    assert list(read_table(str(tmp_path), "documents")) == TABLE
+
+
+class ServerlessSearch:
+    """Stand-in for an OpenSearch Serverless collection: no scroll, no _id sort, from/size capped."""
+
+    def __init__(self, count):
+        self.ids = sorted(f"item-{i:05d}" for i in range(count))
+
+    def search(self, index, body, scroll=None):
+        if scroll:
+            raise RuntimeError("scroll is not supported")
+        size = body["size"]
+        if "sort" in body:
+            (field, _), = body["sort"][0].items()
+            if field != "item_id":
+                raise RuntimeError(f"cannot sort on {field}")
+            after = body.get("search_after", [""])[0]
+            page = [i for i in self.ids if i > after][:size]
+        else:
+            start = body.get("from", 0)
+            if start + size > 10_000:
+                raise RuntimeError("Result window is too large")
+            page = self.ids[start:start + size]
+        return {"hits": {"hits": [{"_id": i, "_source": {"item_id": i}, "sort": [i]} for i in page]}}
+
+
+def test_serverless_export_pages_past_the_result_window():
+    client = ServerlessSearch(12_345)
+
+    ids = [hit["_id"] for hit in export.iter_documents(client, "products", page_size=1000)]
+
+    assert ids == client.ids
@@ -0,0 +1,85 @@
+"""Resuming a describe run with import-data/image2Text.py."""
+
+import importlib
+import io
+import time
+
+import pytest
+
+from checkpoint import Checkpoint, content_hash
+
+ITEM = {"ITEM_ID": "a", "NAME": "Scarf", "IMAGE": "image/a.jpg"}
+
+
+class FakeS3:
+    def __init__(self, etag):
+        self.etag = etag
+        self.calls = []
+
+    def head_object(self, Bucket, Key):
+        self.calls.append("head")
+        return {"ETag": self.etag, "ContentLength": 4}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.calls.append("get")
+        return {"ETag": self.etag, "Body": io.BytesIO(b"jpeg")}
+
+
+@pytest.fixture
+def image2text(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    module = importlib.import_module("image2Text")
+    monkeypatch.setattr(module, "call_bedrock", lambda prompt, image: "A red scarf.")
+    monkeypatch.setattr(module, "insert_description_to_dynamodb", lambda item_id, description: None)
+    return module
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.sqlite"), namespace="image2text")
+    yield checkpoint
+    checkpoint.close()
+
+
+def test_resume_skips_without_downloading(image2text, checkpoint, monkeypatch):
+    s3 = FakeS3('"v1"')
+    monkeypatch.setattr(image2text, "s3_client", s3)
+    since = time.time() - 60
+    checkpoint.commit({"a": content_hash('"v1"', "Scarf")})
+
+    status, _ = image2text.process_item(dict(ITEM), "bucket", checkpoint, since)
+
+    assert status == "skipped"
+    assert s3.calls == ["head"]
+
+
+def test_changed_image_is_downloaded_and_committed(image2text, checkpoint, monkeypatch):
+    s3 = FakeS3('"v2"')
+    monkeypatch.setattr(image2text, "s3_client", s3)
+    since = time.time() - 60
+    checkpoint.commit({"a": content_hash('"v1"', "Scarf")})
+
+    status, _ = image2text.process_item(dict(ITEM), "bucket", checkpoint, since)
+
+    assert status == "done"
+    assert s3.calls == ["head", "get"]
+    assert checkpoint.get("a") == content_hash('"v2"', "Scarf")
+
+
+def test_resume_passes_its_head_response_to_fetch(image2text, checkpoint, monkeypatch):
+    s3 = FakeS3('"v2"')
+    monkeypatch.setattr(image2text, "s3_client", s3)
+    heads = []
+
+    def fetch(s3_client, bucket, key, head=None):
+        heads.append(head)
+        return b"jpeg", head["ETag"]
+
+    monkeypatch.setattr(image2text.image_prep, "fetch", fetch)
+    checkpoint.commit({"a": content_hash('"v1"', "Scarf")})
+
+    status, _ = image2text.process_item(dict(ITEM), "bucket", checkpoint, time.time() - 60)
+
+    assert status == "done"
+    assert s3.calls == ["head"]
+    assert heads == [{"ETag": '"v2"', "ContentLength": 4}]
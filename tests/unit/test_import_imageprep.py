@@ -0,0 +1,75 @@
+"""Image preprocessing in import-data/imageprep.py."""
+
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import imageprep
+
+
+def _encode(image, format="PNG", **kwargs):
+    out = io.BytesIO()
+    image.save(out, format=format, **kwargs)
+    return out.getvalue()
+
+
+def _shrink(data, max_side=64):
+    prep = imageprep.ImagePreprocessor(cache_dir=None, max_side=max_side)
+    return Image.open(io.BytesIO(prep.shrink(data)))
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA"])
+def test_transparent_background_becomes_white(mode):
+    image = Image.new(mode, (200, 100), (0,) * len(mode))
+
+    result = _shrink(_encode(image))
+
+    assert result.format == "JPEG" and result.size == (64, 32)
+    assert min(result.getpixel((10, 10))) > 245
+
+
+def test_palette_transparency_becomes_white():
+    image = Image.new("P", (100, 100), 0)
+    image.putpalette([0, 0, 0, 200, 0, 0] + [0] * 762)
+    image.paste(1, (40, 40, 60, 60))
+
+    result = _shrink(_encode(image, transparency=0))
+
+    assert min(result.getpixel((2, 2))) > 245
+    red, green, _ = result.getpixel((32, 32))
+    assert red > 150 and green < 60
+
+
+def test_opaque_image_keeps_its_colours():
+    result = _shrink(_encode(Image.new("RGB", (128, 128), (0, 0, 255))))
+
+    red, green, blue = result.getpixel((5, 5))
+    assert blue > 230 and red < 20 and green < 20
+
+
+
+class _S3:
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+
+    def head_object(self, Bucket, Key):
+        self.calls.append(("head", Key))
+        return {"ETag": '"v1"', "ContentLength": len(self.body)}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.calls.append(("get", Key, kwargs.get("IfMatch")))
+        return {"Body": io.BytesIO(self.body), "ETag": '"v1"'}
+
+
+def test_fetch_reuses_a_head_response_it_is_given():
+    s3 = _S3(_encode(Image.new("RGB", (200, 200), (0, 0, 255))))
+    prep = imageprep.ImagePreprocessor(cache_dir=None, max_side=64)
+
+    head = s3.head_object(Bucket="b", Key="a.png")
+    _, etag = prep.fetch(s3, "b", "a.png", head=head)
+
+    assert etag == '"v1"'
+    assert s3.calls == [("head", "a.png"), ("get", "a.png", '"v1"')]
@@ -0,0 +1,83 @@
+"""Index versioning in import-data: pointer history and garbage collection."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import createIndex
+import indexes
+
+BASE = indexes.BASE_INDEX
+V1, V2, V3 = (indexes.version_name(v) for v in (1, 2, 3))
+
+
+class FakeSSM:
+    def __init__(self, history):
+        self.history = history
+
+    def get_paginator(self, name):
+        assert name == "get_parameter_history"
+        return SimpleNamespace(paginate=lambda Name: [{"Parameters": self.history}])
+
+
+def _entry(value, minutes_ago):
+    return {"Value": value, "LastModifiedDate": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)}
+
+
+class FakeIndices:
+    def __init__(self, names):
+        self.names = set(names)
+        self.deleted = []
+
+    def get(self, index):
+        return {name: {} for name in self.names}
+
+    def delete(self, index):
+        self.names.discard(index)
+        self.deleted.append(index)
+        return {"acknowledged": True}
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    client = SimpleNamespace(indices=FakeIndices([BASE, V1, V2, V3]))
+    monkeypatch.setattr(indexes, "read_pointer", lambda prefix: V3)
+    return client
+
+
+def _gc(client, keep=0, grace=900):
+    createIndex.gc(client, SimpleNamespace(alias=None, parameter_prefix="/test/", keep=keep, grace=grace))
+    return client.indices.deleted
+
+
+class TestRecentTargets:
+    def test_includes_the_index_live_when_the_window_started(self):
+        ssm = FakeSSM([_entry(V1, 120), _entry(V2, 60), _entry(V3, 5)])
+        assert indexes.recent_targets(900, ssm_client=ssm) == {V2, V3}
+
+    def test_only_current_target_after_grace(self):
+        ssm = FakeSSM([_entry(V1, 120), _entry(V2, 60)])
+        assert indexes.recent_targets(900, ssm_client=ssm) == {V2}
+
+    def test_base_index_counts_before_first_pointer(self):
+        ssm = FakeSSM([_entry(V1, 5)])
+        assert indexes.recent_targets(900, ssm_client=ssm) == {BASE, V1}
+
+
+class TestGc:
+    def test_keeps_previous_target_during_grace(self, collection, monkeypatch):
+        monkeypatch.setattr(indexes, "recent_targets", lambda grace, prefix: {V2, V3})
+        assert sorted(_gc(collection)) == [BASE, V1]
+
+    def test_deletes_older_versions_after_grace(self, collection, monkeypatch):
+        monkeypatch.setattr(indexes, "recent_targets", lambda grace, prefix: {V3})
+        assert sorted(_gc(collection, keep=1)) == [BASE, V1]
+        assert collection.indices.names == {V2, V3}
+
+    def test_deletes_nothing_without_pointer_history(self, collection, monkeypatch):
+        def fail(grace, prefix):
+            raise RuntimeError("AccessDenied")
+
+        monkeypatch.setattr(indexes, "recent_targets", fail)
+        assert _gc(collection) == []
@@ -0,0 +1,43 @@
+"""The single-pass describe/embed pipeline in import-data/ingest.py."""
+
+import importlib
+
+import boto3
+import pytest
+from moto import mock_aws
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    for name, value in (("AWS_DEFAULT_REGION", "us-east-1"), ("AWS_ACCESS_KEY_ID", "testing"),
+                        ("AWS_SECRET_ACCESS_KEY", "testing")):
+        monkeypatch.setenv(name, value)
+    with mock_aws():
+        yield boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName="item_table",
+            KeySchema=[{"AttributeName": "ITEM_ID", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "ITEM_ID", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+@pytest.fixture
+def ingest(aws, monkeypatch):
+    module = importlib.import_module("ingest")
+    monkeypatch.setattr(module.image2Text.image_prep, "fetch", lambda s3, bucket, key: (b"jpeg", '"etag"'))
+    monkeypatch.setattr(module.image2Text, "call_bedrock", lambda prompt, image: "A red scarf.")
+    return module
+
+
+def test_describe_writes_only_the_description(aws, ingest):
+    aws.put_item(Item={"ITEM_ID": "a", "NAME": "Scarf", "IMAGE": "a.jpg", "PRICE": "10.00"})
+    # Snapshot from a scan taken before PRICE was changed.
+    scanned = {"ITEM_ID": "a", "NAME": "Scarf", "IMAGE": "a.jpg", "PRICE": "5.00"}
+    worker = ingest.IngestWorker("bucket", ["describe"], checkpoint=None, limiter=None, progress=None)
+
+    result = worker(scanned)
+
+    assert result["described"]
+    assert aws.get_item(Key={"ITEM_ID": "a"})["Item"] == {
+        "ITEM_ID": "a", "NAME": "Scarf", "IMAGE": "a.jpg", "PRICE": "10.00", "DESCRIPTION": "A red scarf."
+    }
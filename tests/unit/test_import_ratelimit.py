@@ -0,0 +1,126 @@
+"""AIMD rate limiting in import-data/ratelimit.py and its use in embedding.py."""
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+import embedding
+import ratelimit
+from ratelimit import AdaptiveRateLimiter, Progress
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+    return clock
+
+
+class TestAdaptiveRateLimiter:
+    def test_throttle_cuts_rate_once_per_cooldown(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10.0, decrease_factor=0.5, cooldown=2.0)
+
+        limiter.on_throttle()
+        limiter.on_throttle()
+        assert limiter.rate == 5.0
+
+        clock.now += 2.0
+        limiter.on_throttle()
+        assert limiter.rate == 2.5
+
+    def test_rate_never_drops_below_min(self, clock):
+        limiter = AdaptiveRateLimiter(rate=1.0, min_rate=0.8, decrease_factor=0.5)
+
+        limiter.on_throttle()
+        assert limiter.rate == 0.8
+
+    def test_success_adds_step_per_second_of_traffic(self, clock):
+        limiter = AdaptiveRateLimiter(rate=4.0, max_rate=5.0, increase_step=1.0)
+
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.rate == pytest.approx(5.0, abs=0.1)
+
+        for _ in range(20):
+            limiter.on_success()
+        assert limiter.rate == 5.0
+
+    def test_acquire_spends_burst_then_waits_for_refill(self, clock):
+        limiter = AdaptiveRateLimiter(rate=2.0, burst=3)
+
+        for _ in range(3):
+            limiter.acquire()
+        assert clock.slept == []
+
+        limiter.acquire()
+        assert clock.slept == [pytest.approx(0.5)]
+
+    def test_throttle_drops_saved_tokens(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10.0, burst=10, decrease_factor=0.5)
+
+        limiter.on_throttle()
+        limiter.acquire()
+        assert clock.slept == [pytest.approx(0.2)]
+
+
+def _client_error(code, status=400):
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "InvokeModel")
+
+
+class TestCallRateLimited:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        monkeypatch.setattr(embedding.time, "sleep", lambda seconds: None)
+
+    def _call(self, errors, max_attempts=8):
+        errors = list(errors)
+
+        def func():
+            if errors:
+                raise errors.pop(0)
+            return "vector"
+
+        limiter = AdaptiveRateLimiter(rate=50.0, cooldown=0.0)
+        progress = Progress(interval=3600)
+        return embedding.call_rate_limited(func, limiter, progress, max_attempts), limiter, progress
+
+    def test_throttles_lower_the_rate(self):
+        result, limiter, progress = self._call([_client_error("ThrottlingException")] * 2)
+
+        assert result == "vector"
+        assert limiter.rate < 50.0
+        assert (progress.requests, progress.throttled, progress.done) == (3, 2, 1)
+
+    @pytest.mark.parametrize("error", [
+        _client_error("ModelTimeoutException", 408),
+        _client_error("InternalServerException", 500),
+        _client_error("SomethingElse", 503),
+        ReadTimeoutError(endpoint_url="https://bedrock-runtime.us-east-1.amazonaws.com"),
+    ])
+    def test_transient_errors_are_retried_without_slowing_down(self, error):
+        result, limiter, progress = self._call([error])
+
+        assert result == "vector"
+        assert limiter.rate >= 50.0
+        assert (progress.requests, progress.throttled) == (2, 0)
+
+    def test_client_errors_are_not_retried(self):
+        with pytest.raises(ClientError):
+            self._call([_client_error("ValidationException")])
+
+    def test_gives_up_after_max_attempts(self):
+        with pytest.raises(ClientError):
+            self._call([_client_error("InternalServerException", 500)] * 3, max_attempts=3)
@@ -0,0 +1,101 @@
+"""Parallel segmented scans in import-data/scan.py."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scan import ScanStats, parallel_scan, per_thread_table
+
+
+class FakeTable:
+    """Serves `total` items split evenly into segments, `page_size` per scan call."""
+
+    def __init__(self, total, page_size=3, fail_segment=None):
+        self.total = total
+        self.page_size = page_size
+        self.fail_segment = fail_segment
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self
+
+    def scan(self, Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        with self._lock:
+            self.calls.append((Segment, ExclusiveStartKey, kwargs))
+        if Segment == self.fail_segment:
+            raise RuntimeError(f"segment {Segment} failed")
+        ids = [i for i in range(self.total) if i % TotalSegments == Segment]
+        start = ExclusiveStartKey["ITEM_ID"] + 1 if ExclusiveStartKey else 0
+        page = [i for i in ids if i >= start][:self.page_size]
+        response = {"Items": [{"ITEM_ID": i} for i in page]}
+        if page and page[-1] != ids[-1]:
+            response["LastEvaluatedKey"] = {"ITEM_ID": page[-1]}
+        return response
+
+
+def test_yields_every_item_once_across_pages_and_segments():
+    table = FakeTable(50, page_size=4)
+    stats = ScanStats(4)
+
+    ids = sorted(item["ITEM_ID"] for item in parallel_scan(table, 4, queue_size=5, stats=stats))
+
+    assert ids == list(range(50))
+    assert stats.items == 50
+    # Segments of 13, 13, 12 and 12 items take 4, 4, 3 and 3 pages.
+    assert stats.pages == len(table.calls) == 14
+
+
+def test_scan_kwargs_reach_every_segment():
+    table = FakeTable(8)
+
+    list(parallel_scan(table, 2, ProjectionExpression="ITEM_ID"))
+
+    assert {segment for segment, _, _ in table.calls} == {0, 1}
+    assert all(kwargs == {"ProjectionExpression": "ITEM_ID"} for _, _, kwargs in table.calls)
+
+
+def test_each_segment_builds_its_own_table():
+    made = []
+
+    def make_table():
+        made.append(threading.current_thread().name)
+        return FakeTable(4)
+
+    list(parallel_scan(make_table, 3))
+
+    assert sorted(made) == [f"scan-segment-{i}" for i in range(3)]
+
+
+def test_segment_error_reaches_the_consumer():
+    with pytest.raises(RuntimeError, match="segment 1 failed"):
+        list(parallel_scan(FakeTable(20, fail_segment=1), 2))
+
+
+def test_stopping_early_releases_blocked_segments():
+    table = FakeTable(1000, page_size=10)
+    before = threading.active_count()
+
+    scan = parallel_scan(table, 4, queue_size=2)
+    first = [next(scan) for _ in range(5)]
+    scan.close()
+
+    assert len(first) == 5
+    for thread in threading.enumerate():
+        if thread.name.startswith("scan-segment-"):
+            thread.join(timeout=2)
+    assert threading.active_count() <= before
+
+
+def test_per_thread_table_is_reused_within_a_thread_only():
+    table = per_thread_table("item_table")
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        tables = list(pool.map(lambda _: (threading.get_ident(), id(table())), range(30)))
+
+    by_thread = {}
+    for ident, table_id in tables:
+        by_thread.setdefault(ident, set()).add(table_id)
+    assert all(len(ids) == 1 for ids in by_thread.values())
+    assert len({next(iter(ids)) for ids in by_thread.values()}) == len(by_thread)
+    assert table().name == "item_table"
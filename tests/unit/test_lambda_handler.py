@@ -0,0 +1,250 @@
+"""Unit tests for lambda/handler.py, run against the local AWS stand-ins."""
+
+import importlib.util
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from tests.bench.lambda_stand_ins import Latency, lambda_stand_ins, load_handler
+
+SCARF_ID = "e1669081-8ffc-4dec-97a6-e9176d7f6651"
+
+
+@pytest.fixture(scope="module")
+def fakes():
+    with lambda_stand_ins(Latency(embed=0, llm=0, personalize=0, knn=0)) as fakes:
+        yield fakes
+
+
+@pytest.fixture(scope="module")
+def handler(fakes):
+    return load_handler()
+
+
+def test_get_item_info_deserializes_attributes(handler):
+    assert handler.get_item_info(SCARF_ID) == {
+        "item_id": SCARF_ID,
+        "title": "Sans Pareil Scarf",
+        "price": "124.99",
+        "style": "scarf",
+        "image": f"image/apparel/{SCARF_ID}.jpg",
+    }
+
+
+def test_get_user_info_queries_numeric_key(handler):
+    user = handler.get_user_info("2")
+    assert (user["user_id"], user["age"], user["gender"]) == ("2", "58", "F")
+
+
+def test_lookups_are_safe_from_many_threads(handler):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: handler.get_item_info(SCARF_ID)["title"], range(64)))
+    assert set(results) == {"Sans Pareil Scarf"}
+
+
+def _track(handler, chunks):
+    tracker = handler.JsonCloseTracker()
+    seen = ""
+    for chunk in chunks:
+        end = tracker.feed(chunk)
+        if end is not None:
+            return seen + chunk[:end]
+        seen += chunk
+    return None
+
+
+class TestJsonCloseTracker:
+    """Where a streamed Claude answer is considered complete."""
+
+    def test_ignores_bracketed_prose_before_the_answer(self, handler):
+        text = 'Based on rules [1] and [2], the best pick is:\n[{"item_id": "a"}]\nBecause it is cheap.'
+        assert _track(handler, [text]) == text[:text.index("}]") + 2]
+
+    def test_starts_after_json_fence(self, handler):
+        text = 'Here you go ```json [{"item_id": "a", "note": "fits [budget] \\"]\\""}]``` done'
+        assert _track(handler, [text]) == text[:text.index("}]") + 2]
+
+    def test_closes_across_chunks(self, handler):
+        chunks = ["Answer:\n  [{", '"item_id": ', '"a"}', "] trailing"]
+        assert _track(handler, chunks) == 'Answer:\n  [{"item_id": "a"}]'
+
+    def test_skips_line_start_brackets_that_are_not_the_answer(self, handler):
+        text = '[1] Cheapest first.\n{"item_id": "a"} and more'
+        assert _track(handler, list(text)) == text[:text.index("}") + 1]
+
+    def test_prose_without_json_never_closes(self, handler):
+        assert _track(handler, ["No items match [sorry]."]) is None
+
+
+class TestCallBedrock:
+    """Streaming call_bedrock with the early stop enabled."""
+
+    def test_keeps_answer_after_bracketed_prose(self, handler, fakes, monkeypatch):
+        completion = 'Based on rules [1] and [2], the best pick is:\n[{"item_id": "a"}]\n\nLong explanation.'
+        monkeypatch.setattr(fakes, "completion", completion)
+        monkeypatch.setattr(handler, "BEDROCK_STREAMING", True)
+
+        result = handler.call_bedrock("prompt")
+
+        assert result == completion[:completion.index("}]") + 2]
+
+    def test_returns_everything_when_no_answer_closes(self, handler, fakes, monkeypatch):
+        monkeypatch.setattr(fakes, "completion", "I could not find [any] matching items.")
+        monkeypatch.setattr(handler, "BEDROCK_STREAMING", True)
+
+        assert handler.call_bedrock("prompt") == "I could not find [any] matching items."
+
+
+class TestPromptCompaction:
+    """Compact tables that replace dict reprs in the Claude prompts."""
+
+    def test_history_lists_each_item_once_with_all_events(self, handler):
+        scarf = {"item_id": "a", "title": "Scarf", "price": "10", "style": "scarf"}
+        hat = {"item_id": "b", "title": "Hat", "price": "20", "style": "hat"}
+        history = {"visted": [scarf, hat], "add_to_cart": [scarf], "purchased": [scarf]}
+
+        lines = handler.compact_history(history).splitlines()
+
+        assert lines == [
+            "item_id|title|price|style|events",
+            "a|Scarf|10|scarf|visted+add_to_cart+purchased",
+            "b|Hat|20|hat|visted",
+        ]
+
+    def test_empty_columns_are_dropped(self, handler):
+        items = [{"itemId": "a", "score": 0.91234}, {"itemId": "b", "score": 0.5}]
+
+        assert handler.compact_items(items) == "item_id|score\na|0.912\nb|0.5"
+
+    def test_constant_columns_are_stated_once(self, handler):
+        items = '[{"item_id": "a", "price": "9.99", "style": "scarf"}, {"item_id": "b", "price": "5", "style": "scarf"}]'
+
+        assert handler.compact_items(items) == "All rows: style=scarf\nitem_id|price\na|9.99\nb|5"
+
+    def test_single_row_keeps_its_values(self, handler):
+        assert handler.compact_items([{"item_id": "a", "style": "scarf"}]) == "item_id|style\na|scarf"
+
+    def test_pipes_in_values_do_not_split_columns(self, handler):
+        table = handler.to_table([{"id": "a", "note": "x|y"}, {"id": "b", "note": "z"}], ["id", "note"])
+        assert table.splitlines()[1] == "a|x/y"
+
+    def test_truncation_keeps_text_at_the_budget(self, handler):
+        text = "word " * 3 + "abcde"  # exactly 5 tokens of 4 characters
+        assert handler.truncate_to_tokens(text, 5) == text
+        assert handler.truncate_to_tokens(text + "f", 5) == "word word word..."
+
+    def test_truncation_cuts_on_a_word_boundary(self, handler):
+        text = "one two three four five six"
+        assert handler.truncate_to_tokens(text, 3) == "one two..."
+
+    def test_truncation_collapses_whitespace(self, handler):
+        assert handler.truncate_to_tokens("  red\n\nwool   scarf ", 10) == "red wool scarf"
+
+
+class TestIndexPointer:
+    """The Lambda follows createIndex.py promote without a redeploy."""
+
+    def test_rereads_pointer_after_ttl(self, handler, monkeypatch):
+        import boto3
+
+        ssm = boto3.client("ssm")
+        monkeypatch.setattr(handler, "index_pointer", {"name": handler.INDEX_NAME, "expires": 0.0})
+        assert handler.get_index_name() == handler.INDEX_NAME
+
+        ssm.put_parameter(Name=handler.INDEX_POINTER, Value="product-search-multimodal-index-v1", Type="String")
+        try:
+            assert handler.get_index_name() == handler.INDEX_NAME
+            handler.index_pointer["expires"] = 0.0
+            assert handler.get_index_name() == "product-search-multimodal-index-v1"
+        finally:
+            ssm.delete_parameter(Name=handler.INDEX_POINTER)
+
+    def test_keeps_last_index_when_ssm_fails(self, handler, monkeypatch):
+        monkeypatch.setattr(handler, "index_pointer", {"name": "product-search-multimodal-index-v2", "expires": 0.0})
+
+        def fail(**kwargs):
+            raise RuntimeError("throttled")
+
+        monkeypatch.setattr(handler.ssm, "get_parameter", fail)
+        assert handler.get_index_name() == "product-search-multimodal-index-v2"
+
+
+class TestIndexSettings:
+    """Vector settings read from the index mapping."""
+
+    def test_failed_mapping_read_is_retried_after_ttl(self, handler, monkeypatch):
+        client = handler.get_opensearch_client()
+        calls = []
+
+        def fail(index):
+            calls.append(index)
+            raise RuntimeError("forbidden")
+
+        monkeypatch.setattr(handler, "index_settings", {})
+        monkeypatch.setattr(handler, "index_settings_retry_at", {})
+        monkeypatch.setattr(client.indices, "get_mapping", fail)
+
+        assert handler.get_index_settings("idx")["embedding_dimension"] == 1024
+        assert handler.get_index_settings("idx")["quantization"] == "none"
+        assert calls == ["idx"]
+
+        handler.index_settings_retry_at["idx"] = 0.0
+        handler.get_index_settings("idx")
+        assert calls == ["idx", "idx"]
+
+
+AGENT_CORE = Path(__file__).resolve().parents[2] / "agent-core"
+
+
+@pytest.fixture(scope="module")
+def agent_helpers():
+    """agent-core/tools/helpers.py, loaded by path so the tools package (and strands) is not imported."""
+    sys.path.insert(0, str(AGENT_CORE))
+    try:
+        spec = importlib.util.spec_from_file_location("agent_tool_helpers", AGENT_CORE / "tools" / "helpers.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        sys.path.remove(str(AGENT_CORE))
+
+
+VECTORS = [
+    [3.0, 4.0],
+    [0.1, -0.7, 0.35, 0.0, 2.5e-3],
+    [-1.0, -1.0, -1.0],
+    [0.0, 0.0, 0.0],
+    [0.5 - i / 64 for i in range(64)],
+]
+
+
+class TestSharedCopies:
+    """The Lambda, agent and loader copies of the vector and JSON helpers must agree.
+
+    Loaded documents and queries are prepared by different copies, so a
+    drift in normalization or int8 scaling would silently skew scores.
+    """
+
+    @pytest.mark.parametrize("quantization", ["none", "fp16", "byte"])
+    @pytest.mark.parametrize("vector", VECTORS)
+    def test_query_and_document_vectors_match(self, handler, agent_helpers, vector, quantization):
+        import indexes
+
+        stored = indexes.prepare_vector(vector, quantization)
+
+        assert handler.prepare_query_vector(vector, quantization) == stored
+        assert agent_helpers.prepare_query_vector(vector, quantization) == stored
+
+    @pytest.mark.parametrize("text", [
+        'Based on rules [1] and [2], the best pick is:\n[{"item_id": "a"}]\nBecause it is cheap.',
+        'Here you go ```json [{"item_id": "a", "note": "fits [budget] \\"]\\""}]``` done',
+        '[1] Cheapest first.\n{"item_id": "a"} and more',
+        'No items match [sorry].',
+    ])
+    def test_json_close_trackers_agree(self, handler, agent_helpers, text):
+        for size in (1, 3, len(text)):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            lambda_tracker, agent_tracker = handler.JsonCloseTracker(), agent_helpers.JsonCloseTracker()
+            assert [lambda_tracker.feed(c) for c in chunks] == [agent_tracker.feed(c) for c in chunks]